@@ -1,8 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import pycountry_convert as pc
 import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.medal_pivot import MEDAL_COLORS, medal_table, medal_long
+from utils.medal_ranking import official_ranks
+from utils.continents import add_continents
+from utils.search_box import render_global_search
+from utils.ingest import data_path, explode_list_column, medal_model, read_tables, rows_with_any
+from utils.athlete_cards import load_results
+from utils import live_feed
+from utils.instrumentation import begin_run, lap, plotly_chart, render_debug_panel
+from utils.memory import select, share
+from utils.snapshots import pin_snapshot, render_snapshot_version
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +24,13 @@ st.set_page_config(
     layout="wide"
 )
 
+begin_run("Overview")
+
+# Every table of this rerun comes from one dataset snapshot; cached loaders
+# are keyed on its version, so a newly swapped-in snapshot gets new entries
+snapshot = pin_snapshot()
+version = snapshot["version"]
+
 # Custom CSS for better styling
 st.markdown("""
     <style>
@@ -44,54 +64,49 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    athletes = pd.read_csv("data/athletes.csv")
-    nocs = pd.read_csv("data/nocs.csv")
-    events = pd.read_csv("data/events.csv")
-    medals_total = pd.read_csv("data/medals_total.csv")
-    medals = pd.read_csv("data/medals.csv")
-    return athletes, nocs, events, medals_total, medals
-
-athletes, nocs, events, medals_total, medals = load_data()
-
-# Function to get continent
-def get_continent_code(country_code):
-    try:
-        continent_code = pc.country_alpha2_to_continent_code(country_code)
-        return continent_code
-    except:
-        return "Other"
-
-def get_continent_name(continent_code):
-    continent_mapping = {
-        'AF': 'Africa',
-        'AS': 'Asia',
-        'EU': 'Europe',
-        'NA': 'North America',
-        'SA': 'South America',
-        'OC': 'Oceania',
-        'Other': 'Other'
-    }
-    return continent_mapping.get(continent_code, 'Other')
+# Load data: loaded and enriched once per server: every session reads the same frames,
+# so they must not be modified (filter with select())
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    # Mapped from the host's shared snapshots or parsed in parallel, in this order
+    athletes, nocs, events, medals_total, medals = read_tables(
+        [data_path(name) for name in ["athletes.csv", "nocs.csv", "events.csv", "medals_total.csv", "medals.csv"]]
+    )
+
+    # Add continent to data
+    add_continents(medals_total)
+    add_continents(medals)
+
+    # One row per (athlete, discipline), for exact sport filters
+    athlete_disciplines = explode_list_column(athletes["disciplines"])
 
-# Add continent to data
-if 'continent' not in medals_total.columns:
-    medals_total['continent_code'] = medals_total['country_code'].apply(get_continent_code)
-    medals_total.loc[medals_total['country_code'] == 'XKX', 'continent_code'] = 'EU'
-    medals_total['continent'] = medals_total['continent_code'].apply(get_continent_name)
+    return (share(athletes, "overview: athletes"), share(nocs, "overview: nocs"), share(events, "overview: events"),
+            share(medals_total, "overview: medals_total"), share(medals, "overview: medals"),
+            share(athlete_disciplines, "overview: athlete disciplines"))
 
-if 'continent' not in medals.columns:
-    medals['continent_code'] = medals['country_code'].apply(get_continent_code)
-    medals.loc[medals['country_code'] == 'KOS', 'continent_code'] = 'EU'
-    medals['continent'] = medals['continent_code'].apply(get_continent_name)
+athletes, nocs, events, medals_total, medals, athlete_disciplines = load_data(version)
+lap("data load (with continent enrichment)", rows_out=len(athletes) + len(medals_total) + len(medals))
+
+# Live feed (PARIS2024_LIVE_FEED): the standings are kept up to date one new
+# medal row at a time instead of being recomputed from the full tables
+def seed_live_aggregates():
+    _, _, athlete_medals = medal_model(version)
+    return {"medals_total": medals_total, "athlete_medals": athlete_medals, "results": load_results()}
+
+live = live_feed.live_aggregates(version, seed_live_aggregates) if live_feed.enabled() else None
+if live is not None:
+    live_updates = live.updates
+    medals_total = live.standings()
+    lap("live standings", rows_out=len(medals_total))
 
 # Title
 st.markdown('<p class="main-header">🏠 Paris 2024 Olympics - Command Center</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Your comprehensive dashboard for Olympic excellence</p>', unsafe_allow_html=True)
 
 # SIDEBAR FILTERS
+with st.sidebar:
+    render_global_search(version)
+
 st.sidebar.header("🎯 Global Filters")
 
 # Country filter
@@ -130,32 +145,30 @@ show_bronze = st.sidebar.checkbox("Bronze", value=True)
 st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip**: Use filters to explore specific countries, sports, or regions!")
 
-# Apply filters
-filtered_medals_total = medals_total.copy()
-filtered_medals = medals.copy()
-filtered_events = events.copy()
-filtered_athletes = athletes.copy()
+lap("sidebar")
+
+# Apply filters: one mask per filter, combined and applied once per frame
+# by select(), which returns the shared frame itself when nothing is filtered
+medals_total_masks, medals_masks, events_masks, athletes_masks = [], [], [], []
 
 # Filter by countries
 if selected_countries:
     country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
-    filtered_medals_total = filtered_medals_total[filtered_medals_total['country_code'].isin(country_codes)]
-    filtered_medals = filtered_medals[filtered_medals['country_code'].isin(country_codes)]
-    filtered_athletes = filtered_athletes[filtered_athletes['country_code'].isin(country_codes)]
+    medals_total_masks.append(medals_total['country_code'].isin(country_codes))
+    medals_masks.append(medals['country_code'].isin(country_codes))
+    athletes_masks.append(athletes['country_code'].isin(country_codes))
 
 # Filter by continents
 if selected_continents:
-    filtered_medals_total = filtered_medals_total[filtered_medals_total['continent'].isin(selected_continents)]
-    filtered_medals = filtered_medals[filtered_medals['continent'].isin(selected_continents)]
+    medals_total_masks.append(medals_total['continent'].isin(selected_continents))
+    medals_masks.append(medals['continent'].isin(selected_continents))
 
 # Filter by sports
 if selected_sports:
-    filtered_events = filtered_events[filtered_events['sport'].isin(selected_sports)]
-    filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_sports)]
+    events_masks.append(events['sport'].isin(selected_sports))
+    medals_masks.append(medals['discipline'].isin(selected_sports))
     # Filter athletes by disciplines
-    filtered_athletes = filtered_athletes[
-        filtered_athletes['disciplines'].str.contains('|'.join(selected_sports), case=False, na=False)
-    ]
+    athletes_masks.append(rows_with_any(athlete_disciplines, selected_sports, len(athletes)))
 
 # Filter by medal types
 medal_columns = []
@@ -172,7 +185,15 @@ if not medal_columns:
 # Filter medals dataframe by medal type
 medal_type_map = {'Gold': 'Gold Medal', 'Silver': 'Silver Medal', 'Bronze': 'Bronze Medal'}
 selected_medal_types = [medal_type_map[m] for m in medal_columns]
-filtered_medals = filtered_medals[filtered_medals['medal_type'].isin(selected_medal_types)]
+if len(selected_medal_types) < len(medal_type_map):
+    medals_masks.append(medals['medal_type'].isin(selected_medal_types))
+
+filtered_medals_total = select(medals_total, *medals_total_masks)
+filtered_medals = select(medals, *medals_masks)
+filtered_events = select(events, *events_masks)
+filtered_athletes = select(athletes, *athletes_masks)
+lap("filtering", rows_in=len(medals_total) + len(medals) + len(athletes) + len(events),
+    rows_out=len(filtered_medals_total) + len(filtered_medals) + len(filtered_athletes) + len(filtered_events))
 
 # Calculate KPIs
 nb_athletes = len(filtered_athletes)
@@ -180,6 +201,7 @@ nb_countries = filtered_medals_total['country_code'].nunique() if not filtered_m
 nb_sports = filtered_events['sport_code'].nunique() if not filtered_events.empty else 0
 total_medals = filtered_medals_total[medal_columns].sum().sum() if not filtered_medals_total.empty else 0
 nb_events = len(filtered_events)
+lap("KPI computation")
 
 # KPI Metrics Section
 st.markdown("### 📊 Key Performance Indicators")
@@ -201,6 +223,7 @@ with col5:
     st.metric("🎯 Events", f"{nb_events:,}")
 
 st.markdown("---")
+lap("KPI metrics")
 
 # Main content
 col1, col2 = st.columns([1, 1])
@@ -237,7 +260,7 @@ with col1:
             yaxis_title="Number of Medals"
         )
         
-        st.plotly_chart(medal_count_fig, use_container_width=True)
+        plotly_chart(medal_count_fig, use_container_width=True)
     else:
         st.info("No data available with current filters")
 
@@ -245,23 +268,10 @@ with col2:
     st.markdown("### 🏆 Top 10 Countries - Medal Standings")
     
     if not filtered_medals_total.empty:
-        # Calculate total for sorting
-        filtered_medals_total['Total_filtered'] = filtered_medals_total[medal_columns].sum(axis=1)
-        
-        medal_ranking_df = filtered_medals_total.nlargest(10, 'Total_filtered')
-        medal_ranking_df = medal_ranking_df.melt(
-            id_vars=["country_code", "country"],
-            value_vars=medal_columns,
-            var_name='medal',
-            value_name='count'
-        )
-        
-        # Color mapping
-        color_map = {
-            'Gold': '#FFD700',
-            'Silver': '#C0C0C0',
-            'Bronze': '#CD7F32'
-        }
+        # Official order (Gold, then Silver, then Bronze) over the selected medal types
+        country_medals = official_ranks(medal_table(filtered_medals_total, ["country_code", "country"], medal_columns))
+        medal_ranking_df = medal_long(country_medals.head(10).set_index(["country_code", "country"]), medal_columns)
+        lap("aggregation: country ranking", rows_in=len(filtered_medals_total), rows_out=len(country_medals))
         
         medal_ranking_fig = px.bar(
             medal_ranking_df,
@@ -269,8 +279,8 @@ with col2:
             y="count",
             color="medal",
             barmode="group",
-            title="Top 10 Countries by Medal Count",
-            color_discrete_map=color_map,
+            title="Top 10 Countries - Official Ranking",
+            color_discrete_map=MEDAL_COLORS,
             labels={'country': 'Country', 'count': 'Number of Medals', 'medal': 'Medal Type'}
         )
         
@@ -279,7 +289,7 @@ with col2:
             xaxis_tickangle=-45
         )
         
-        st.plotly_chart(medal_ranking_fig, use_container_width=True)
+        plotly_chart(medal_ranking_fig, use_container_width=True)
     else:
         st.info("No data available with current filters")
 
@@ -288,9 +298,12 @@ st.markdown("---")
 st.markdown("### 🌍 Continental Performance Overview")
 
 if not filtered_medals_total.empty and 'continent' in filtered_medals_total.columns:
-    continent_medals = filtered_medals_total.groupby('continent')[medal_columns].sum().reset_index()
-    continent_medals['Total'] = continent_medals[medal_columns].sum(axis=1)
+    if live is not None and not medals_total_masks:
+        continent_medals = live.continent_totals(medal_columns).reset_index()
+    else:
+        continent_medals = medal_table(filtered_medals_total, 'continent', medal_columns).reset_index()
     continent_medals = continent_medals.sort_values('Total', ascending=True)
+    lap("aggregation: continents", rows_in=len(filtered_medals_total), rows_out=len(continent_medals))
     
     fig_continent = px.bar(
         continent_medals,
@@ -311,7 +324,39 @@ if not filtered_medals_total.empty and 'continent' in filtered_medals_total.colu
         yaxis_title="Continent"
     )
     
-    st.plotly_chart(fig_continent, use_container_width=True)
+    plotly_chart(fig_continent, use_container_width=True)
+
+# Live feed: top medallists and the leaderboards of the events it updated
+if live is not None:
+    st.markdown("---")
+    st.markdown("### ⚡ Live Results")
+    updated = f" · last update {live.updated_at:%H:%M:%S}" if live.updated_at else ""
+    st.caption(f"{live.updates:,} rows received from the live feed{updated}")
+
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        st.markdown("#### 🏅 Top Medallists")
+        st.dataframe(live.top_athletes(10).drop(columns="code_athlete"), hide_index=True, use_container_width=True)
+
+    with col2:
+        st.markdown("#### 🏁 Event Leaderboards")
+        recent = live.recent_events()
+        if recent:
+            labels = {event: f"{discipline} - {name}" for event, discipline, name in recent}
+            event = st.selectbox("Recently updated event", list(labels), format_func=labels.get)
+            st.dataframe(live.leaderboard(event).drop(columns="participant_code"), hide_index=True,
+                         use_container_width=True)
+        else:
+            st.info("No results received yet")
+    lap("live results")
+
+    # Reruns the page as soon as the feed has delivered new rows
+    @st.fragment(run_every=live_feed.REFRESH_SECONDS)
+    def follow_live_feed(seen):
+        if live.updates != seen:
+            st.rerun()
+
+    follow_live_feed(live_updates)
 
 # Quick Stats
 st.markdown("---")
@@ -346,4 +391,7 @@ st.markdown("""
     <p>Built with ❤️ using Streamlit | Celebrating Olympic Excellence</p>
 </div>
 """, unsafe_allow_html=True)
+
+render_snapshot_version(snapshot)
+render_debug_panel()
 # eeeeeeee
\ No newline at end of file
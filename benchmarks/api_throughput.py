@@ -0,0 +1,94 @@
+"""
+Throughput of the query service (utils/query_server.py): several clients,
+each on one keep-alive connection, send a mix of filtered queries for a
+fixed time. Half of the requests are conditional (If-None-Match with the
+ETag seen before), like a signage screen polling for changes.
+
+    python -m utils.query_server --port 8600 &
+    python benchmarks/api_throughput.py --port 8600 --clients 8 --seconds 10
+"""
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+QUERY_MIX = [
+    "/kpis",
+    "/kpis?countries=France",
+    "/kpis?continents=Europe&sports=Swimming",
+    "/standings?top=10",
+    "/standings?medal_types=Gold&top=10",
+    "/standings?continents=Europe&continents=Asia",
+    "/continents",
+    "/continents?medal_types=Gold&medal_types=Silver",
+    "/schedule?discipline=Swimming",
+    "/schedule?discipline=Athletics&start=2024-08-02&end=2024-08-03&page=2",
+]
+
+
+def run_client(host, port, deadline, conditional, seed, results):
+    rng = random.Random(seed)
+    etags = {}
+    latencies = []
+    statuses = Counter()
+    conn = http.client.HTTPConnection(host, port)
+    while time.perf_counter() < deadline:
+        path = rng.choice(QUERY_MIX)
+        headers = {"If-None-Match": etags[path]} if path in etags and rng.random() < conditional else {}
+        start = time.perf_counter()
+        conn.request("GET", path, headers=headers)
+        reply = conn.getresponse()
+        reply.read()
+        latencies.append(time.perf_counter() - start)
+        statuses[reply.status] += 1
+        if reply.getheader("ETag"):
+            etags[path] = reply.getheader("ETag")
+    conn.close()
+    results.append((latencies, statuses))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure requests per second of the query service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent keep-alive connections")
+    parser.add_argument("--seconds", type=float, default=10, help="Duration of the run")
+    parser.add_argument("--conditional", type=float, default=0.5, help="Share of conditional requests")
+    args = parser.parse_args(argv)
+
+    # One pass over the mix first, so the run measures the cached path
+    conn = http.client.HTTPConnection(args.host, args.port)
+    for path in QUERY_MIX:
+        conn.request("GET", path)
+        conn.getresponse().read()
+    conn.close()
+
+    results = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=run_client, args=(args.host, args.port, deadline, args.conditional, i, results))
+               for i in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.asarray(l) for l, _ in results]) * 1000
+    statuses = sum((s for _, s in results), Counter())
+    print(json.dumps({
+        "clients": args.clients,
+        "requests": int(len(latencies)),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {f"p{q}": round(float(np.percentile(latencies, q)), 3) for q in (50, 90, 99)},
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Stand-in live feed: replays the dataset's medal, medallist and result rows
+as a feed the dashboard follows (see utils/live_feed.py), and measures how
+long the live aggregates take to reflect a new row.
+
+    python benchmarks/live_feed.py replay --to live_feed.csv --rate 20
+    PARIS2024_LIVE_FEED=live_feed.csv streamlit run 1_Overview.py
+
+    python benchmarks/live_feed.py replay --serve 9099 --rate 20
+    PARIS2024_LIVE_FEED=tcp://localhost:9099 streamlit run 1_Overview.py
+
+    python benchmarks/live_feed.py measure --data-dir data_x10
+
+The rows replayed are the dataset's own, so the dashboard counts them twice;
+the feed is meant for demos and latency checks, not for correct totals.
+"""
+import argparse
+import io
+import json
+import os
+import socket
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from utils.athlete_cards import load_results
+from utils.ingest import load_medal_model, read_tables
+from utils.live_feed import LiveAggregates
+
+FEED_FILES = ["medals.csv", "medallists.csv"]
+
+
+def feed_frames(data_dir):
+    """The rows to replay, one frame per schema: medals, medallists and results, each in date order."""
+    medals, medallists = read_tables([os.path.join(data_dir, name) for name in FEED_FILES])
+    results = load_results(data_dir)
+    return [medals.sort_values("medal_date", kind="stable"),
+            medallists.sort_values("medal_date", kind="stable"),
+            results.sort_values("date", kind="stable")]
+
+
+def feed_batches(frames, batch=10):
+    """
+    CSV text of the feed: `batch` rows of each schema in turn, each batch
+    after its header line.
+    """
+    positions = [0] * len(frames)
+    while any(position < len(frame) for position, frame in zip(positions, frames)):
+        for i, frame in enumerate(frames):
+            rows = frame.iloc[positions[i]:positions[i] + batch]
+            positions[i] += batch
+            if not rows.empty:
+                text = io.StringIO()
+                rows.to_csv(text, index=False, lineterminator="\n")
+                yield text.getvalue(), len(rows)
+
+
+def replay(frames, write, rate, limit=None, batch=10):
+    """Writes the feed through write(text) at about `rate` rows per second."""
+    sent = 0
+    start = time.perf_counter()
+    for text, rows in feed_batches(frames, batch):
+        write(text)
+        sent += rows
+        if limit is not None and sent >= limit:
+            break
+        delay = start + sent / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return sent
+
+
+def measure(data_dir, rows=500, seed=0):
+    """
+    Latency of one new row, from apply() to the updated frame the Overview
+    reads (standings, top athletes or the event's leaderboard).
+
+    Returns:
+        dict: seed time and p50/p95/p99 milliseconds per row kind
+    """
+    medals_total, = read_tables([os.path.join(data_dir, "medals_total.csv")])
+    _, _, athlete_medals = load_medal_model(data_dir)
+    results = load_results(data_dir)
+
+    start = time.perf_counter()
+    live = LiveAggregates(medals_total.assign(continent="Other"), athlete_medals, results)
+    report = {"data_dir": data_dir, "seed_s": round(time.perf_counter() - start, 3)}
+
+    reads = {"medal": lambda row: (live.standings(), live.continent_totals()),
+             "medallist": lambda row: live.top_athletes(10),
+             "result": lambda row: live.leaderboard(row["event_code"])}
+    for kind, frame in zip(reads, feed_frames(data_dir)):
+        sample = frame.sample(min(rows, len(frame)), random_state=seed).astype(str)
+        latencies = []
+        for row in sample.to_dict("records"):
+            row = {column: value for column, value in row.items() if value not in ("", "nan", "None", "<NA>")}
+            start = time.perf_counter()
+            live.apply(row)
+            reads[kind](row)
+            latencies.append((time.perf_counter() - start) * 1000)
+        report[kind] = {f"p{q}_ms": round(float(np.percentile(latencies, q)), 3) for q in (50, 95, 99)}
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the dataset as a live feed, or measure live update latency.")
+    parser.add_argument("command", choices=["replay", "measure"])
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "data"), help="Dataset directory")
+    parser.add_argument("--to", help="replay: CSV file to append the feed to")
+    parser.add_argument("--serve", type=int, help="replay: TCP port to stream the feed on (to the first client)")
+    parser.add_argument("--rate", type=float, default=20, help="replay: rows per second")
+    parser.add_argument("--limit", type=int, help="replay: stop after this many rows")
+    parser.add_argument("--rows", type=int, default=500, help="measure: rows applied per kind")
+    args = parser.parse_args(argv)
+
+    if args.command == "measure":
+        print(json.dumps(measure(args.data_dir, args.rows), indent=2))
+        return
+
+    frames = feed_frames(args.data_dir)
+    if args.serve:
+        with socket.create_server(("", args.serve)) as server:
+            print(f"Waiting for the dashboard on port {args.serve}")
+            conn, address = server.accept()
+            with conn:
+                sent = replay(frames, lambda text: conn.sendall(text.encode()), args.rate, args.limit)
+    elif args.to:
+        with open(args.to, "a", encoding="utf-8", newline="") as feed:
+            def write(text):
+                feed.write(text)
+                feed.flush()
+            sent = replay(frames, write, args.rate, args.limit)
+    else:
+        parser.error("replay needs --to or --serve")
+    print(f"Replayed {sent} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Concurrent-session load test.
+
+Runs N simulated sessions at once against the pages, each a Streamlit
+AppTest that opens a page and then cycles through the sidebar scenarios of
+page_latency.py. Sessions run as threads of one process (one server: shared
+caches, one GIL) or as separate processes (one session per server process).
+The report gives throughput, latency percentiles and resident memory per
+session. Everything runs offline: no scripted interaction opens an athlete
+profile, the only page that fetches from the network.
+
+    python benchmarks/load_test.py --sessions 8 --iterations 20
+    python benchmarks/load_test.py --sessions 8 --mode process --cold
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import numpy as np
+import streamlit as st
+from streamlit.logger import set_log_level
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.testing.v1 import AppTest
+
+from page_latency import PAGES, ROOT, SCENARIOS, apply_scenario, clear_caches
+
+PERCENTILES = [50, 90, 95, 99]
+
+# Resident memory is sampled this often while sessions run
+MEMORY_SAMPLE_SECONDS = 0.05
+
+
+def rss_bytes():
+    """Resident set size of this process (Linux /proc; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemorySampler(threading.Thread):
+    """Background thread recording the peak RSS until stopped."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.baseline = rss_bytes()
+        self.peak = self.baseline
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(MEMORY_SAMPLE_SECONDS):
+            self.peak = max(self.peak, rss_bytes())
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.peak = max(self.peak, rss_bytes())
+
+
+@contextmanager
+def shared_runtime():
+    """
+    Lets AppTests run in several threads at once.
+
+    Each AppTest run installs its own mock Runtime singleton and clears it
+    when it finishes, so a run ending in one thread pulls the runtime out
+    from under the runs of the others ("Runtime hasn't been created!").
+    While this is active, a cleared singleton falls back to one shared mock
+    runtime, as all sessions of a real server share one Runtime.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    instance, exists = Runtime.__dict__["instance"], Runtime.__dict__["exists"]
+    Runtime.instance = classmethod(lambda cls: cls._instance or runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+    try:
+        yield runtime
+    finally:
+        Runtime.instance, Runtime.exists = instance, exists
+
+
+def run_session(session_id, pages, iterations, think_time, timeout, start_barrier=None):
+    """
+    One simulated user. For each page, `iterations` times: open the page
+    (run "open"), set the next scenario's filters and rerun (run named after
+    the scenario). Sessions start at different scenarios so concurrent users
+    do not all ask for the same filter key at once.
+
+    Returns:
+        list: One dict per run (session, page, scenario, start, latency_ms, errors)
+    """
+    scenarios = list(SCENARIOS.items())
+    runs = []
+    if start_barrier is not None:
+        start_barrier.wait()
+
+    def timed(at, page, name):
+        started, start = time.time(), time.perf_counter()
+        try:
+            at.run()
+            errors, failed = len(at.exception), False
+        except Exception:
+            # Timeouts and runner failures count as errors; the session goes on
+            errors, failed = 1, True
+        runs.append({
+            "session": session_id,
+            "page": page,
+            "scenario": name,
+            # Wall clock, so runs of different processes line up
+            "start": started,
+            "latency_ms": (time.perf_counter() - start) * 1000,
+            "errors": errors,
+        })
+        if think_time:
+            time.sleep(think_time)
+        return not failed
+
+    for page in pages:
+        for i in range(iterations):
+            name, scenario = scenarios[(session_id + i) % len(scenarios)]
+            # A fresh session each time, so filters do not pile up
+            at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+            if timed(at, page, "open") and apply_scenario(at, scenario):
+                timed(at, page, name)
+    return runs
+
+
+def _warm_up(pages, timeout):
+    """
+    Imports the pages' libraries and runs each page once, one after another.
+    Threads that import a module or compile a page at the same time race in
+    the interpreter ("AST constructor recursion depth mismatch", orjson
+    OPT_NON_STR_KEYS errors from a half-imported plotly).
+    """
+    import pandas, plotly.express  # noqa: F401
+    for page in pages:
+        AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout).run()
+
+
+def _thread_sessions(sessions, pages, iterations, think_time, timeout, cold):
+    barrier = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def target(i):
+        results[i] = run_session(i, pages, iterations, think_time, timeout, barrier)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(sessions)]
+    with shared_runtime():
+        _warm_up(pages, timeout)
+        # The warm-up filled the caches; a cold run starts without them
+        if cold:
+            clear_caches()
+        sampler = MemorySampler()
+        sampler.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    sampler.stop()
+
+    runs = [run for session_runs in results for run in (session_runs or [])]
+    memory = {
+        "baseline_mb": sampler.baseline / 2 ** 20,
+        "peak_mb": sampler.peak / 2 ** 20,
+        # One process serves every session: the growth is shared by all of them
+        "per_session_mb": (sampler.peak - sampler.baseline) / 2 ** 20 / sessions,
+    }
+    return runs, memory
+
+
+def _process_worker(args):
+    session_id, pages, iterations, think_time, timeout, cold, start_at = args
+    set_log_level("error")
+    if cold:
+        clear_caches()
+    # Import the pages' libraries before measuring, so the baseline is a
+    # started server rather than a bare interpreter
+    import pandas, plotly.express  # noqa: F401
+    sampler = MemorySampler()
+    sampler.start()
+    time.sleep(max(0.0, start_at - time.time()))
+    runs = run_session(session_id, pages, iterations, think_time, timeout)
+    sampler.stop()
+    return runs, sampler.baseline, sampler.peak
+
+
+def _process_sessions(sessions, pages, iterations, think_time, timeout, cold):
+    # Spawned workers start together at a common wall-clock time
+    start_at = time.time() + 2.0 + 0.2 * sessions
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(sessions) as pool:
+        outputs = pool.map(_process_worker, [(i, pages, iterations, think_time, timeout, cold, start_at)
+                                             for i in range(sessions)])
+
+    runs = [run for session_runs, _, _ in outputs for run in session_runs]
+    peaks = np.array([peak for _, _, peak in outputs]) / 2 ** 20
+    growth = np.array([peak - baseline for _, baseline, peak in outputs]) / 2 ** 20
+    memory = {
+        "baseline_mb": float(np.mean([baseline for _, baseline, _ in outputs]) / 2 ** 20),
+        "peak_mb": float(peaks.max()),
+        "total_peak_mb": float(peaks.sum()),
+        # Each session has its own process: its whole growth is its own
+        "per_session_mb": float(growth.mean()),
+    }
+    return runs, memory
+
+
+def latency_summary(latencies):
+    latencies = np.asarray(latencies, dtype=float)
+    if latencies.size == 0:
+        return {}
+    summary = {f"p{p}": round(float(np.percentile(latencies, p)), 2) for p in PERCENTILES}
+    summary.update(mean=round(float(latencies.mean()), 2), max=round(float(latencies.max()), 2),
+                   runs=int(latencies.size))
+    return summary
+
+
+def summarize_runs(runs):
+    """Throughput and latency of all runs, and per page, where page opens ("open") are kept apart from filter reruns."""
+    starts = np.array([run["start"] for run in runs])
+    ends = starts + np.array([run["latency_ms"] for run in runs]) / 1000
+    wall = float(ends.max() - starts.min()) if runs else 0.0
+
+    summary = {
+        "wall_seconds": round(wall, 3),
+        "runs": len(runs),
+        "errors": int(sum(run["errors"] for run in runs)),
+        "throughput_runs_per_s": round(len(runs) / wall, 3) if wall else None,
+        "latency_ms": latency_summary([run["latency_ms"] for run in runs]),
+        "pages": {},
+    }
+    for page in sorted({run["page"] for run in runs}):
+        page_runs = [run for run in runs if run["page"] == page]
+        summary["pages"][page] = {
+            "open_ms": latency_summary([run["latency_ms"] for run in page_runs if run["scenario"] == "open"]),
+            "rerun_ms": latency_summary([run["latency_ms"] for run in page_runs if run["scenario"] != "open"]),
+            "errors": int(sum(run["errors"] for run in page_runs)),
+        }
+    return summary
+
+
+def run_load_test(sessions=4, pages=PAGES, iterations=10, mode="thread", think_time=0.0, timeout=300, cold=False):
+    """
+    Runs `sessions` concurrent sessions and summarizes them.
+
+    With cold=True every cache is cleared first, so all sessions hit the
+    first load_data/cache_resource builds together (the cache stampede of a
+    fresh deployment).
+    """
+    if mode == "thread":
+        runs, memory = _thread_sessions(sessions, pages, iterations, think_time, timeout, cold)
+    else:
+        runs, memory = _process_sessions(sessions, pages, iterations, think_time, timeout, cold)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mode": mode,
+        "sessions": sessions,
+        "iterations": iterations,
+        "think_time_s": think_time,
+        "cold": cold,
+        "streamlit": st.__version__,
+        "data_dir": os.environ.get("PARIS2024_DATA_DIR", "data"),
+        "memory": {key: round(value, 2) for key, value in memory.items()},
+    }
+    report.update(summarize_runs(runs))
+    return report
+
+
+def format_report(report):
+    latency = report["latency_ms"]
+    lines = [
+        f"{report['sessions']} {report['mode']} sessions, {report['runs']} runs in {report['wall_seconds']:.1f} s"
+        f" -> {report['throughput_runs_per_s']} runs/s, {report['errors']} errors",
+        f"latency p50 {latency['p50']:.0f} ms  p95 {latency['p95']:.0f} ms  p99 {latency['p99']:.0f} ms"
+        f"  max {latency['max']:.0f} ms",
+        f"memory baseline {report['memory']['baseline_mb']:.0f} MB  peak {report['memory']['peak_mb']:.0f} MB"
+        f"  per session {report['memory']['per_session_mb']:.1f} MB",
+    ]
+    for page, result in report["pages"].items():
+        rerun = result["rerun_ms"]
+        lines.append(f"  {page:<28} open p50 {result['open_ms']['p50']:6.0f} ms"
+                     + (f"  rerun p50 {rerun['p50']:6.0f} ms  p99 {rerun['p99']:6.0f} ms" if rerun else ""))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run concurrent simulated sessions against the pages.")
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread",
+                        help="thread: one server process; process: one process per session")
+    parser.add_argument("--pages", nargs="+", default=PAGES, help="Pages each session visits, in order")
+    parser.add_argument("--iterations", type=int, default=10, help="Page visits (open + filter change) per page and session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Pause between runs, in seconds")
+    parser.add_argument("--cold", action="store_true", help="Clear every cache first (cache stampede)")
+    parser.add_argument("--timeout", type=float, default=300, help="Timeout of one run, in seconds")
+    parser.add_argument("--data-dir", help="Dataset directory to run the pages on (see benchmarks/synthetic_data.py)")
+    parser.add_argument("--output", default="bench_load.json", help="Where to write the JSON report")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    if args.data_dir:
+        os.environ["PARIS2024_DATA_DIR"] = os.path.abspath(args.data_dir)
+    os.chdir(ROOT)
+    set_log_level("error")
+
+    report = run_load_test(args.sessions, args.pages, args.iterations, args.mode, args.think_time,
+                           args.timeout, args.cold)
+    print(format_report(report), file=sys.stderr)
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}", file=sys.stderr)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
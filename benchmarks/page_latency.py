@@ -0,0 +1,275 @@
+"""
+Page rerun latency benchmark.
+
+Drives every page headlessly with streamlit.testing.v1.AppTest over a matrix
+of sidebar filter scenarios and writes cold/warm rerun times, percentiles and
+peak memory to a JSON report. With --baseline, the report is compared to a
+stored one and the run fails on regressions.
+
+    python benchmarks/page_latency.py --output bench_report.json
+    python benchmarks/page_latency.py --baseline benchmarks/baseline.json
+    python benchmarks/page_latency.py --data-dir data_x10 --output bench_x10.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import streamlit as st
+from streamlit.logger import set_log_level
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = [
+    "1_Overview.py",
+    "pages/2_Global_Analysis.py",
+    "pages/Athletes.py",
+    "pages/Sports_and_events.py",
+    "pages/Torch_route_page.py",
+]
+
+# Sidebar filter scenarios: (widget type, label keyword, value). Widgets are
+# matched by keyword so one scenario works on every page that has the filter;
+# a multiselect value n picks the first n options, so scenarios do not depend
+# on the exact dataset. Filters a page does not have are skipped.
+SCENARIOS = {
+    "no_filter": [],
+    "one_country": [("multiselect", "Countr", 1)],
+    "many_countries": [("multiselect", "Countr", 15)],
+    "continent_sports": [("multiselect", "Continent", 1), ("multiselect", "Sports", 3)],
+    "medal_checkboxes": [("checkbox", "Silver", False), ("checkbox", "Bronze", False),
+                         ("multiselect", "Medals", 1)],
+}
+
+PERCENTILES = [50, 90, 99]
+
+# A timing only counts as a regression when it is both this much slower in
+# relative terms and this many milliseconds slower, so noise on fast reruns
+# does not fail the comparison
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 25.0
+
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def apply_scenario(at, scenario):
+    """Sets the scenario's sidebar widgets; returns the filters that were applied."""
+    applied = []
+    for kind, keyword, value in scenario:
+        widgets = [w for w in getattr(at.sidebar, kind) if keyword.lower() in str(w.label).lower()]
+        if not widgets:
+            continue
+        widget = widgets[0]
+        if kind == "multiselect":
+            widget.set_value(list(widget.options[:value]))
+        else:
+            widget.set_value(value)
+        applied.append(f"{widget.label}={widget.value}")
+    return applied
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, [str(e.value) for e in at.exception]
+
+
+def summarize(times):
+    times = np.asarray(times, dtype=float)
+    summary = {f"p{p}": round(float(np.percentile(times, p)), 2) for p in PERCENTILES}
+    summary.update(mean=round(float(times.mean()), 2), min=round(float(times.min()), 2),
+                   max=round(float(times.max()), 2), runs=len(times))
+    return summary
+
+
+def peak_memory_mb(path, scenario, timeout):
+    """Peak Python heap of a cold first load followed by one scenario rerun."""
+    clear_caches()
+    tracemalloc.start()
+    try:
+        at = AppTest.from_file(path, default_timeout=timeout)
+        at.run()
+        apply_scenario(at, scenario)
+        at.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2 ** 20, 2)
+
+
+def benchmark_page(page, scenarios, repeat, timeout, memory=True):
+    """
+    Benchmarks one page.
+
+    "cold" is the first run of a fresh session with every st.cache_data and
+    st.cache_resource entry cleared (for the first page of a run it also
+    includes importing the page's libraries). For each scenario, "first" is
+    the rerun right after the filters change (cache misses on the new filter
+    key) and "warm" the `repeat` reruns that follow with the same filters.
+
+    Args:
+        page (str): Page path relative to the repository root
+        scenarios (dict): Scenario name -> filter list, see SCENARIOS
+        repeat (int): Warm reruns per scenario
+        timeout (float): AppTest timeout of one run, in seconds
+        memory (bool): Also measure the peak heap of each scenario
+
+    Returns:
+        dict: "cold_ms", "errors" and "scenarios" (name -> applied filters,
+            first_ms, warm percentiles, peak_memory_mb)
+    """
+    path = os.path.join(ROOT, page)
+    clear_caches()
+    at = AppTest.from_file(path, default_timeout=timeout)
+    cold_ms, errors = timed_run(at)
+
+    results = {}
+    for name, scenario in scenarios.items():
+        at = AppTest.from_file(path, default_timeout=timeout)
+        at.run()
+        applied = apply_scenario(at, scenario)
+        if scenario and not applied:
+            continue
+
+        first_ms, first_errors = timed_run(at)
+        warm = []
+        for _ in range(repeat):
+            elapsed, run_errors = timed_run(at)
+            warm.append(elapsed)
+            first_errors += run_errors
+        errors += first_errors
+
+        results[name] = {
+            "applied": applied,
+            "first_ms": round(first_ms, 2),
+            "warm": summarize(warm),
+        }
+        if memory:
+            results[name]["peak_memory_mb"] = peak_memory_mb(path, scenario, timeout)
+
+    return {"cold_ms": round(cold_ms, 2), "errors": sorted(set(errors)), "scenarios": results}
+
+
+def run_benchmarks(pages=PAGES, scenarios=SCENARIOS, repeat=5, timeout=120, memory=True):
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "repeat": repeat,
+        "pages": {},
+    }
+    for page in pages:
+        report["pages"][page] = benchmark_page(page, scenarios, repeat, timeout, memory)
+        print(format_page(page, report["pages"][page]), file=sys.stderr)
+    return report
+
+
+def format_page(page, result):
+    lines = [f"{page}: cold {result['cold_ms']:.0f} ms" + (f"  ERRORS: {len(result['errors'])}" if result["errors"] else "")]
+    for name, scenario in result["scenarios"].items():
+        warm = scenario["warm"]
+        memory = f"  peak {scenario['peak_memory_mb']:.1f} MB" if "peak_memory_mb" in scenario else ""
+        lines.append(f"  {name:<18} first {scenario['first_ms']:7.0f} ms  warm p50 {warm['p50']:6.0f} ms"
+                     f"  p90 {warm['p90']:6.0f} ms{memory}")
+    return "\n".join(lines)
+
+
+def compare_reports(report, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Timings of `report` that regressed against `baseline`.
+
+    Compared metrics: each page's cold_ms and each scenario's first_ms and
+    warm p50/p90. Pages or scenarios missing from the baseline are ignored.
+
+    Returns:
+        list: One dict per regression (page, scenario, metric, baseline,
+            current, change as a ratio)
+    """
+    regressions = []
+
+    def check(page, scenario, metric, old, new):
+        if old is None or new is None:
+            return
+        if new > old * (1 + tolerance) and new - old > min_delta_ms:
+            regressions.append({"page": page, "scenario": scenario, "metric": metric,
+                                "baseline": old, "current": new, "change": round(new / old - 1, 3) if old else None})
+
+    for page, result in report["pages"].items():
+        old_page = baseline.get("pages", {}).get(page)
+        if old_page is None:
+            continue
+        check(page, None, "cold_ms", old_page.get("cold_ms"), result["cold_ms"])
+        for name, scenario in result["scenarios"].items():
+            old = old_page.get("scenarios", {}).get(name)
+            if old is None:
+                continue
+            check(page, name, "first_ms", old.get("first_ms"), scenario["first_ms"])
+            for p in ("p50", "p90"):
+                check(page, name, f"warm_{p}", old.get("warm", {}).get(p), scenario["warm"][p])
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark page rerun latency with Streamlit AppTest.")
+    parser.add_argument("--pages", nargs="+", default=PAGES, help="Pages to run, relative to the repository root")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=5, help="Warm reruns per scenario")
+    parser.add_argument("--timeout", type=float, default=120, help="Timeout of one run, in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory passes")
+    parser.add_argument("--output", default="bench_report.json", help="Where to write the JSON report")
+    parser.add_argument("--data-dir", help="Dataset directory to run the pages on (see benchmarks/synthetic_data.py)")
+    parser.add_argument("--baseline", help="Report to compare against; regressions exit with status 1")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown before a timing is a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help="Slowdowns smaller than this are never regressions")
+    args = parser.parse_args(argv)
+
+    # Pages read the dataset through utils.ingest.DATA_DIR, resolved from the
+    # working directory and PARIS2024_DATA_DIR when the first page imports it
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    if args.data_dir:
+        os.environ["PARIS2024_DATA_DIR"] = os.path.abspath(args.data_dir)
+    os.chdir(ROOT)
+    set_log_level("error")
+    scenarios = {name: SCENARIOS[name] for name in args.scenarios}
+    report = run_benchmarks(args.pages, scenarios, args.repeat, args.timeout, memory=not args.no_memory)
+    report["data_dir"] = os.environ.get("PARIS2024_DATA_DIR", "data")
+
+    status = 0
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance, args.min_delta_ms)
+        report["baseline"] = {"path": args.baseline, "created": baseline.get("created"), "regressions": regressions}
+        for r in regressions:
+            where = r["page"] + (f" [{r['scenario']}]" if r["scenario"] else "")
+            print(f"REGRESSION {where} {r['metric']}: {r['baseline']:.0f} -> {r['current']:.0f} ms", file=sys.stderr)
+        if regressions:
+            status = 1
+        else:
+            print("No regressions against the baseline", file=sys.stderr)
+
+    if any(result["errors"] for result in report["pages"].values()):
+        status = status or 2
+
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {output}", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
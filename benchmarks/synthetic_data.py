@@ -0,0 +1,259 @@
+"""
+Synthetic, scaled copies of the dataset for load testing.
+
+The source data is tiled `scale` times. Tile 0 is the original data; every
+other tile is a copy with its own athlete and team codes, event names
+("Men's 100m #2"), URLs and shuffled athlete names, applied consistently in
+every file, so each tile is referentially complete on its own: teams list
+their tile's athletes, medals and results point at their tile's athletes,
+teams and events, and schedules hold their tile's events. Because whole
+tiles are copied, the real skew of the source (a few countries and
+disciplines holding most athletes and medals) is kept at every scale.
+
+    python benchmarks/synthetic_data.py --scale 10 --output data_x10
+    PARIS2024_DATA_DIR=data_x10 streamlit run 1_Overview.py
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+from utils.ingest import parse_list, read_csvs
+
+# Tile k adds k * CODE_STRIDE to numeric athlete codes (real ones are 7 digits)
+CODE_STRIDE = 10 ** 7
+
+# Files that are tiled; all other CSV files are copied unchanged
+TILED_FILES = ["athletes.csv", "teams.csv", "events.csv", "medals.csv", "medallists.csv", "schedules.csv"]
+
+
+def tile_codes(codes, k):
+    """Athlete codes shifted by k strides, team codes suffixed: "DIVW3MTEAM2-CHN01~3"."""
+    if k == 0:
+        return codes
+    numeric = pd.to_numeric(codes, errors="coerce")
+    shifted = (numeric + k * CODE_STRIDE).astype("Int64").astype(str)
+    return shifted.where(numeric.notna(), codes.astype(str) + f"~{k}").where(codes.notna())
+
+
+def _tile_code(code, k):
+    # Scalar tile_codes, for codes inside list columns
+    if k == 0:
+        return code
+    return str(int(code) + k * CODE_STRIDE) if str(code).isdigit() else f"{code}~{k}"
+
+
+def tile_labels(values, k):
+    """Event names and URLs of tile k: "Men's 100m" -> "Men's 100m #2"."""
+    if k == 0:
+        return values
+    return values.where(values.isna(), values.astype(str) + f" #{k + 1}")
+
+
+def tile_url(values, k):
+    if k == 0:
+        return values
+    return values.where(values.isna(), values.astype(str) + f"-{k + 1}")
+
+
+def _tile_list(parsed, values, func):
+    # List columns are stored as Python list literals; empty cells stay as they are
+    return pd.Series([str([func(item) for item in items]) if items else value
+                      for items, value in zip(parsed, values)], index=values.index)
+
+
+def split_name(name):
+    """("FAMILY", "Given") of an athletes.csv name: family names are written in capitals."""
+    tokens = str(name).split()
+    # Mostly capitals, so "McKELLAR" is a family name too
+    family = [t for t in tokens if sum(c.isupper() for c in t) >= sum(c.islower() for c in t)]
+    given = [t for t in tokens if t not in family]
+    return " ".join(family), " ".join(given)
+
+
+class Tiler:
+    """Holds the parsed source data and writes tile after tile."""
+
+    def __init__(self, data_dir, seed=0):
+        result_paths = sorted(glob.glob(os.path.join(data_dir, "results", "*.csv")))
+        paths = [os.path.join(data_dir, name) for name in TILED_FILES + ["medals_total.csv"]] + result_paths
+        frames = read_csvs(paths)
+        self.source = dict(zip(TILED_FILES, frames))
+        self.medals_total = frames[len(TILED_FILES)]
+        # All results files in one frame so a tile is a few column operations;
+        # (file, columns, dtypes, first row, last row + 1) splits it back
+        results = [(os.path.basename(path), frame)
+                   for path, frame in zip(result_paths, frames[len(TILED_FILES) + 1:])]
+        bounds = np.cumsum([0] + [len(frame) for _, frame in results])
+        self.result_files = [(name, list(frame.columns), frame.dtypes.to_dict(), bounds[i], bounds[i + 1])
+                             for i, (name, frame) in enumerate(results)]
+        self.results = pd.concat([frame for _, frame in results], ignore_index=True) if results else None
+        self.rng = np.random.default_rng(seed)
+
+        athletes = self.source["athletes.csv"]
+        self.athlete_events = athletes["events"].map(parse_list)
+        names = athletes["name"].map(split_name)
+        self.family = np.array([family for family, _ in names], dtype=object)
+        self.given = np.array([given for _, given in names], dtype=object)
+        self.gender = athletes["gender"].to_numpy()
+
+        teams = self.source["teams.csv"]
+        self.team_codes = teams["athletes_codes"].map(parse_list)
+        self.team_names = teams["athletes"].map(parse_list)
+
+    def names(self, k):
+        """athlete code (str) -> "FAMILY Given" in tile k; given names are shuffled within gender."""
+        codes = tile_codes(self.source["athletes.csv"]["code"].astype(str), k)
+        if k == 0:
+            names = self.source["athletes.csv"]["name"].to_numpy()
+        else:
+            family = self.family[self.rng.permutation(len(self.family))]
+            given = self.given.copy()
+            for gender in pd.unique(self.gender):
+                idx = np.flatnonzero(self.gender == gender)
+                given[idx] = given[self.rng.permutation(idx)]
+            names = np.char.strip((family.astype(str) + " " + given.astype(str))).astype(object)
+            # Mononyms can pair with an empty family or given name
+            original = self.source["athletes.csv"]["name"].to_numpy()
+            names = np.where(names == "", original, names)
+        return pd.Series(names, index=codes.to_numpy())
+
+    def tile(self, k):
+        """All tiled files of tile k, as name -> DataFrame (results as "results/<file>")."""
+        src = self.source
+        names = self.names(k)
+        name_of = names.to_dict()
+        # medals.csv writes individual names given name first
+        display = names.map(lambda n: " ".join(reversed(split_name(n))).strip()) if k else names
+
+        athletes = src["athletes.csv"].copy()
+        athletes["code"] = tile_codes(athletes["code"].astype(str), k)
+        if k:
+            athletes["name"] = athletes["code"].map(names)
+            athletes["events"] = _tile_list(self.athlete_events, athletes["events"], lambda e: f"{e} #{k + 1}")
+
+        teams = src["teams.csv"].copy()
+        teams["code"] = tile_codes(teams["code"], k)
+        teams["events"] = tile_labels(teams["events"], k)
+        if k:
+            tiled_members = [[_tile_code(code, k) for code in codes] for codes in self.team_codes]
+            teams["athletes_codes"] = [str(codes) if codes else value
+                                       for codes, value in zip(tiled_members, teams["athletes_codes"])]
+            teams["athletes"] = [
+                str([name_of.get(code, old) for code, old in zip(codes, old_names)])
+                if codes and len(codes) == len(old_names) else value
+                for codes, old_names, value in zip(tiled_members, self.team_names, teams["athletes"])
+            ]
+
+        events = src["events.csv"].copy()
+        events["event"] = tile_labels(events["event"], k)
+
+        medals = src["medals.csv"].copy()
+        medals["code"] = tile_codes(medals["code"], k)
+        medals["event"] = tile_labels(medals["event"], k)
+        medals["url_event"] = tile_url(medals["url_event"], k)
+        if k:
+            medals["name"] = medals["code"].map(display).fillna(medals["name"])
+
+        medallists = src["medallists.csv"].copy()
+        medallists["code_athlete"] = tile_codes(medallists["code_athlete"].astype(str), k)
+        medallists["code_team"] = tile_codes(medallists["code_team"], k)
+        medallists["event"] = tile_labels(medallists["event"], k)
+        medallists["url_event"] = tile_url(medallists["url_event"], k)
+        if k:
+            medallists["name"] = medallists["code_athlete"].map(names).fillna(medallists["name"])
+
+        schedules = src["schedules.csv"].copy()
+        schedules["event"] = tile_labels(schedules["event"], k)
+        schedules["url"] = tile_url(schedules["url"], k)
+
+        tiles = {"athletes.csv": athletes, "teams.csv": teams, "events.csv": events,
+                 "medals.csv": medals, "medallists.csv": medallists, "schedules.csv": schedules}
+
+        if self.results is not None:
+            results = self.results.copy()
+            if k:
+                results["participant_code"] = tile_codes(results["participant_code"].astype(str), k)
+                people = results["participant_type"] != "Team"
+                results.loc[people, "participant_name"] = (
+                    results.loc[people, "participant_code"].map(names).fillna(results.loc[people, "participant_name"])
+                )
+            for column in ("event_code", "stage_code"):
+                results[column] = tile_codes(results[column], k)
+            results["event_name"] = tile_labels(results["event_name"], k)
+            results["event_stage"] = tile_labels(results["event_stage"], k)
+
+            for name, columns, dtypes, first, last in self.result_files:
+                part = results.iloc[first:last][columns]
+                tiles[f"results/{name}"] = part.astype(dtypes)
+
+        return tiles
+
+
+def generate(data_dir, output_dir, scale, seed=0, verbose=True):
+    """
+    Writes a dataset `scale` times the size of `data_dir` to `output_dir`.
+
+    Tiles are appended to the output files one at a time, so memory stays
+    at the size of one tile whatever the scale.
+
+    Returns:
+        dict: Output file name -> rows written
+    """
+    if os.path.abspath(data_dir) == os.path.abspath(output_dir):
+        raise ValueError("The output directory must differ from the source data directory")
+    os.makedirs(os.path.join(output_dir, "results"), exist_ok=True)
+
+    for path in glob.glob(os.path.join(data_dir, "*.csv")):
+        name = os.path.basename(path)
+        if name not in TILED_FILES and name != "medals_total.csv":
+            shutil.copyfile(path, os.path.join(output_dir, name))
+
+    tiler = Tiler(data_dir, seed)
+    rows = {}
+    start = time.perf_counter()
+    for k in range(scale):
+        for name, frame in tiler.tile(k).items():
+            frame.to_csv(os.path.join(output_dir, name), mode="w" if k == 0 else "a", header=(k == 0), index=False)
+            rows[name] = rows.get(name, 0) + len(frame)
+        if verbose and (k + 1) % max(1, scale // 10) == 0:
+            print(f"  tile {k + 1}/{scale} ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+
+    # Every tile repeats the source medals, so the table scales exactly
+    medals_total = tiler.medals_total.copy()
+    medals_total[["Gold", "Silver", "Bronze", "Total"]] *= scale
+    medals_total.to_csv(os.path.join(output_dir, "medals_total.csv"), index=False)
+    rows["medals_total.csv"] = len(medals_total)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a scaled synthetic copy of the dataset for load testing.")
+    parser.add_argument("--scale", type=int, default=10, help="Scale factor (number of tiles), e.g. 10, 100, 1000")
+    parser.add_argument("--data-dir", default=os.path.join(ROOT, "data"), help="Source dataset directory")
+    parser.add_argument("--output", help="Output directory (default: data_x<scale> next to the source)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the name shuffling")
+    args = parser.parse_args(argv)
+
+    if args.scale < 1:
+        parser.error("--scale must be at least 1")
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(args.data_dir)), f"data_x{args.scale}")
+
+    rows = generate(args.data_dir, output, args.scale, args.seed)
+    results = sum(n for name, n in rows.items() if name.startswith("results/"))
+    for name, n in sorted(rows.items()):
+        if not name.startswith("results/"):
+            print(f"{name:<20} {n:>12,}")
+    print(f"{'results/*.csv':<20} {results:>12,}")
+    print(f"Written to {output}; run the dashboard on it with PARIS2024_DATA_DIR={output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,51 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import pycountry_convert as pc
-import numpy as np
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.continents import add_continents
+from utils.medal_pivot import medal_table, medal_long
+from utils.medal_ranking import official_ranks, build_daily_standings, rank_history, standings_frame
+from utils.search_box import render_global_search
+from utils.ingest import data_path, read_table
+from utils.instrumentation import begin_run, lap, plotly_chart, render_debug_panel
+from utils.memory import select, share
+from utils.snapshots import pin_snapshot, render_snapshot_version
+
+begin_run("Global Analysis")
+
+# Every table of this rerun comes from one dataset snapshot; cached loaders
+# are keyed on its version, so a newly swapped-in snapshot gets new entries
+snapshot = pin_snapshot()
+version = snapshot["version"]
 
 st.title("Global Analysis")
 
 # --------------------------------------
 # LOAD BASE DATA
 # --------------------------------------
-raw_df = pd.read_csv("data/medals_total.csv")
-map_df = raw_df.loc[:, ["country_code", "country", "Total"]]
+# Loaded and enriched once per server and shared read-only by every session;
+# filters select rows with masks instead of copying
+@st.cache_resource(max_entries=2)
+def load_medals_total(version):
+    raw_df = read_table(data_path("medals_total.csv"))
 
+    # Add continent column
+    add_continents(raw_df)
+    return share(raw_df, "global analysis: medals_total")
 
-# --------------------------------------
-# Helper: Get continent
-# --------------------------------------
-def get_continent_code(country_name):
-    try:
-        country_code = pc.country_name_to_country_alpha2(country_name, cn_name_format="default")
-        continent_code = pc.country_alpha2_to_continent_code(country_code)
-        return continent_code
-    except:
-        return np.nan
 
+@st.cache_resource(max_entries=2)
+def load_medals(version):
+    medals = read_table(data_path("medals.csv"))
+    add_continents(medals)
+    return share(medals, "global analysis: medals")
 
-# Add continent column
-raw_df["continent"] = raw_df["country_code"].apply(get_continent_code)
-raw_df.loc[raw_df["country_code"] == "XKX", "continent"] = "EU"
-raw_df["continent"] = raw_df["continent"].fillna("Other")
+
+raw_df = load_medals_total(version)
+lap("data load (with continent enrichment)", rows_out=len(raw_df))
 
 
 # --------------------------------------
@@ -38,24 +55,25 @@ continent_list = sorted(raw_df["continent"].unique())
 country_list = sorted(raw_df["country"].unique())
 medal_list = ["Gold", "Silver", "Bronze"]
 
+with st.sidebar:
+    render_global_search(version)
+
 st.sidebar.title("Filters")
 
 selected_continent = st.sidebar.multiselect("Select Continent(s)", continent_list)
 selected_countries = st.sidebar.multiselect("Select Country/Countries", country_list)
 selected_medals = st.sidebar.multiselect("Select Medals", medal_list)
+lap("sidebar")
 
 # --------------------------------------
 # APPLY FILTERS SAFELY
 # --------------------------------------
-filtered_df = raw_df.copy()
-
-# continent
-if selected_continent:
-    filtered_df = filtered_df[filtered_df["continent"].isin(selected_continent)]
-
-# countries
-if selected_countries:
-    filtered_df = filtered_df[filtered_df["country"].isin(selected_countries)]
+filtered_df = select(
+    raw_df,
+    raw_df["continent"].isin(selected_continent) if selected_continent else None,
+    raw_df["country"].isin(selected_countries) if selected_countries else None,
+)
+lap("filtering", rows_in=len(raw_df), rows_out=len(filtered_df))
 
 # --------------------------------------
 # WORLD MAP (Filtered)
@@ -70,51 +88,35 @@ fig = px.choropleth(
     color_continuous_scale="Viridis",
     title="Total Medals per Country"
 )
-st.plotly_chart(fig, use_container_width=True)
+plotly_chart(fig, use_container_width=True)
 
 
 # --------------------------------------
 # MEDALS BY CONTINENT (Filtered + Optional Medal Filter)
 # --------------------------------------
-medal_df = filtered_df.copy()
-
-# melt medals
-if selected_medals:
-    medal_df = medal_df.melt(
-        id_vars=["country", "continent"],
-        value_vars=selected_medals,
-        var_name="medal",
-        value_name="count"
-    )
-else:
-    medal_df = medal_df.melt(
-        id_vars=["country", "continent"],
-        value_vars=medal_list,
-        var_name="medal",
-        value_name="count"
-    )
+# Use selected medals if any, otherwise default to all
+medals_to_use = selected_medals if selected_medals else medal_list
 
-# group
-grouped = medal_df.groupby(["continent", "medal"], as_index=False)["count"].sum()
+grouped = medal_long(medal_table(filtered_df, "continent", medals_to_use), medals_to_use)
+lap("aggregation: continents", rows_in=len(filtered_df), rows_out=len(grouped))
 
 fig = px.bar(grouped, x="continent", y="count", color="medal",
              title="Medals by Continent (Filtered)")
-st.plotly_chart(fig)
+plotly_chart(fig)
 
 
 # --------------------------------------
 # SUNBURST (Filtered)
 # --------------------------------------
-sunburst_df = pd.read_csv("data/medals.csv")
-sunburst_df["continent"] = sunburst_df["country_code"].apply(get_continent_code)
-sunburst_df.loc[sunburst_df["country_code"] == "KOS", "continent"] = "EU"
-sunburst_df["continent"] = sunburst_df["continent"].fillna("Other")
+medals = load_medals(version)
+lap("data load: medals with continents", rows_out=len(medals))
 
 # apply same continent/country filters
-if selected_continent:
-    sunburst_df = sunburst_df[sunburst_df["continent"].isin(selected_continent)]
-if selected_countries:
-    sunburst_df = sunburst_df[sunburst_df["country"].isin(selected_countries)]
+sunburst_df = select(
+    medals,
+    medals["continent"].isin(selected_continent) if selected_continent else None,
+    medals["country"].isin(selected_countries) if selected_countries else None,
+)
 
 fig = px.sunburst(
     sunburst_df,
@@ -122,28 +124,17 @@ fig = px.sunburst(
     color="continent",
     title="Distribution Of Medals By Continent, Country and Discipline (Filtered)"
 )
-st.plotly_chart(fig)
+plotly_chart(fig)
 
 
 # --------------------------------------
 # TOP 20 RANKING (Filtered + Medal Filter)
 # --------------------------------------
-ranking_df = filtered_df.copy()
-
-ranking_df = ranking_df.sort_values(
-    by=["Gold", "Silver", "Bronze"],
-    ascending=[False, False, False]
-).head(20)
+# Official ranking: Gold, then Silver, then Bronze; ties share a rank
+ranking_df = official_ranks(medal_table(filtered_df, ["country_code", "country"])).head(20)
+lap("aggregation: top 20 ranking", rows_in=len(filtered_df), rows_out=len(ranking_df))
 
-# Use selected medals if any, otherwise default to all
-medals_to_use = selected_medals if selected_medals else ["Gold", "Silver", "Bronze"]
-
-ranking_df = ranking_df.melt(
-    id_vars=["country_code", "country"],
-    value_vars=medals_to_use,
-    var_name="medal",
-    value_name="count"
-)
+ranking_df = medal_long(ranking_df.set_index(["country_code", "country"]), medals_to_use)
 
 fig = px.bar(
     ranking_df,
@@ -153,5 +144,63 @@ fig = px.bar(
     barmode="group",
     title="Top 20 Countries by Medals (Filtered)"
 )
-st.plotly_chart(fig)
+plotly_chart(fig)
+
+
+# --------------------------------------
+# MEDAL RACE (Daily Cumulative Standings)
+# --------------------------------------
+@st.cache_resource(max_entries=2)
+def load_daily_standings(version):
+    return build_daily_standings(read_table(data_path("medals.csv")))
+
+
+standings = load_daily_standings(version)
+
+race_df = standings_frame(standings, top=10)
+race_df["medal_date"] = race_df["medal_date"].astype(str)
+lap("aggregation: medal race", rows_out=len(race_df))
+
+fig = px.bar(
+    race_df,
+    x="Total",
+    y="country",
+    color="Gold",
+    orientation="h",
+    animation_frame="medal_date",
+    text="rank",
+    range_x=[0, race_df["Total"].max() * 1.1],
+    color_continuous_scale="YlOrBr",
+    title="Medal Race - Top 10 After Each Day"
+)
+fig.update_layout(yaxis=dict(autorange="reversed", title=None), height=500)
+plotly_chart(fig)
+
+# Rank movement of the filtered countries (top 10 of the final table by default)
+if selected_countries or selected_continent:
+    # medals_total.csv and medals.csv code some countries differently
+    # (SVN/SLV, XKX/KOS), so the standings' codes are looked up by name
+    code_of_country = dict(zip(standings["names"].values, standings["names"].index))
+    race_countries = [code_of_country[name] for name in filtered_df["country"] if name in code_of_country]
+else:
+    final_day = standings["ranks"][-1]
+    race_countries = standings["countries"][(final_day > 0) & (final_day <= 10)].tolist()
+
+history = rank_history(standings, race_countries[:20])
+history = history.rename(columns=standings["names"]).reset_index().melt(
+    id_vars="medal_date", var_name="country", value_name="rank"
+)
+
+fig = px.line(
+    history,
+    x="medal_date",
+    y="rank",
+    color="country",
+    markers=True,
+    title="Official Rank After Each Medal Day"
+)
+fig.update_layout(yaxis=dict(autorange="reversed", title="Rank"), xaxis_title="Date")
+plotly_chart(fig)
 
+render_snapshot_version(snapshot)
+render_debug_panel()
@@ -1,10 +1,8 @@
-import math
 import requests
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
-import ast
 import pycountry
 import pycountry_convert as pc
 import sys
@@ -14,6 +12,18 @@ from bs4 import BeautifulSoup
 # Add parent directory to path to access utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from utils.age_distribution import summarize_age_distribution, sample_points, build_summary_violin, build_points_violin
+from utils.athlete_cards import build_athlete_cards, athlete_card, load_results
+from utils.athlete_aggregates import build_athlete_cube, filter_cube, gender_grouping_sets, gender_counts, level_groups
+from utils.ingest import MEDAL_KINDS, data_path, log_progress, medal_model, parse_list, read_table, read_tables
+from utils.medal_ranking import build_medallist_counts, top_medallists
+from utils.search_box import load_search_index, render_global_search
+from utils.search_index import search
+from utils.relationship_graph import build_relationship_graph, teammates, athlete_coaches, coach_success, coach_name
+from utils.instrumentation import begin_run, lap, timed, plotly_chart, render_debug_panel
+from utils.memory import select, share
+from utils.snapshots import pin_snapshot, render_snapshot_version
+
 # ========== UPDATED SECTION - REPLACE OLD get_athlete_image FUNCTION ==========
 @st.cache_data(ttl=3600)  # Cache for 1 hour
 def get_athlete_data(name):
@@ -124,6 +134,13 @@ st.set_page_config(
     layout="wide"
 )
 
+begin_run("Athletes")
+
+# Every table of this rerun comes from one dataset snapshot; cached loaders
+# are keyed on its version, so a newly swapped-in snapshot gets new entries
+snapshot = pin_snapshot()
+version = snapshot["version"]
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -157,24 +174,11 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_df(path):
-    def safe_parse(x):
-        if isinstance(x, list):
-            return x
-        if pd.isna(x):
-            return []
-        if isinstance(x, str):
-            x = x.strip()
-            if x.startswith("[") and x.endswith("]"):
-                try:
-                    return ast.literal_eval(x)
-                except:
-                    return []
-            else:
-                return [x]
-        return []
-    
+# One parsed and enriched athletes table per server, shared read-only by every
+# session and every cached helper below (st.cache_data would hand each caller
+# its own copy)
+@st.cache_resource(max_entries=2)
+def load_df(path, version):
     def get_continent_code(ioc_code):
         IOC_FIXES = {
             "ALG": "DZA",  # Algeria
@@ -294,32 +298,34 @@ def load_df(path):
         }
         return continent_mapping.get(continent_code, 'Other')
         
-    df = pd.read_csv(path)
-    df["disciplines"] = df["disciplines"].apply(safe_parse)
-    df["events"] = df["events"].apply(safe_parse)
+    df = read_table(path)
+    df["disciplines"] = df["disciplines"].apply(parse_list)
+    df["events"] = df["events"].apply(parse_list)
     df["continent_code"] = df["country_code"].apply(get_continent_code)
     df["continent"] = df["continent_code"].apply(get_continent_name)
+    df["age"] = 2024 - pd.to_datetime(df["birth_date"]).dt.year
 
-    return df
+    return share(df, "athletes: athletes")
 
 # Load data
-df = load_df("data/athletes.csv")
-athletes = df.copy()
+athletes = load_df(data_path("athletes.csv"), version)
 
-@st.cache_data
-def load_additional_data():
-    nocs = pd.read_csv("data/nocs.csv")
-    events = pd.read_csv("data/events.csv")
-    medals = pd.read_csv("data/medals.csv")
-    return nocs, events, medals
+@st.cache_resource(max_entries=2)
+def load_additional_data(version):
+    nocs, events, medals = read_tables([data_path("nocs.csv"), data_path("events.csv"), data_path("medals.csv")])
+    return share(nocs, "athletes: nocs"), share(events, "athletes: events"), share(medals, "athletes: medals")
 
-nocs, events, medals = load_additional_data()
+nocs, events, medals = load_additional_data(version)
+lap("data load (with continent enrichment)", rows_out=len(athletes) + len(nocs) + len(events) + len(medals))
 
 # Title
 st.markdown('<p class="main-header">👤 Athlete Performance</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">The human story behind the medals</p>', unsafe_allow_html=True)
 
 # SIDEBAR FILTERS
+with st.sidebar:
+    render_global_search(version)
+
 st.sidebar.header("🎯 Global Filters")
 
 # Country filter
@@ -366,30 +372,69 @@ show_bronze = st.sidebar.checkbox("Bronze", value=True)
 
 st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip**: Use filters to explore athletes from specific regions or sports!")
+lap("sidebar")
+
+# Normalized, hashable view of the athlete filters. Cached helpers below are
+# keyed on it, so each filter combination is only computed once.
+athlete_filter_key = (
+    version,
+    tuple(sorted(selected_countries)),
+    tuple(sorted(selected_continents)),
+    gender_options,
+    tuple(sorted(selected_sports)),
+)
+
+# Apply filters: the masks are combined and applied once. The result is
+# shared between sessions with the same filters (the unfiltered one is the
+# athletes table itself), so it must not be modified.
+@st.cache_resource(max_entries=64)
+def apply_athlete_filters(filter_key):
+    version, selected_countries, selected_continents, gender_options, selected_sports = filter_key
+    athletes = load_df(data_path("athletes.csv"), version)
+    nocs, events, medals = load_additional_data(version)
+    masks = []
+
+    # Filter by countries
+    if selected_countries:
+        country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
+        masks.append(athletes['country_code'].isin(country_codes))
+
+    # Filter by continents
+    if selected_continents:
+        masks.append(athletes['continent'].isin(selected_continents))
+
+    # Filter by gender
+    if gender_options != "All":
+        masks.append(athletes['gender'] == gender_options)
+
+    # Filter by sports/disciplines
+    if selected_sports:
+        masks.append(athletes['disciplines'].apply(
+            lambda x: any(sport in x for sport in selected_sports) if isinstance(x, list) else False
+        ))
 
-# Apply filters
-filtered_athletes = athletes.copy()
+    return select(athletes, *masks)
 
-# Filter by countries
-if selected_countries:
-    country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
-    filtered_athletes = filtered_athletes[filtered_athletes['country_code'].isin(country_codes)]
+filtered_athletes = apply_athlete_filters(athlete_filter_key)
+lap("filtering", rows_in=len(athletes), rows_out=len(filtered_athletes))
 
-# Filter by continents
-if selected_continents:
-    filtered_athletes = filtered_athletes[filtered_athletes['continent'].isin(selected_continents)]
+# Athlete counts by (continent, country, gender, disciplines), built once;
+# the gender KPIs and chart read grouping sets of it per filter key
+@st.cache_data(max_entries=2)
+def load_athlete_cube(version):
+    return build_athlete_cube(load_df(data_path("athletes.csv"), version))
 
-# Filter by gender
-if gender_options != "All":
-    filtered_athletes = filtered_athletes[filtered_athletes['gender'] == gender_options]
+@st.cache_data(max_entries=64)
+def load_gender_sets(filter_key):
+    version, selected_countries, selected_continents, gender_options, selected_sports = filter_key
+    nocs, events, medals = load_additional_data(version)
+    country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].tolist() if selected_countries else []
 
-# Filter by sports/disciplines
-if selected_sports:
-    filtered_athletes = filtered_athletes[
-        filtered_athletes['disciplines'].apply(
-            lambda x: any(sport in x for sport in selected_sports) if isinstance(x, list) else False
-        )
-    ]
+    cube = filter_cube(load_athlete_cube(version), country_codes, selected_continents, gender_options, selected_sports)
+    return gender_grouping_sets(cube)
+
+gender_sets = load_gender_sets(athlete_filter_key)
+lap("aggregation: gender grouping sets", rows_out=len(gender_sets))
 
 # Filter medals by medal types
 medal_type_map = {'Gold': 'Gold Medal', 'Silver': 'Silver Medal', 'Bronze': 'Bronze Medal'}
@@ -423,51 +468,156 @@ with col3:
     st.metric("🏅 Disciplines", unique_disciplines)
 
 with col4:
-    if 'gender' in filtered_athletes.columns:
-        female_count = len(filtered_athletes[filtered_athletes['gender'] == 'Female'])
-        male_count = len(filtered_athletes[filtered_athletes['gender'] == 'Male'])
+    world_gender = gender_counts(gender_sets, "World")
+    if not world_gender.empty:
+        female_count = world_gender.get('Female', 0)
+        male_count = world_gender.get('Male', 0)
         if female_count + male_count > 0:
             female_ratio = (female_count / (female_count + male_count)) * 100
             st.metric("🚺 Female Ratio", f"{female_ratio:.1f}%")
 
 st.markdown("---")
+lap("KPI computation")
 
 st.subheader("🎯 Athlete Profile Search")
 
-selected_athlete = st.selectbox(label="Select an athlete:",
-             options=filtered_athletes["code"],
-             index=None,
-             placeholder="Choose an athlete...",
-             format_func=lambda opt: str(np.array(filtered_athletes.loc[filtered_athletes["code"] == opt, "name"])[0])
-             )
-
-# ========== UPDATED ATHLETE PROFILE SECTION ==========
-if selected_athlete:
-    athlete = (filtered_athletes.loc[
-            filtered_athletes["code"] == selected_athlete,
-            ["name", "country", "height", "weight", "disciplines", "events", "coach"]
-        ]
-        .iloc[0]
-        .to_dict()
+# Materialized athlete cards (bio, medals, teams, best results), built once
+# and shared read-only between sessions
+@st.cache_resource(max_entries=2)
+def load_athlete_cards(version):
+    _, team_members, athlete_medals = medal_model(version)
+    return build_athlete_cards(load_df(data_path("athletes.csv"), version), athlete_medals, team_members,
+                               load_results(progress=log_progress))
+
+# Athlete - team - coach - event graph (CSR adjacency), built once and shared
+# read-only between sessions
+@st.cache_resource(max_entries=2)
+def load_relationship_graph(version):
+    nocs, events, medals = load_additional_data(version)
+    _, _, athlete_medals = medal_model(version)
+    teams, coaches = read_tables([data_path("teams.csv"), data_path("coaches.csv")])
+    return build_relationship_graph(
+        load_df(data_path("athletes.csv"), version),
+        teams,
+        coaches,
+        events,
+        athlete_medals["code_athlete"].unique()
     )
 
-    # Fetch enhanced athlete data from olympics.com
-    athlete_data = get_athlete_data(athlete['name'])
-    
-    if isinstance(athlete["coach"], float) and math.isnan(athlete["coach"]):
-        athlete["coach"] = "Not available"
+def render_athlete_network(graph, athlete_code):
+    mates = teammates(graph, athlete_code)
+    coach_codes = athlete_coaches(graph, athlete_code)
+    if not mates and not coach_codes:
+        return
+
+    with st.expander("🤝 Teammates & Coaches"):
+        if mates:
+            names = graph["athlete_names"]
+            st.markdown("**Teammates:** " + ", ".join(names.get(code, code) for code in mates))
+
+        if coach_codes:
+            coach_rows = []
+            for code in coach_codes:
+                coached, medallists, rate = coach_success(graph, code)
+                coach_rows.append({
+                    "Coach": coach_name(graph, code),
+                    "Athletes coached": coached,
+                    "Medallists": medallists,
+                    "Success rate": f"{rate:.0%}",
+                })
+            st.dataframe(pd.DataFrame(coach_rows), use_container_width=True, hide_index=True)
+
+# Profile search runs as a fragment: picking an athlete (and the network
+# fetch that follows) only reruns this section.
+@st.fragment
+@timed("athlete profile")
+def render_athlete_profile(filtered_athletes):
+    athlete_cards = load_athlete_cards(version)
+    card_names = athlete_cards["cards"]["name"]
+
+    # Typeahead over the search index narrows the picker to the best matches
+    athlete_query = st.text_input("🔎 Find an athlete:", placeholder="Type a name, typos are fine")
+    athlete_options = filtered_athletes["code"]
+    if athlete_query:
+        matches = search(load_search_index(version), athlete_query, k=25, kinds=["athlete"])["key"]
+        athlete_options = matches[matches.isin(athlete_options.astype(str))].astype(athlete_options.dtype)
+
+    selected_athlete = st.selectbox(label="Select an athlete:",
+                 options=athlete_options,
+                 index=0 if athlete_query and len(athlete_options) else None,
+                 placeholder="Choose an athlete...",
+                 format_func=lambda opt: str(card_names.get(str(opt), opt))
+                 )
+
+    # ========== UPDATED ATHLETE PROFILE SECTION ==========
+    if selected_athlete:
+        graph = load_relationship_graph(version)
+        # Everything shown below comes from the precomputed card
+        athlete = athlete_card(athlete_cards, selected_athlete)
+
+        st.subheader("✨ Selected Athlete Profile")
+
+        col1, col2 = st.columns([1, 3], gap="large")
+
+        with col2:
+            st.markdown(f"### {athlete['name']}")
+            st.markdown(f"**Country:** {athlete['country']}")
+
+            # Display height only if valid (not 0, not NaN)
+            if pd.notna(athlete['height']) and athlete['height'] > 0:
+                st.markdown(f"**Height:** {athlete['height']} cm")
+            else:
+                st.markdown(f"**Height:** Not available")
 
-    st.subheader("✨ Selected Athlete Profile")
+            # Display weight only if valid (not 0, not NaN)
+            if pd.notna(athlete['weight']) and athlete['weight'] > 0:
+                st.markdown(f"**Weight:** {athlete['weight']} kg")
+            else:
+                st.markdown(f"**Weight:** Not available")
 
-    col1, col2 = st.columns([1, 3], gap="large")
+            st.markdown(f"**Sport(s):** {athlete['disciplines']}")
+            st.markdown(f"**Event(s):** {athlete['events']}")
+            st.markdown(f"**Coach(s):** {athlete['coaches'] or 'Not available'}")
 
-    with col1:
-        # Display image from olympics.com if available
-        if athlete_data and athlete_data['image_url']:
-            try:
-                st.image(athlete_data['image_url'], width=200)
-            except:
-                # Fallback to placeholder if image fails to load
+            if athlete['medals']:
+                st.markdown(f"**Medals:** 🥇 {athlete['gold']}  🥈 {athlete['silver']}  🥉 {athlete['bronze']}")
+                for medal in athlete['medals'].split(" | "):
+                    st.markdown(f"- {medal}")
+
+        if not athlete['results'].empty:
+            with st.expander("📋 Results (best stage reached per event)"):
+                st.dataframe(athlete['results'], use_container_width=True, hide_index=True)
+
+        render_athlete_network(graph, str(selected_athlete))
+
+        # Fetch enhanced athlete data from olympics.com, once the card is on screen
+        athlete_data = get_athlete_data(athlete['name'])
+
+        with col1:
+            # Display image from olympics.com if available
+            if athlete_data and athlete_data['image_url']:
+                try:
+                    st.image(athlete_data['image_url'], width=200)
+                except:
+                    # Fallback to placeholder if image fails to load
+                    st.markdown(
+                        """
+                        <div style="
+                            width:200px;
+                            height:200px;
+                            border-radius:50%;
+                            background:#e5e7eb;
+                            display:flex;
+                            align-items:center;
+                            justify-content:center;
+                            font-size:48px;
+                            color:#6b7280;">
+                            👤
+                        </div>
+                        """,
+                        unsafe_allow_html=True
+                    )
+            else:
                 st.markdown(
                     """
                     <div style="
@@ -485,221 +635,195 @@ if selected_athlete:
                     """,
                     unsafe_allow_html=True
                 )
-        else:
-            st.markdown(
-                """
-                <div style="
-                    width:200px;
-                    height:200px;
-                    border-radius:50%;
-                    background:#e5e7eb;
-                    display:flex;
-                    align-items:center;
-                    justify-content:center;
-                    font-size:48px;
-                    color:#6b7280;">
-                    👤
-                </div>
-                """,
-                unsafe_allow_html=True
-            )
-
-    with col2:
-        st.markdown(f"### {athlete['name']}")
-        st.markdown(f"**Country:** {athlete['country']}")
-        
-        # Display height only if valid (not 0, not NaN)
-        if pd.notna(athlete['height']) and athlete['height'] > 0:
-            st.markdown(f"**Height:** {athlete['height']} cm")
-        else:
-            st.markdown(f"**Height:** Not available")
-        
-        # Display weight only if valid (not 0, not NaN)
-        if pd.notna(athlete['weight']) and athlete['weight'] > 0:
-            st.markdown(f"**Weight:** {athlete['weight']} kg")
-        else:
-            st.markdown(f"**Weight:** Not available")
-        
-        disciplines_str = ', '.join(athlete['disciplines'])
-        st.markdown(f"**Sport(s):** {disciplines_str}")
-        events_str = ', '.join(athlete['events'])
-        st.markdown(f"**Event(s):** {events_str}")
-        coach_str = athlete['coach'].replace('.<br>', ', ')
-        st.markdown(f"**Coach(s):** {coach_str}")
-        
-        # Add link to full profile
-        if athlete_data and athlete_data['url']:
-            st.markdown(f"🔗 [View full profile on Olympics.com]({athlete_data['url']})")
-    
-    # Add expandable section for biography and achievements
-    if athlete_data:
-        if athlete_data['bio']:
-            with st.expander("📖 Biography"):
-                st.write(athlete_data['bio'])
-        
-        if athlete_data['achievements']:
-            with st.expander("🏆 Recent Achievements"):
-                for achievement in athlete_data['achievements']:
-                    st.write(f"- {achievement}")
-# ========== END OF UPDATED ATHLETE PROFILE SECTION ==========
 
-st.markdown("---")
+            # Add link to full profile
+            if athlete_data and athlete_data['url']:
+                st.markdown(f"🔗 [View full profile on Olympics.com]({athlete_data['url']})")
 
-# age distribution
-filtered_athletes["age"] = 2024 - pd.to_datetime(filtered_athletes["birth_date"]).dt.year
-
-athletes_exploded = filtered_athletes.explode("disciplines")
-
-fig_age = px.violin(
-    athletes_exploded,
-    x="disciplines",
-    y="age",
-    color="gender",
-    box=True,
-    points="all",
-    title="Athlete Age Distribution by Sport and Gender"
-)
+        # Add expandable section for biography and achievements
+        if athlete_data:
+            if athlete_data['bio']:
+                with st.expander("📖 Biography"):
+                    st.write(athlete_data['bio'])
 
-fig_age.update_layout(xaxis_title="Sport", yaxis_title="Age")
+            if athlete_data['achievements']:
+                with st.expander("🏆 Recent Achievements"):
+                    for achievement in athlete_data['achievements']:
+                        st.write(f"- {achievement}")
+    # ========== END OF UPDATED ATHLETE PROFILE SECTION ==========
 
-st.subheader("📊 Global Athletes Age Distribution")
-st.plotly_chart(fig_age, use_container_width=True)
+render_athlete_profile(filtered_athletes)
 
 st.markdown("---")
 
-st.subheader("👥 Gender Distribution")
+# age distribution
+AGE_VIEW_MODES = ["Summary", "Sampled points", "Full resolution"]
 
-view_level = st.selectbox(
-    "View Gender Distribution By:",
-    ["World", "Continent", "Country"]
-)
+@st.cache_data(max_entries=64)
+def load_age_summary(filter_key):
+    # KDE and quartiles per (discipline, gender), computed once per filter combination
+    athletes_exploded = apply_athlete_filters(filter_key).explode("disciplines")
+    return summarize_age_distribution(athletes_exploded)
 
-if view_level == "World":
-    filtered_for_gender = filtered_athletes
+@st.cache_data(max_entries=64)
+def load_age_points(filter_key, max_points):
+    athletes_exploded = apply_athlete_filters(filter_key).explode("disciplines")
+    if max_points is None:
+        return athletes_exploded[["disciplines", "gender", "age"]]
+    return sample_points(athletes_exploded, max_points)[["disciplines", "gender", "age"]]
 
-elif view_level == "Continent":
-    available_continents = sorted(filtered_athletes["continent"].dropna().unique())
-    if available_continents:
-        selected_continent = st.selectbox(
-            "Select Continent",
-            available_continents
+st.subheader("📊 Global Athletes Age Distribution")
+
+# The chart controls only affect this chart, so it reruns on its own.
+@st.fragment
+@timed("age distribution")
+def render_age_distribution(filter_key):
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        age_view_mode = st.radio(
+            "Rendering",
+            AGE_VIEW_MODES,
+            horizontal=True,
+            help="Summary ships precomputed densities only; Full resolution sends every athlete to the browser"
         )
-        filtered_for_gender = filtered_athletes[filtered_athletes["continent"] == selected_continent]
-    else:
-        st.warning("No continents available with current filters")
-        filtered_for_gender = pd.DataFrame()
 
-else:
-    available_countries = sorted(filtered_athletes["country"].dropna().unique())
-    if available_countries:
-        selected_country = st.selectbox(
-            "Select Country",
-            available_countries
+    with col2:
+        max_points = st.slider(
+            "Max points",
+            min_value=500,
+            max_value=20000,
+            value=3000,
+            step=500,
+            disabled=age_view_mode != "Sampled points"
         )
-        filtered_for_gender = filtered_athletes[filtered_athletes["country"] == selected_country]
-    else:
-        st.warning("No countries available with current filters")
-        filtered_for_gender = pd.DataFrame()
-
-if not filtered_for_gender.empty:
-    gender_dist = (
-        filtered_for_gender["gender"]
-        .value_counts()
-        .reset_index()
-    )
 
-    gender_dist.columns = ["gender", "count"]
+    title = "Athlete Age Distribution by Sport and Gender"
 
-    fig_gender = px.bar(
-        gender_dist,
-        x="gender",
-        y="count",
-        title=f"Gender Distribution of Athletes - {view_level}",
-        color="gender",
-        color_discrete_map={"Male": "#3b82f6", "Female": "#ec4899"}
-    )
+    if age_view_mode == "Summary":
+        age_summary = load_age_summary(filter_key)
+        if age_summary.empty:
+            st.info("No age data available with current filters")
+            return
+        fig_age = build_summary_violin(age_summary, title)
+    else:
+        age_points = load_age_points(filter_key, max_points if age_view_mode == "Sampled points" else None)
+        if age_points.dropna().empty:
+            st.info("No age data available with current filters")
+            return
+        fig_age = build_points_violin(age_points, load_age_summary(filter_key), title)
 
-    st.plotly_chart(fig_gender, use_container_width=True)
-else:
-    st.info("No data available for gender distribution with current filters")
+    plotly_chart(fig_age, use_container_width=True)
+
+render_age_distribution(athlete_filter_key)
 
 st.markdown("---")
 
-@st.cache_data
-def load_medalists():
-    medals_df = pd.read_csv("data/medals.csv")
+st.subheader("👥 Gender Distribution")
+
+# Gender distribution runs as a fragment: changing the view level or the
+# continent/country picker only reruns this section, not the whole page.
+@st.fragment
+@timed("gender distribution")
+def render_gender_distribution(gender_sets):
+    view_level = st.selectbox(
+        "View Gender Distribution By:",
+        ["World", "Continent", "Country"]
+    )
 
-    countries = set(medals_df["country"].dropna().unique())
+    if view_level == "World":
+        gender_dist = gender_counts(gender_sets, "World")
 
-    medals_clean = medals_df[~medals_df["name"].isin(countries)]
+    elif view_level == "Continent":
+        available_continents = level_groups(gender_sets, "Continent")
+        if available_continents:
+            selected_continent = st.selectbox(
+                "Select Continent",
+                available_continents
+            )
+            gender_dist = gender_counts(gender_sets, "Continent", selected_continent)
+        else:
+            st.warning("No continents available with current filters")
+            gender_dist = pd.Series(dtype="int64")
 
-    top_athletes = (
-        medals_clean["name"]
-        .value_counts()
-        .head(10)
-        .reset_index()
-    )
+    else:
+        available_countries = level_groups(gender_sets, "Country")
+        if available_countries:
+            selected_country = st.selectbox(
+                "Select Country",
+                available_countries
+            )
+            gender_dist = gender_counts(gender_sets, "Country", selected_country)
+        else:
+            st.warning("No countries available with current filters")
+            gender_dist = pd.Series(dtype="int64")
 
-    top_athletes.columns = ["athlete", "medal_count"]
-    return top_athletes, medals_df
+    if not gender_dist.empty:
+        gender_dist = gender_dist.sort_values(ascending=False).reset_index()
 
-top_athletes_data, medals_data = load_medalists()
+        gender_dist.columns = ["gender", "count"]
 
-# Filter top athletes based on filters
-filtered_medals = medals_data.copy()
+        fig_gender = px.bar(
+            gender_dist,
+            x="gender",
+            y="count",
+            title=f"Gender Distribution of Athletes - {view_level}",
+            color="gender",
+            color_discrete_map={"Male": "#3b82f6", "Female": "#ec4899"}
+        )
 
-# Apply country filter to medals
-if selected_countries:
-    country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
-    filtered_medals = filtered_medals[filtered_medals['country_code'].isin(country_codes)]
+        plotly_chart(fig_gender, use_container_width=True)
+    else:
+        st.info("No data available for gender distribution with current filters")
 
-# Apply continent filter to medals
-if selected_continents:
-    if 'continent_code' not in filtered_medals.columns:
-        def get_continent_code_simple(country_code):
-            try:
-                continent_code = pc.country_alpha2_to_continent_code(country_code)
-                return continent_code
-            except:
-                return "Other"
-        
-        def get_continent_name(continent_code):
-            continent_mapping = {
-                'AF': 'Africa',
-                'AS': 'Asia',
-                'EU': 'Europe',
-                'NA': 'North America',
-                'SA': 'South America',
-                'OC': 'Oceania',
-                'Other': 'Other'
-            }
-            return continent_mapping.get(continent_code, 'Other')
-        
-        filtered_medals['continent_code'] = filtered_medals['country_code'].apply(get_continent_code_simple)
-        filtered_medals.loc[filtered_medals['country_code'] == 'KOS', 'continent_code'] = 'EU'
-        filtered_medals['continent'] = filtered_medals['continent_code'].apply(get_continent_name)
-    
-    filtered_medals = filtered_medals[filtered_medals['continent'].isin(selected_continents)]
+render_gender_distribution(gender_sets)
 
-# Apply sport filter to medals
-if selected_sports:
-    filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_sports)]
+st.markdown("---")
 
-# Apply medal type filter
-filtered_medals = filtered_medals[filtered_medals['medal_type'].isin(selected_medal_types)]
+# Per-athlete medal counts keyed by country, continent, discipline and medal
+# type; team medals are credited to every team member (see utils.ingest)
+@st.cache_data(max_entries=2)
+def load_medallist_counts(version):
+    _, _, athlete_medals = medal_model(version)
+
+    # Same IOC code -> continent mapping as the athletes table; the shared
+    # athlete_medals frame is left as it is
+    athletes_df = load_df(data_path("athletes.csv"), version)
+    continents = athletes_df.groupby("country_code")["continent"].first()
+    return build_medallist_counts(
+        athlete_medals.assign(continent=athlete_medals["country_code"].map(continents).fillna("Other"))
+    )
 
-# Calculate top athletes from filtered medals
-countries_set = set(filtered_medals["country"].dropna().unique())
-medals_clean = filtered_medals[~filtered_medals["name"].isin(countries_set)]
+medallist_filter_key = (
+    version,
+    tuple(sorted(selected_countries)),
+    tuple(sorted(selected_continents)),
+    tuple(sorted(selected_sports)),
+    tuple(selected_medal_types),
+)
 
-if not medals_clean.empty:
-    top_athletes_filtered = (
-        medals_clean["name"]
-        .value_counts()
-        .head(10)
-        .reset_index()
+@st.cache_data(max_entries=64)
+def load_top_medallists(filter_key, k=10):
+    version, selected_countries, selected_continents, selected_sports, medal_types = filter_key
+    nocs, events, medals = load_additional_data(version)
+    country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].tolist() if selected_countries else []
+
+    return top_medallists(
+        load_medallist_counts(version),
+        k,
+        country_code=country_codes,
+        continent=selected_continents,
+        discipline=selected_sports,
+        medal_type=medal_types
     )
-    top_athletes_filtered.columns = ["athlete", "medal_count"]
+
+top_athletes_filtered = load_top_medallists(medallist_filter_key)
+lap("aggregation: top medallists", rows_out=len(top_athletes_filtered))
+
+if not top_athletes_filtered.empty:
+    top_athletes_filtered = top_athletes_filtered.rename(columns={"name": "athlete"})
+    top_athletes_filtered["medal_kind"] = top_athletes_filtered["medal_kind"].astype(str)
+    athlete_order = top_athletes_filtered["athlete"].unique()
 
     fig_top_athletes = px.bar(
         top_athletes_filtered,
@@ -707,14 +831,15 @@ if not medals_clean.empty:
         y="athlete",
         orientation="h",
         title="Top 10 Athletes by Total Medals",
-        color="medal_count",
-        color_continuous_scale="Viridis"
+        color="medal_kind",
+        category_orders={"athlete": list(athlete_order), "medal_kind": MEDAL_KINDS},
+        labels={"medal_count": "Medals", "athlete": "Athlete", "medal_kind": "Medal"}
     )
 
     fig_top_athletes.update_layout(yaxis=dict(autorange="reversed"))
 
     st.subheader("🏆 Top 10 Athletes by Medals")
-    st.plotly_chart(fig_top_athletes, use_container_width=True)
+    plotly_chart(fig_top_athletes, use_container_width=True)
 else:
     st.info("No medal data available with current filters")
 
@@ -725,4 +850,7 @@ st.markdown("""
     <p>👤 <strong>Paris 2024 Olympics - Athlete Performance</strong></p>
     <p>Built with ❤️ using Streamlit | Celebrating Athletic Excellence</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+render_snapshot_version(snapshot)
+render_debug_panel()
@@ -4,6 +4,23 @@ import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
+import sys
+import os
+
+# Add parent directory to path to access utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.schedule_index import (
+    SCHEDULE_TZ, build_schedule_index, group_span, window_positions, page_count, session_page
+)
+from utils import ingest
+from utils.ingest import data_path, parse_list, sports_per_venue, venues_per_sport, sessions_per_venue
+from utils.medal_pivot import medal_table, medal_long
+from utils.search_box import render_global_search
+from utils.snapshots import pin_snapshot, render_snapshot_version
+from utils.schedule_diff import diff_schedule_files
+from utils.venue_occupancy import build_occupancy_index, sessions_running_at, occupancy_matrix
+from utils.instrumentation import begin_run, lap, timed, plotly_chart, render_debug_panel
 
 # Page configuration
 st.set_page_config(
@@ -12,6 +29,13 @@ st.set_page_config(
     layout="wide"
 )
 
+begin_run("Sports & Events")
+
+# Every table of this rerun comes from one dataset snapshot; cached loaders
+# are keyed on its version, so a newly swapped-in snapshot gets new entries
+snapshot = pin_snapshot()
+version = snapshot["version"]
+
 # Custom CSS for better styling
 st.markdown("""
     <style>
@@ -61,28 +85,31 @@ st.markdown('<p class="main-header">🏟️ Sports & Events Arena</p>', unsafe_a
 st.markdown('<p class="sub-header">Explore the competitive landscape of Paris 2024 Olympics</p>', unsafe_allow_html=True)
 
 # Load data with error handling
-@st.cache_data
-def load_data():
+@st.cache_data(max_entries=2)
+def load_data(version):
     try:
-        events = pd.read_csv('data/events.csv')
-        schedules = pd.read_csv('data/schedules.csv')
-        venues = pd.read_csv('data/venues.csv')
-        medals = pd.read_csv('data/medals.csv')
-        athletes = pd.read_csv('data/athletes.csv')
-        nocs = pd.read_csv('data/nocs.csv')
+        # Mapped from the host's shared snapshots or parsed in parallel, in this order
+        events, schedules, venues, medals, athletes, nocs = ingest.read_tables(
+            [data_path(name) for name in ['events.csv', 'schedules.csv', 'venues.csv', 'medals.csv',
+                                          'athletes.csv', 'nocs.csv']]
+        )
         
         return events, schedules, venues, medals, athletes, nocs
     except FileNotFoundError as e:
         st.error(f"⚠️ Error loading data: {e}")
-        st.info("Please ensure all CSV files are in the 'data/' directory.")
+        st.info(f"Please ensure all CSV files are in the '{ingest.DATA_DIR}/' directory.")
         return None, None, None, None, None, None
 
-events, schedules, venues, medals, athletes, nocs = load_data()
+events, schedules, venues, medals, athletes, nocs = load_data(version)
 
 if events is None:
     st.stop()
+lap("data load", rows_out=len(events) + len(schedules) + len(venues) + len(medals) + len(athletes))
 
 # Sidebar filters
+with st.sidebar:
+    render_global_search(version)
+
 st.sidebar.header("🎯 Global Filters")
 
 # Country filter
@@ -121,40 +148,63 @@ else:
 
 st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip**: Use filters to customize your view!")
+lap("sidebar")
+
+# Filter by medal type
+medal_types = []
+if show_gold: medal_types.append('Gold Medal')
+if show_silver: medal_types.append('Silver Medal')
+if show_bronze: medal_types.append('Bronze Medal')
+
+# Normalized, hashable view of the sidebar selections. Every cached builder
+# below is keyed on it, so a filter combination is only computed once.
+filter_key = (
+    version,
+    tuple(sorted(selected_countries)),
+    tuple(sorted(selected_sports)),
+    tuple(sorted(selected_disciplines)),
+    tuple(sorted(selected_venues)),
+    tuple(medal_types),
+)
 
 # Filter data based on selections
-filtered_events = events.copy()
-filtered_medals = medals.copy()
-filtered_schedules = schedules.copy()
+@st.cache_data(max_entries=64)
+def apply_filters(filter_key):
+    version, selected_countries, selected_sports, selected_disciplines, selected_venues, medal_types = filter_key
+    events, schedules, venues, medals, athletes, nocs = load_data(version)
 
-if selected_sports:
-    filtered_events = filtered_events[filtered_events['sport'].isin(selected_sports)]
-    if 'discipline' in filtered_medals.columns:
-        # Map disciplines to sports (if needed)
-        filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_sports)]
+    filtered_events = events
+    filtered_medals = medals
+    filtered_schedules = schedules
 
-if selected_disciplines:
-    if 'discipline' in filtered_schedules.columns:
-        filtered_schedules = filtered_schedules[filtered_schedules['discipline'].isin(selected_disciplines)]
-    if 'discipline' in filtered_medals.columns:
-        filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_disciplines)]
+    if selected_sports:
+        filtered_events = filtered_events[filtered_events['sport'].isin(selected_sports)]
+        if 'discipline' in filtered_medals.columns:
+            # Map disciplines to sports (if needed)
+            filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_sports)]
 
-if selected_countries and 'country_code' in filtered_medals.columns:
-    country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
-    filtered_medals = filtered_medals[filtered_medals['country_code'].isin(country_codes)]
+    if selected_disciplines:
+        if 'discipline' in filtered_schedules.columns:
+            filtered_schedules = filtered_schedules[filtered_schedules['discipline'].isin(selected_disciplines)]
+        if 'discipline' in filtered_medals.columns:
+            filtered_medals = filtered_medals[filtered_medals['discipline'].isin(selected_disciplines)]
 
-if selected_venues:
-    if 'venue' in filtered_schedules.columns:
-        filtered_schedules = filtered_schedules[filtered_schedules['venue'].isin(selected_venues)]
+    if selected_countries and 'country_code' in filtered_medals.columns:
+        country_codes = nocs[nocs['country'].isin(selected_countries)]['code'].values
+        filtered_medals = filtered_medals[filtered_medals['country_code'].isin(country_codes)]
 
-# Filter by medal type
-medal_types = []
-if show_gold: medal_types.append('Gold Medal')
-if show_silver: medal_types.append('Silver Medal')
-if show_bronze: medal_types.append('Bronze Medal')
+    if selected_venues:
+        if 'venue' in filtered_schedules.columns:
+            filtered_schedules = filtered_schedules[filtered_schedules['venue'].isin(selected_venues)]
+
+    if medal_types and 'medal_type' in filtered_medals.columns:
+        filtered_medals = filtered_medals[filtered_medals['medal_type'].isin(medal_types)]
 
-if medal_types and 'medal_type' in filtered_medals.columns:
-    filtered_medals = filtered_medals[filtered_medals['medal_type'].isin(medal_types)]
+    return filtered_events, filtered_medals, filtered_schedules
+
+filtered_events, filtered_medals, filtered_schedules = apply_filters(filter_key)
+lap("filtering", rows_in=len(events) + len(medals) + len(schedules),
+    rows_out=len(filtered_events) + len(filtered_medals) + len(filtered_schedules))
 
 # KPI Metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -176,455 +226,748 @@ with col4:
     st.metric("🏆 Medals Awarded", total_medals_awarded)
 
 st.markdown("---")
+lap("KPI computation")
+
+# --------------------------------------
+# TAB BUILDERS
+# --------------------------------------
+# Each tab is split into a cached builder (aggregations + figures) and a
+# render function (layout only). Only the selected tab is rendered, so a
+# rerun pays for the visible tab, and a tab that was already visited with the
+# same filters comes straight from the cache.
+
+# Venue-sport bridge table, built once at ingest
+@st.cache_data(max_entries=2)
+def load_venue_sports(version):
+    return ingest.load_venue_sports()
+
+
+# Interval index of the full schedule per venue (occupancy does not depend
+# on the sidebar filters, so it is built once for all sessions)
+@st.cache_resource(max_entries=2)
+def load_occupancy_index(version):
+    events, schedules, venues, medals, athletes, nocs = load_data(version)
+    return build_occupancy_index(schedules)
+
+
+# Preliminary vs published schedule diff (independent of the sidebar filters)
+@st.cache_data(max_entries=2)
+def load_schedule_changes(version):
+    return diff_schedule_files(data_path('schedules_preliminary.csv'), data_path('schedules.csv'))
+
+
+# Sorted start-time index of the filtered schedule, shared read-only by all
+# sessions (cache_resource: no per-call copy); the most recent filter
+# combinations are kept
+@st.cache_resource(max_entries=64)
+def load_schedule_index(filter_key):
+    _, _, filtered_schedules = apply_filters(filter_key)
+    return build_schedule_index(filtered_schedules)
+
+
+# (group x Gold/Silver/Bronze/Total) medal table of the filtered medals,
+# computed once per filter selection and grouping
+@st.cache_data(max_entries=64)
+def load_medal_table(filter_key, by):
+    _, filtered_medals, _ = apply_filters(filter_key)
+    return medal_table(filtered_medals, by)
+
+
+@st.cache_data(max_entries=64)
+def build_medal_tab(filter_key):
+    _, filtered_medals, _ = apply_filters(filter_key)
+    figures = {}
+
+    if filtered_medals.empty:
+        return figures
+
+    if 'discipline' in filtered_medals.columns:
+        discipline_medals = load_medal_table(filter_key, 'discipline')
+
+        # Create medal hierarchy
+        medal_hierarchy = medal_long(discipline_medals)
+        medal_hierarchy = medal_hierarchy[medal_hierarchy['count'] > 0]
+
+        fig_treemap = px.treemap(
+            medal_hierarchy,
+            path=['discipline', 'medal'],
+            values='count',
+            color='count',
+            color_continuous_scale='Viridis',
+            title="Medal Count by Discipline (Treemap)"
+        )
+
+        fig_treemap.update_traces(textinfo="label+value+percent parent")
+        fig_treemap.update_layout(height=600)
+        figures['treemap'] = fig_treemap
+
+        # Top disciplines by medals
+        top_disciplines = discipline_medals['Total'].nlargest(10)
+
+        fig_top_disciplines = go.Figure(data=[
+            go.Bar(
+                y=top_disciplines.index,
+                x=top_disciplines.values,
+                orientation='h',
+                marker=dict(
+                    color=top_disciplines.values,
+                    colorscale='Blues',
+                    showscale=True
+                ),
+                text=top_disciplines.values,
+                textposition='auto'
+            )
+        ])
+
+        fig_top_disciplines.update_layout(
+            title="Top 10 Disciplines by Medal Count",
+            xaxis_title="Number of Medals",
+            yaxis_title="Discipline",
+            height=600
+        )
+        figures['top_disciplines'] = fig_top_disciplines
+
+    if 'medal_type' in filtered_medals.columns:
+        medal_type_dist = filtered_medals['medal_type'].value_counts()
+
+        # Map medal types to colors
+        color_map = {
+            'Gold Medal': '#FFD700',
+            'Silver Medal': '#C0C0C0',
+            'Bronze Medal': '#CD7F32'
+        }
+        colors = [color_map.get(medal, '#CCCCCC') for medal in medal_type_dist.index]
+
+        fig_medal_pie = go.Figure(data=[go.Pie(
+            labels=medal_type_dist.index,
+            values=medal_type_dist.values,
+            marker=dict(colors=colors),
+            hole=0.4
+        )])
+
+        fig_medal_pie.update_layout(title="Distribution of Medal Types")
+        figures['medal_pie'] = fig_medal_pie
+
+    # Gender distribution in medals
+    if 'gender' in filtered_medals.columns:
+        gender_dist = filtered_medals['gender'].value_counts()
+
+        fig_gender = px.pie(
+            values=gender_dist.values,
+            names=gender_dist.index,
+            title="Medal Distribution by Gender",
+            hole=0.4,
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        figures['gender_pie'] = fig_gender
+
+    return figures
+
+
+@st.cache_data(max_entries=64)
+def build_venue_tab(version, selected_venues):
+    events, schedules, venues, medals, athletes, nocs = load_data(version)
+    venue_sports = load_venue_sports(version)
+    venue_tab = {'metrics': {}, 'figures': {}}
+
+    # Venue statistics
+    venue_tab['metrics']['total_venues'] = len(venues)
+    venue_tab['metrics']['sport_venue_combinations'] = len(venue_sports[['venue', 'sport']].drop_duplicates())
+
+    if 'date_start' in venues.columns and 'date_end' in venues.columns:
+        venues['date_start'] = pd.to_datetime(venues['date_start'], errors='coerce')
+        venues['date_end'] = pd.to_datetime(venues['date_end'], errors='coerce')
+        venues['duration'] = (venues['date_end'] - venues['date_start']).dt.days
+        venue_tab['metrics']['avg_duration'] = venues['duration'].mean()
+
+    display_venues = venues
+    if selected_venues:
+        display_venues = display_venues[display_venues['venue'].isin(selected_venues)]
+        venue_sports = venue_sports[venue_sports['venue'].isin(selected_venues)]
+
+    # Count events per venue from schedules (joined through venue_code)
+    display_venues = display_venues.merge(sessions_per_venue(venue_sports), on='venue', how='left')
+    display_venues['event_count'] = display_venues['event_count'].fillna(0).astype(int)
+    sport_lists = venue_sports.groupby('venue')['sport'].agg(', '.join)
+    display_venues['sports'] = display_venues['venue'].map(sport_lists).fillna('')
+
+    # Create interactive venue chart
+    if not venue_sports.empty:
+        sport_counts = sports_per_venue(venue_sports).reset_index()
+
+        fig_venue_sports = px.bar(
+            sport_counts.sort_values('sport_count', ascending=True).tail(15),
+            y='venue',
+            x='sport_count',
+            orientation='h',
+            title="Number of Sports per Venue (Top 15)",
+            labels={'sport_count': 'Number of Sports', 'venue': 'Venue'},
+            color='sport_count',
+            color_continuous_scale='Viridis'
+        )
+
+        fig_venue_sports.update_layout(height=500, showlegend=False)
+        venue_tab['figures']['venue_sports'] = fig_venue_sports
+
+        venue_counts = venues_per_sport(venue_sports).reset_index()
+
+        fig_sport_venues = px.bar(
+            venue_counts.sort_values('venue_count', ascending=True).tail(15),
+            y='sport',
+            x='venue_count',
+            orientation='h',
+            title="Number of Venues per Sport (Top 15)",
+            labels={'venue_count': 'Number of Venues', 'sport': 'Sport'},
+            color='venue_count',
+            color_continuous_scale='Viridis'
+        )
+
+        fig_sport_venues.update_layout(height=500, showlegend=False)
+        venue_tab['figures']['sport_venues'] = fig_sport_venues
+
+    # Venue timeline
+    if 'date_start' in venues.columns and 'date_end' in venues.columns:
+        timeline_venues = venues.dropna(subset=['date_start', 'date_end'])
+
+        if not timeline_venues.empty:
+            fig_venue_timeline = px.timeline(
+                timeline_venues.head(20),
+                x_start='date_start',
+                x_end='date_end',
+                y='venue',
+                title="Venue Usage Timeline",
+                labels={'venue': 'Venue'},
+                height=max(400, len(timeline_venues.head(20)) * 30)
+            )
+
+            fig_venue_timeline.update_layout(xaxis_title="Date")
+            venue_tab['figures']['venue_timeline'] = fig_venue_timeline
+
+    # Detailed venue table
+    display_cols = ['venue', 'sports', 'date_start', 'date_end']
+    if 'event_count' in display_venues.columns:
+        display_cols.append('event_count')
+    available_cols = [col for col in display_cols if col in display_venues.columns]
+    venue_tab['table'] = display_venues[available_cols]
+
+    return venue_tab
+
+
+@st.cache_data(max_entries=64)
+def build_insights_tab(filter_key):
+    events, schedules, venues, medals, athletes, nocs = load_data(filter_key[0])
+    filtered_events, filtered_medals, _ = apply_filters(filter_key)
+    figures = {}
+
+    if 'sport' in filtered_events.columns:
+        events_per_sport = filtered_events['sport'].value_counts().reset_index()
+        events_per_sport.columns = ['sport', 'count']
+
+        fig_events = px.bar(
+            events_per_sport.head(15),
+            x='count',
+            y='sport',
+            orientation='h',
+            title="Number of Events by Sport (Top 15)",
+            color='count',
+            color_continuous_scale='Plasma',
+            text='count'
+        )
+        fig_events.update_traces(textposition='auto')
+        fig_events.update_layout(showlegend=False, height=500)
+        figures['events'] = fig_events
+
+    if 'disciplines' in athletes.columns:
+        # disciplines holds list literals ("['Archery', 'Diving']")
+        discipline_list = athletes['disciplines'].map(parse_list).explode().dropna()
+
+        if not discipline_list.empty:
+            discipline_counts = discipline_list.value_counts().reset_index()
+            discipline_counts.columns = ['discipline', 'athletes']
+
+            fig_athletes = px.bar(
+                discipline_counts.head(15),
+                x='athletes',
+                y='discipline',
+                orientation='h',
+                title="Number of Athletes by Discipline (Top 15)",
+                color='athletes',
+                color_continuous_scale='Viridis',
+                text='athletes'
+            )
+            fig_athletes.update_traces(textposition='auto')
+            fig_athletes.update_layout(showlegend=False, height=500)
+            figures['athletes'] = fig_athletes
+
+    # Medal timeline
+    if 'medal_date' in filtered_medals.columns:
+        medal_dates = filtered_medals.assign(medal_date=pd.to_datetime(filtered_medals['medal_date'], errors='coerce'))
+        medals_by_date = medal_dates.dropna(subset=['medal_date']).groupby('medal_date').size().reset_index(name='count')
+
+        fig_timeline = px.line(
+            medals_by_date,
+            x='medal_date',
+            y='count',
+            title="Medals Awarded Over Time",
+            labels={'medal_date': 'Date', 'count': 'Number of Medals'},
+            markers=True
+        )
+
+        fig_timeline.update_layout(height=400)
+        figures['timeline'] = fig_timeline
+
+    return figures
 
-# Main content tabs
-tab1, tab2, tab3, tab4 = st.tabs(["📅 Event Schedule", "🏆 Medal Analysis", "🗺️ Venue Map", "🎨 Sport Insights"])
+
+# --------------------------------------
+# TAB RENDERERS
+# --------------------------------------
 
 # TAB 1: EVENT SCHEDULE
-with tab1:
+SCHEDULE_PAGE_SIZE = 25
+
+@timed("schedule tab")
+def render_schedule_tab():
     st.subheader("📅 Event Schedule Timeline")
-    
-    # Discipline selector for schedule
-    if 'discipline' in filtered_schedules.columns:
-        schedule_disciplines = sorted(filtered_schedules['discipline'].dropna().unique())
-        
-        if schedule_disciplines:
-            selected_schedule_discipline = st.selectbox(
-                "Select Discipline for Schedule View", 
-                schedule_disciplines, 
-                key="schedule_discipline"
+
+    # The schedule view runs as a fragment: switching the discipline, window
+    # or page only reruns this section, not the filters, KPIs and other tabs.
+    @st.fragment
+    @timed("schedule timeline")
+    def render_schedule_timeline(filter_key):
+        schedule_index = load_schedule_index(filter_key)
+
+        # Discipline selector for schedule
+        schedule_disciplines = sorted(schedule_index["bounds"])
+
+        if not schedule_disciplines:
+            st.info("📅 No disciplines available with current filters.")
+            return
+
+        selected_schedule_discipline = st.selectbox(
+            "Select Discipline for Schedule View",
+            schedule_disciplines,
+            key="schedule_discipline"
+        )
+
+        first_start, last_end = group_span(schedule_index, selected_schedule_discipline)
+        first_day, last_day = first_start.date(), last_end.date()
+
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            date_window = st.date_input(
+                "📆 Date window",
+                value=(first_day, last_day),
+                min_value=first_day,
+                max_value=last_day,
+                key=f"schedule_window_{selected_schedule_discipline}"
             )
-            
-            # Filter schedule by discipline
-            discipline_schedule = filtered_schedules[
-                filtered_schedules['discipline'] == selected_schedule_discipline
-            ].copy()
-            
-            if not discipline_schedule.empty and 'start_date' in discipline_schedule.columns:
-                # Parse dates
-                discipline_schedule['start_date'] = pd.to_datetime(
-                    discipline_schedule['start_date'], 
-                    errors='coerce'
-                )
-                
-                if 'end_date' in discipline_schedule.columns:
-                    discipline_schedule['end_date'] = pd.to_datetime(
-                        discipline_schedule['end_date'], 
-                        errors='coerce'
-                    )
-                else:
-                    discipline_schedule['end_date'] = discipline_schedule['start_date']
-                
-                # Remove rows with invalid dates
-                discipline_schedule = discipline_schedule.dropna(subset=['start_date'])
-                discipline_schedule['end_date'] = discipline_schedule['end_date'].fillna(
-                    discipline_schedule['start_date']
-                )
-                
-                if not discipline_schedule.empty:
-                    # Create event label
-                    if 'event' in discipline_schedule.columns:
-                        discipline_schedule['event_label'] = discipline_schedule['event']
-                    elif 'phase' in discipline_schedule.columns:
-                        discipline_schedule['event_label'] = discipline_schedule['phase']
-                    else:
-                        discipline_schedule['event_label'] = 'Event ' + discipline_schedule.index.astype(str)
-                    
-                    # Create Gantt chart
-                    fig_gantt = px.timeline(
-                        discipline_schedule.head(50),  # Limit to 50 events for readability
-                        x_start='start_date',
-                        x_end='end_date',
-                        y='event_label',
-                        color='venue' if 'venue' in discipline_schedule.columns else 'gender',
-                        title=f"Event Schedule for {selected_schedule_discipline}",
-                        labels={'event_label': 'Event'},
-                        height=max(500, min(len(discipline_schedule) * 25, 1000))
-                    )
-                    
-                    fig_gantt.update_layout(
-                        xaxis_title="Date",
-                        yaxis_title="Event",
-                        showlegend=True,
-                        hovermode='closest'
-                    )
-                    
-                    st.plotly_chart(fig_gantt, use_container_width=True)
-                    
-                    # Event statistics
-                    col1, col2, col3 = st.columns(3)
-                    
-                    with col1:
-                        st.metric("📊 Total Events", len(discipline_schedule))
-                    
-                    with col2:
-                        if 'gender' in discipline_schedule.columns:
-                            gender_dist = discipline_schedule['gender'].value_counts()
-                            st.metric("🚹 Men's Events", gender_dist.get('M', 0))
-                    
-                    with col3:
-                        if 'gender' in discipline_schedule.columns:
-                            st.metric("🚺 Women's Events", gender_dist.get('W', 0))
-                    
-                    # Event details table
-                    with st.expander("📋 View Detailed Schedule"):
-                        display_cols = ['event', 'start_date', 'end_date', 'venue', 'gender', 'phase']
-                        available_cols = [col for col in display_cols if col in discipline_schedule.columns]
-                        st.dataframe(
-                            discipline_schedule[available_cols].sort_values('start_date'), 
-                            use_container_width=True,
-                            hide_index=True
-                        )
-                else:
-                    st.warning("⚠️ No valid schedule data available for this discipline.")
-            else:
-                st.warning("⚠️ Schedule data not available for this discipline.")
+
+        # While a range is being picked the widget only holds its first day
+        window_first = date_window[0]
+        window_last = date_window[1] if len(date_window) == 2 else window_first
+        window_start = pd.Timestamp(window_first, tz=SCHEDULE_TZ)
+        window_end = pd.Timestamp(window_last, tz=SCHEDULE_TZ) + pd.Timedelta(days=1)
+
+        positions = window_positions(schedule_index, selected_schedule_discipline, window_start, window_end)
+
+        if len(positions) == 0:
+            st.warning("⚠️ No sessions in the selected window.")
+            return
+
+        n_pages = page_count(len(positions), SCHEDULE_PAGE_SIZE)
+
+        with col2:
+            page = st.number_input(
+                f"Page (of {n_pages})",
+                min_value=1,
+                max_value=n_pages,
+                value=1,
+                key=f"schedule_page_{selected_schedule_discipline}_{window_first}_{window_last}"
+            )
+
+        discipline_schedule = session_page(schedule_index, positions, page, SCHEDULE_PAGE_SIZE)
+
+        # Create event label
+        if 'event' in discipline_schedule.columns:
+            discipline_schedule['event_label'] = discipline_schedule['event']
+        elif 'phase' in discipline_schedule.columns:
+            discipline_schedule['event_label'] = discipline_schedule['phase']
         else:
-            st.info("📅 No disciplines available with current filters.")
-    else:
-        st.warning("⚠️ Schedule data not properly formatted.")
+            discipline_schedule['event_label'] = 'Event ' + discipline_schedule.index.astype(str)
+
+        first_row = (page - 1) * SCHEDULE_PAGE_SIZE + 1
+        st.caption(
+            f"Showing sessions {first_row}–{first_row + len(discipline_schedule) - 1} "
+            f"of {len(positions)} between {window_first:%b %d} and {window_last:%b %d}"
+        )
+
+        # Create Gantt chart
+        fig_gantt = px.timeline(
+            discipline_schedule,
+            x_start='start_date',
+            x_end='end_date',
+            y='event_label',
+            color='venue' if 'venue' in discipline_schedule.columns else 'gender',
+            title=f"Event Schedule for {selected_schedule_discipline}",
+            labels={'event_label': 'Event'},
+            height=max(500, min(len(discipline_schedule) * 25, 1000))
+        )
+
+        fig_gantt.update_layout(
+            xaxis_title="Date",
+            yaxis_title="Event",
+            showlegend=True,
+            hovermode='closest'
+        )
+
+        plotly_chart(fig_gantt, use_container_width=True)
+
+        # Event statistics (whole window, not just the page)
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("📊 Total Events", len(positions))
+
+        if 'gender' in schedule_index["sessions"].columns:
+            window_genders = schedule_index["sessions"]["gender"].to_numpy()[positions]
+
+            with col2:
+                st.metric("🚹 Men's Events", int((window_genders == 'M').sum()))
+
+            with col3:
+                st.metric("🚺 Women's Events", int((window_genders == 'W').sum()))
+
+        # Event details table
+        with st.expander("📋 View Detailed Schedule"):
+            display_cols = ['event', 'start_date', 'end_date', 'venue', 'gender', 'phase']
+            available_cols = [col for col in display_cols if col in discipline_schedule.columns]
+            st.dataframe(
+                discipline_schedule[available_cols],
+                use_container_width=True,
+                hide_index=True
+            )
+
+        # Changes against the preliminary schedule
+        with st.expander("🔄 Changes vs Preliminary Schedule"):
+            first, _ = schedule_index["bounds"][selected_schedule_discipline]
+            discipline_code = schedule_index["sessions"]["discipline_code"].iat[first]
+            schedule_changes = load_schedule_changes(version)
+            discipline_changes = schedule_changes[
+                (schedule_changes["discipline_code"] == discipline_code)
+                & (schedule_changes["change"] != "unchanged")
+            ]
+
+            change_counts = discipline_changes["change"].value_counts()
+            col1, col2, col3, col4, col5 = st.columns(5)
+            col1.metric("↔️ Moved", int(change_counts.get("moved", 0)))
+            col2.metric("⏱️ Retimed", int(change_counts.get("retimed", 0)))
+            col3.metric("🔍 Refined", int(change_counts.get("refined", 0)))
+            col4.metric("➕ Added", int(change_counts.get("added", 0)))
+            col5.metric("❌ Cancelled", int(change_counts.get("cancelled", 0)))
+
+            st.dataframe(
+                discipline_changes[['change', 'venue_code', 'base_start', 'new_start', 'start_shift_min', 'base_label', 'new_label']],
+                use_container_width=True,
+                hide_index=True
+            )
+
+    render_schedule_timeline(filter_key)
 
 # TAB 2: MEDAL ANALYSIS
-with tab2:
+@timed("medal tab")
+def render_medal_tab():
     st.subheader("🏆 Medal Distribution by Sport")
-    
+
+    figures = build_medal_tab(filter_key)
+    lap("aggregation + figures: medal tab")
+
     col1, col2 = st.columns([2, 1])
-    
+
     with col1:
         # Treemap of medals by sport/discipline
-        if not filtered_medals.empty and 'discipline' in filtered_medals.columns:
-            # Create medal hierarchy
-            medal_hierarchy = filtered_medals.groupby(['discipline', 'medal_type']).size().reset_index(name='count')
-            
-            # Clean medal types for display
-            medal_hierarchy['medal_display'] = medal_hierarchy['medal_type'].str.replace(' Medal', '')
-            
-            fig_treemap = px.treemap(
-                medal_hierarchy,
-                path=['discipline', 'medal_display'],
-                values='count',
-                color='count',
-                color_continuous_scale='Viridis',
-                title="Medal Count by Discipline (Treemap)"
-            )
-            
-            fig_treemap.update_traces(textinfo="label+value+percent parent")
-            fig_treemap.update_layout(height=600)
-            
-            st.plotly_chart(fig_treemap, use_container_width=True)
-    
+        if 'treemap' in figures:
+            plotly_chart(figures['treemap'], use_container_width=True)
+
     with col2:
         # Top disciplines by medals
-        if not filtered_medals.empty and 'discipline' in filtered_medals.columns:
-            top_disciplines = filtered_medals['discipline'].value_counts().head(10)
-            
-            fig_top_disciplines = go.Figure(data=[
-                go.Bar(
-                    y=top_disciplines.index,
-                    x=top_disciplines.values,
-                    orientation='h',
-                    marker=dict(
-                        color=top_disciplines.values,
-                        colorscale='Blues',
-                        showscale=True
-                    ),
-                    text=top_disciplines.values,
-                    textposition='auto'
-                )
-            ])
-            
-            fig_top_disciplines.update_layout(
-                title="Top 10 Disciplines by Medal Count",
-                xaxis_title="Number of Medals",
-                yaxis_title="Discipline",
-                height=600
-            )
-            
-            st.plotly_chart(fig_top_disciplines, use_container_width=True)
-    
+        if 'top_disciplines' in figures:
+            plotly_chart(figures['top_disciplines'], use_container_width=True)
+
     # Medal type distribution pie chart
     st.markdown("### 🥇 Medal Type Distribution")
-    
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        if not filtered_medals.empty and 'medal_type' in filtered_medals.columns:
-            medal_type_dist = filtered_medals['medal_type'].value_counts()
-            
-            # Map medal types to colors
-            color_map = {
-                'Gold Medal': '#FFD700',
-                'Silver Medal': '#C0C0C0',
-                'Bronze Medal': '#CD7F32'
-            }
-            colors = [color_map.get(medal, '#CCCCCC') for medal in medal_type_dist.index]
-            
-            fig_medal_pie = go.Figure(data=[go.Pie(
-                labels=medal_type_dist.index,
-                values=medal_type_dist.values,
-                marker=dict(colors=colors),
-                hole=0.4
-            )])
-            
-            fig_medal_pie.update_layout(title="Distribution of Medal Types")
-            
-            st.plotly_chart(fig_medal_pie, use_container_width=True)
-    
+        if 'medal_pie' in figures:
+            plotly_chart(figures['medal_pie'], use_container_width=True)
+
     with col2:
         # Gender distribution in medals
-        if not filtered_medals.empty and 'gender' in filtered_medals.columns:
-            gender_dist = filtered_medals['gender'].value_counts()
-            
-            fig_gender = px.pie(
-                values=gender_dist.values,
-                names=gender_dist.index,
-                title="Medal Distribution by Gender",
-                hole=0.4,
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            
-            st.plotly_chart(fig_gender, use_container_width=True)
+        if 'gender_pie' in figures:
+            plotly_chart(figures['gender_pie'], use_container_width=True)
 
 # TAB 3: VENUE MAP
-with tab3:
+@timed("venue tab")
+def render_venue_tab():
     st.subheader("🗺️ Olympic Venues in Paris")
-    
+
     # Check if venues has the data we need
     if not venues.empty:
+        venue_tab = build_venue_tab(version, tuple(sorted(selected_venues)))
+        lap("aggregation + figures: venue tab", rows_out=len(venue_tab['table']))
+        metrics = venue_tab['metrics']
+
         # Display venue information
         st.markdown("### 🏛️ Olympic Venues Overview")
-        
+
         # Venue statistics
         col1, col2, col3 = st.columns(3)
-        
+
         with col1:
-            st.metric("📍 Total Venues", len(venues))
-        
+            st.metric("📍 Total Venues", metrics['total_venues'])
+
         with col2:
-            if 'sports' in venues.columns:
-                total_sports_venues = venues['sports'].str.split(',').apply(len).sum()
-                st.metric("🏅 Sport-Venue Combinations", int(total_sports_venues))
-        
+            if 'sport_venue_combinations' in metrics:
+                st.metric("🏅 Sport-Venue Combinations", metrics['sport_venue_combinations'])
+
         with col3:
-            if 'date_start' in venues.columns and 'date_end' in venues.columns:
-                venues['date_start'] = pd.to_datetime(venues['date_start'], errors='coerce')
-                venues['date_end'] = pd.to_datetime(venues['date_end'], errors='coerce')
-                venues['duration'] = (venues['date_end'] - venues['date_start']).dt.days
-                avg_duration = venues['duration'].mean()
-                st.metric("📅 Avg Venue Usage (days)", f"{avg_duration:.1f}")
-        
+            if 'avg_duration' in metrics:
+                st.metric("📅 Avg Venue Usage (days)", f"{metrics['avg_duration']:.1f}")
+
         # Venue list with details
         st.markdown("### 📋 Venue Details")
-        
-        display_venues = venues.copy()
-        if selected_venues:
-            display_venues = display_venues[display_venues['venue'].isin(selected_venues)]
-        
-        # Count events per venue from schedules
-        if 'venue' in schedules.columns:
-            venue_event_counts = schedules['venue'].value_counts().reset_index()
-            venue_event_counts.columns = ['venue', 'event_count']
-            display_venues = display_venues.merge(venue_event_counts, on='venue', how='left')
-            display_venues['event_count'] = display_venues['event_count'].fillna(0).astype(int)
-        
-        # Create interactive venue chart
-        if 'sports' in display_venues.columns:
-            # Split sports and create individual rows
-            venue_sports_list = []
-            for _, row in display_venues.iterrows():
-                if pd.notna(row['sports']):
-                    sports_list = [s.strip() for s in str(row['sports']).split(',')]
-                    for sport in sports_list:
-                        venue_sports_list.append({
-                            'venue': row['venue'],
-                            'sport': sport
-                        })
-            
-            if venue_sports_list:
-                venue_sports_df = pd.DataFrame(venue_sports_list)
-                
-                # Count sports per venue
-                sports_per_venue = venue_sports_df.groupby('venue').size().reset_index(name='sport_count')
-                
-                fig_venue_sports = px.bar(
-                    sports_per_venue.sort_values('sport_count', ascending=True).tail(15),
-                    y='venue',
-                    x='sport_count',
-                    orientation='h',
-                    title="Number of Sports per Venue (Top 15)",
-                    labels={'sport_count': 'Number of Sports', 'venue': 'Venue'},
-                    color='sport_count',
-                    color_continuous_scale='Viridis'
-                )
-                
-                fig_venue_sports.update_layout(height=500, showlegend=False)
-                st.plotly_chart(fig_venue_sports, use_container_width=True)
-        
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            if 'venue_sports' in venue_tab['figures']:
+                plotly_chart(venue_tab['figures']['venue_sports'], use_container_width=True)
+
+        with col2:
+            if 'sport_venues' in venue_tab['figures']:
+                plotly_chart(venue_tab['figures']['sport_venues'], use_container_width=True)
+
         # Venue timeline
-        if 'date_start' in venues.columns and 'date_end' in venues.columns:
+        if 'venue_timeline' in venue_tab['figures']:
             st.markdown("### 📅 Venue Usage Timeline")
-            
-            timeline_venues = venues.dropna(subset=['date_start', 'date_end']).copy()
-            
-            if not timeline_venues.empty:
-                fig_venue_timeline = px.timeline(
-                    timeline_venues.head(20),
-                    x_start='date_start',
-                    x_end='date_end',
-                    y='venue',
-                    title="Venue Usage Timeline",
-                    labels={'venue': 'Venue'},
-                    height=max(400, len(timeline_venues.head(20)) * 30)
-                )
-                
-                fig_venue_timeline.update_layout(xaxis_title="Date")
-                st.plotly_chart(fig_venue_timeline, use_container_width=True)
-        
+            plotly_chart(venue_tab['figures']['venue_timeline'], use_container_width=True)
+
         # Detailed venue table
         with st.expander("📊 View Complete Venue Data"):
-            display_cols = ['venue', 'sports', 'date_start', 'date_end']
-            if 'event_count' in display_venues.columns:
-                display_cols.append('event_count')
-            available_cols = [col for col in display_cols if col in display_venues.columns]
-            st.dataframe(display_venues[available_cols], use_container_width=True, hide_index=True)
+            st.dataframe(venue_tab['table'], use_container_width=True, hide_index=True)
+
+        render_venue_occupancy(tuple(sorted(selected_venues)))
     else:
         st.warning("⚠️ Venue data not available.")
 
+OCCUPANCY_MEASURES = {
+    "Busy hours": "busy_hours",
+    "Peak concurrent sessions": "peak_concurrency",
+    "Overlap hours": "overlap_hours",
+    "Sessions": "sessions",
+}
+
+# Occupancy controls only drive this section, so it reruns on its own.
+@st.fragment
+@timed("venue occupancy")
+def render_venue_occupancy(selected_venues):
+    st.markdown("### 🔥 Venue Occupancy")
+
+    occupancy_index = load_occupancy_index(version)
+    daily = occupancy_index["daily"]
+
+    if daily.empty:
+        st.info("No schedule sessions to compute occupancy from.")
+        return
+
+    # The sidebar lists venues.csv names; the schedule has its own names
+    # ("La Concorde" is "La Concorde 1".."4"), so both are matched on venue_code
+    venue_codes = ingest.venue_codes(load_venue_sports(version), selected_venues) if selected_venues else None
+
+    measure = st.radio("Measure", list(OCCUPANCY_MEASURES), horizontal=True, key="occupancy_measure")
+    matrix = occupancy_matrix(occupancy_index, OCCUPANCY_MEASURES[measure], venue_codes)
+
+    fig_occupancy = go.Figure(data=go.Heatmap(
+        z=matrix.values,
+        x=[day.strftime('%b %d') for day in matrix.columns],
+        y=matrix.index,
+        colorscale='YlOrRd',
+        colorbar=dict(title=measure),
+        hovertemplate="%{y}<br>%{x}<br>" + measure + ": %{z:.1f}<extra></extra>"
+    ))
+    fig_occupancy.update_layout(
+        title=f"{measure} per Venue and Day",
+        xaxis_title="Day",
+        yaxis_title="Venue",
+        height=max(400, len(matrix) * 22)
+    )
+    plotly_chart(fig_occupancy, use_container_width=True)
+
+    # What is running at a given moment
+    days = daily.index.get_level_values("day")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        running_day = st.date_input(
+            "📆 Running on",
+            value=days.min(),
+            min_value=days.min(),
+            max_value=days.max(),
+            key="occupancy_day"
+        )
+
+    with col2:
+        running_time = st.time_input("🕒 At", value=pd.Timestamp("15:00").time(), key="occupancy_time")
+
+    moment = pd.Timestamp.combine(running_day, running_time).tz_localize(SCHEDULE_TZ)
+    running = sessions_running_at(occupancy_index, moment, venue_codes)
+
+    st.metric("▶️ Sessions running", len(running))
+    if not running.empty:
+        running_cols = [col for col in ['venue', 'discipline', 'event', 'phase', 'start_date', 'end_date'] if col in running.columns]
+        st.dataframe(running[running_cols], use_container_width=True, hide_index=True)
+
+    # Gaps and overlaps of one venue
+    venue_options = (
+        occupancy_index["sessions"]
+        .drop_duplicates("venue_code")
+        .set_index("venue_code")["venue"]
+        .sort_values()
+    )
+    selected_venue_code = st.selectbox(
+        "🏛️ Gaps and overlaps for venue",
+        venue_options.index,
+        format_func=lambda code: venue_options[code],
+        key="occupancy_venue"
+    )
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        venue_gaps = occupancy_index["gaps"][selected_venue_code]
+        st.markdown(f"**⏸️ Gaps between sessions:** {len(venue_gaps)}")
+        st.dataframe(venue_gaps, use_container_width=True, hide_index=True)
+
+    with col2:
+        venue_overlaps = occupancy_index["overlaps"][selected_venue_code]
+        st.markdown(f"**⏯️ Overlapping sessions:** {len(venue_overlaps)}")
+        st.dataframe(venue_overlaps, use_container_width=True, hide_index=True)
+
 # TAB 4: SPORT INSIGHTS (Creative Addition)
-with tab4:
+@timed("insights tab")
+def render_insights_tab(filtered_medals):
     st.subheader("🎨 Deep Dive into Sport Insights")
-    
+
+    figures = build_insights_tab(filter_key)
+    lap("aggregation + figures: insights tab")
+
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.markdown("### 🎯 Events per Sport")
-        if 'sport' in filtered_events.columns:
-            events_per_sport = filtered_events['sport'].value_counts().reset_index()
-            events_per_sport.columns = ['sport', 'count']
-            
-            fig_events = px.bar(
-                events_per_sport.head(15),
-                x='count',
-                y='sport',
-                orientation='h',
-                title="Number of Events by Sport (Top 15)",
-                color='count',
-                color_continuous_scale='Plasma',
-                text='count'
-            )
-            fig_events.update_traces(textposition='auto')
-            fig_events.update_layout(showlegend=False, height=500)
-            st.plotly_chart(fig_events, use_container_width=True)
-    
+        if 'events' in figures:
+            plotly_chart(figures['events'], use_container_width=True)
+
     with col2:
         st.markdown("### 👥 Athlete Participation by Discipline")
-        if 'disciplines' in athletes.columns:
-            # Split disciplines and count
-            discipline_list = []
-            for disciplines_str in athletes['disciplines'].dropna():
-                disciplines = [d.strip() for d in str(disciplines_str).split(',')]
-                discipline_list.extend(disciplines)
-            
-            if discipline_list:
-                discipline_counts = pd.Series(discipline_list).value_counts().reset_index()
-                discipline_counts.columns = ['discipline', 'athletes']
-                
-                fig_athletes = px.bar(
-                    discipline_counts.head(15),
-                    x='athletes',
-                    y='discipline',
-                    orientation='h',
-                    title="Number of Athletes by Discipline (Top 15)",
-                    color='athletes',
-                    color_continuous_scale='Viridis',
-                    text='athletes'
-                )
-                fig_athletes.update_traces(textposition='auto')
-                fig_athletes.update_layout(showlegend=False, height=500)
-                st.plotly_chart(fig_athletes, use_container_width=True)
-    
+        if 'athletes' in figures:
+            plotly_chart(figures['athletes'], use_container_width=True)
+
     # Medal timeline
     st.markdown("### 📅 Medal Awards Timeline")
-    if 'medal_date' in filtered_medals.columns:
-        filtered_medals['medal_date'] = pd.to_datetime(filtered_medals['medal_date'], errors='coerce')
-        medals_by_date = filtered_medals.dropna(subset=['medal_date']).groupby('medal_date').size().reset_index(name='count')
-        
-        fig_timeline = px.line(
-            medals_by_date,
-            x='medal_date',
-            y='count',
-            title="Medals Awarded Over Time",
-            labels={'medal_date': 'Date', 'count': 'Number of Medals'},
-            markers=True
-        )
-        
-        fig_timeline.update_layout(height=400)
-        st.plotly_chart(fig_timeline, use_container_width=True)
-    
+    if 'timeline' in figures:
+        plotly_chart(figures['timeline'], use_container_width=True)
+
     # Sport comparison
     st.markdown("### 📊 Sport/Discipline Comparison Dashboard")
-    
-    if not filtered_medals.empty and 'discipline' in filtered_medals.columns:
-        selected_disciplines_compare = st.multiselect(
-            "Select disciplines to compare (up to 5)",
-            sorted(filtered_medals['discipline'].unique()),
-            max_selections=5,
-            default=list(filtered_medals['discipline'].unique()[:3]) if len(filtered_medals['discipline'].unique()) >= 3 else []
-        )
-        
-        if selected_disciplines_compare:
-            comparison_data = []
-            for discipline in selected_disciplines_compare:
-                discipline_medals = filtered_medals[filtered_medals['discipline'] == discipline]
-                comparison_data.append({
-                    'Discipline': discipline,
-                    'Gold': len(discipline_medals[discipline_medals['medal_type'] == 'Gold Medal']),
-                    'Silver': len(discipline_medals[discipline_medals['medal_type'] == 'Silver Medal']),
-                    'Bronze': len(discipline_medals[discipline_medals['medal_type'] == 'Bronze Medal']),
-                    'Total': len(discipline_medals)
-                })
-            
-            comparison_df = pd.DataFrame(comparison_data)
-            
-            # Create grouped bar chart
-            fig_compare = go.Figure()
-            fig_compare.add_trace(go.Bar(
-                name='Gold', 
-                x=comparison_df['Discipline'], 
-                y=comparison_df['Gold'], 
-                marker_color='#FFD700',
-                text=comparison_df['Gold'],
-                textposition='auto'
-            ))
-            fig_compare.add_trace(go.Bar(
-                name='Silver', 
-                x=comparison_df['Discipline'], 
-                y=comparison_df['Silver'], 
-                marker_color='#C0C0C0',
-                text=comparison_df['Silver'],
-                textposition='auto'
-            ))
-            fig_compare.add_trace(go.Bar(
-                name='Bronze', 
-                x=comparison_df['Discipline'], 
-                y=comparison_df['Bronze'], 
-                marker_color='#CD7F32',
-                text=comparison_df['Bronze'],
-                textposition='auto'
-            ))
-            
-            fig_compare.update_layout(
-                title="Medal Comparison Across Disciplines",
-                xaxis_title="Discipline",
-                yaxis_title="Number of Medals",
-                barmode='group',
-                height=450
+
+    # The comparison runs as a fragment: editing the discipline picks only
+    # reruns the comparison chart and table.
+    @st.fragment
+    @timed("discipline comparison")
+    def render_discipline_comparison(filtered_medals):
+        if not filtered_medals.empty and 'discipline' in filtered_medals.columns:
+            discipline_medals = load_medal_table(filter_key, 'discipline')
+            selected_disciplines_compare = st.multiselect(
+                "Select disciplines to compare (up to 5)",
+                list(discipline_medals.index),
+                max_selections=5,
+                default=list(discipline_medals.index[:3]) if len(discipline_medals) >= 3 else []
             )
-            
-            st.plotly_chart(fig_compare, use_container_width=True)
-            
-            # Comparison table
-            st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+
+            if selected_disciplines_compare:
+                # Row lookups in the precomputed table: the cost does not
+                # depend on how many disciplines are compared
+                comparison_df = (
+                    discipline_medals.loc[selected_disciplines_compare]
+                    .rename_axis('Discipline').rename_axis(None, axis=1).reset_index()
+                )
+
+                # Create grouped bar chart
+                fig_compare = go.Figure()
+                fig_compare.add_trace(go.Bar(
+                    name='Gold', 
+                    x=comparison_df['Discipline'], 
+                    y=comparison_df['Gold'], 
+                    marker_color='#FFD700',
+                    text=comparison_df['Gold'],
+                    textposition='auto'
+                ))
+                fig_compare.add_trace(go.Bar(
+                    name='Silver', 
+                    x=comparison_df['Discipline'], 
+                    y=comparison_df['Silver'], 
+                    marker_color='#C0C0C0',
+                    text=comparison_df['Silver'],
+                    textposition='auto'
+                ))
+                fig_compare.add_trace(go.Bar(
+                    name='Bronze', 
+                    x=comparison_df['Discipline'], 
+                    y=comparison_df['Bronze'], 
+                    marker_color='#CD7F32',
+                    text=comparison_df['Bronze'],
+                    textposition='auto'
+                ))
+
+                fig_compare.update_layout(
+                    title="Medal Comparison Across Disciplines",
+                    xaxis_title="Discipline",
+                    yaxis_title="Number of Medals",
+                    barmode='group',
+                    height=450
+                )
+
+                plotly_chart(fig_compare, use_container_width=True)
+
+                # Comparison table
+                st.dataframe(comparison_df, use_container_width=True, hide_index=True)
+
+    render_discipline_comparison(filtered_medals)
+
+# Main content tabs. st.tabs would run all four bodies on every rerun, so the
+# tab bar is a horizontal radio and only the selected view is rendered.
+TAB_LABELS = ["📅 Event Schedule", "🏆 Medal Analysis", "🗺️ Venue Map", "🎨 Sport Insights"]
+
+selected_tab = st.radio(
+    "View",
+    TAB_LABELS,
+    horizontal=True,
+    key="sports_events_tab",
+    label_visibility="collapsed"
+)
+
+if selected_tab == TAB_LABELS[0]:
+    render_schedule_tab()
+elif selected_tab == TAB_LABELS[1]:
+    render_medal_tab()
+elif selected_tab == TAB_LABELS[2]:
+    render_venue_tab()
+else:
+    render_insights_tab(filtered_medals)
 
 # Footer
 st.markdown("---")
@@ -633,4 +976,7 @@ st.markdown("""
     <p>🏟️ <strong>Paris 2024 Olympics - Sports & Events Analysis</strong></p>
     <p>Built with ❤️ using Streamlit | Data powered by competitive spirit</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+render_snapshot_version(snapshot)
+render_debug_panel()
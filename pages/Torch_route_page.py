@@ -2,6 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.search_box import load_search_index, render_global_search
+from utils.search_index import search
+from utils.ingest import data_path, read_table
+from utils.instrumentation import begin_run, lap, timed, plotly_chart, render_debug_panel
+from utils.memory import select
+from utils.snapshots import pin_snapshot, render_snapshot_version
 
 # Page configuration
 st.set_page_config(
@@ -101,10 +111,10 @@ CITY_COORDINATES = {
 }
 
 # Load the torch route data
-@st.cache_data
-def load_torch_data():
+@st.cache_data(max_entries=2)
+def load_torch_data(version):
     try:
-        df = pd.read_csv('data/torch_route.csv')
+        df = read_table(data_path('torch_route.csv'))
         return df
     except FileNotFoundError:
         st.error("⚠️ torch_route.csv file not found. Please ensure the file is in the correct directory.")
@@ -143,11 +153,19 @@ def add_coordinates(df):
     coords_df = pd.DataFrame(coords)
     return pd.concat([df, coords_df], axis=1)
 
-df_torch = load_torch_data()
+begin_run("Torch Route")
+
+# Every table of this rerun comes from one dataset snapshot; cached loaders
+# are keyed on its version, so a newly swapped-in snapshot gets new entries
+snapshot = pin_snapshot()
+version = snapshot["version"]
+
+df_torch = load_torch_data(version)
 
 if df_torch is not None:
     # Add coordinates
     df_torch = add_coordinates(df_torch)
+    lap("data load (with coordinates)", rows_out=len(df_torch))
     
     # Display dataset info
     with st.expander("📊 Dataset Information"):
@@ -156,6 +174,9 @@ if df_torch is not None:
         st.dataframe(df_torch[['stage_number', 'city', 'title', 'date_start', 'date_end', 'tag']].head(10))
     
     # Sidebar filters
+    with st.sidebar:
+        render_global_search(version)
+
     st.sidebar.header("🎛️ Map Controls")
     
     # Map style selection
@@ -185,14 +206,15 @@ if df_torch is not None:
             max_value=max_date
         )
         if len(date_range) == 2:
-            df_filtered = df_torch[
-                (df_torch['date_start'].dt.date >= date_range[0]) &
-                (df_torch['date_start'].dt.date <= date_range[1])
-            ].copy()
+            df_filtered = select(
+                df_torch,
+                df_torch['date_start'].dt.date >= date_range[0],
+                df_torch['date_start'].dt.date <= date_range[1]
+            )
         else:
-            df_filtered = df_torch.copy()
+            df_filtered = df_torch
     else:
-        df_filtered = df_torch.copy()
+        df_filtered = df_torch
     
     # Tag filter
     if 'tag' in df_torch.columns:
@@ -208,6 +230,7 @@ if df_torch is not None:
     
     # Sort by stage number
     df_filtered = df_filtered.sort_values('stage_number').reset_index(drop=True)
+    lap("sidebar + filtering", rows_in=len(df_torch), rows_out=len(df_filtered))
     
     # Create columns for layout
     col1, col2 = st.columns([3, 1])
@@ -381,7 +404,7 @@ if df_torch is not None:
             
             # Update layout
             fig.update_layout(mapbox_style=map_style)
-            st.plotly_chart(fig, use_container_width=True)
+            plotly_chart(fig, stage_name=f"route map ({viz_type})", use_container_width=True)
             
         else:
             st.warning("⚠️ No data to display with current filters.")
@@ -444,8 +467,9 @@ if df_torch is not None:
     
     if df_filtered['date_start'].notna().any():
         # Prepare timeline data
-        timeline_df = df_filtered[['city', 'date_start', 'title', 'stage_number']].copy()
-        timeline_df['date_start'] = pd.to_datetime(timeline_df['date_start'])
+        timeline_df = df_filtered[['city', 'date_start', 'title', 'stage_number']].assign(
+            date_start=lambda df: pd.to_datetime(df['date_start'])
+        )
         
         # Create daily view
         daily_counts = timeline_df.groupby(timeline_df['date_start'].dt.date).size().reset_index()
@@ -467,27 +491,34 @@ if df_torch is not None:
             showlegend=False
         )
         
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        plotly_chart(fig_timeline, use_container_width=True)
     
     # Data table
     st.markdown("---")
     st.subheader("📋 Detailed Schedule")
     
-    search_term = st.text_input("🔍 Search cities or events:")
-    
-    display_df = df_filtered.copy()
-    if search_term:
-        mask = (
-            display_df['city'].astype(str).str.contains(search_term, case=False, na=False) |
-            display_df['title'].astype(str).str.contains(search_term, case=False, na=False)
+    # The search runs as a fragment: each keystroke only reruns the table,
+    # not the map, stats and timeline above it.
+    @st.fragment
+    @timed("detailed schedule")
+    def render_detailed_schedule(df_filtered):
+        search_term = st.text_input("🔍 Search cities or events:")
+
+        display_df = df_filtered
+        if search_term:
+            # Ranked matches from the prebuilt index instead of a scan per keystroke
+            matches = search(load_search_index(version), search_term, k=len(df_torch), kinds=["torch"])["key"]
+            rank = pd.Series(range(len(matches)), index=matches.to_numpy())
+            display_df = display_df[display_df['tag'].isin(rank.index)]
+            display_df = display_df.iloc[rank[display_df['tag']].to_numpy().argsort()]
+
+        st.dataframe(
+            display_df[['stage_number', 'city', 'title', 'date_start', 'date_end', 'tag']],
+            use_container_width=True,
+            hide_index=True
         )
-        display_df = display_df[mask]
-    
-    st.dataframe(
-        display_df[['stage_number', 'city', 'title', 'date_start', 'date_end', 'tag']],
-        use_container_width=True,
-        hide_index=True
-    )
+
+    render_detailed_schedule(df_filtered)
 
 else:
     st.info("📁 Please ensure the torch_route.csv file is in the project directory.")
@@ -499,4 +530,7 @@ st.markdown(
     "🔥 Paris 2024 Olympic Torch Relay Dashboard | Built with Streamlit & Plotly"
     "</div>",
     unsafe_allow_html=True
-)
\ No newline at end of file
+)
+
+render_snapshot_version(snapshot)
+render_debug_panel()
@@ -0,0 +1,41 @@
+import pandas as pd
+
+from utils.ingest import parse_list, read_csvs
+
+
+def write_csvs(tmp_path, sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / f"table_{i}.csv"
+        pd.DataFrame({"file": i, "row": range(size)}).to_csv(path, index=False)
+        paths.append(str(path))
+    return paths
+
+
+def test_frames_keep_the_order_of_the_paths(tmp_path):
+    # The first file is the largest, so it is not the first one parsed
+    paths = write_csvs(tmp_path, [200_000, 10, 1_000, 5])
+    calls = []
+    frames = read_csvs(paths, workers=3, progress=lambda done, total, path: calls.append((done, total, path)))
+    assert [frame["file"].iloc[0] for frame in frames] == [0, 1, 2, 3]
+    assert [len(frame) for frame in frames] == [200_000, 10, 1_000, 5]
+    assert [done for done, _, _ in calls] == [1, 2, 3, 4]
+    assert sorted(path for _, _, path in calls) == sorted(paths)
+
+
+def test_serial_read_and_read_csv_options(tmp_path):
+    paths = write_csvs(tmp_path, [3, 2])
+    calls = []
+    frames = read_csvs(paths, workers=1, usecols=["row"], progress=lambda *args: calls.append(args))
+    assert [frame.columns.tolist() for frame in frames] == [["row"], ["row"]]
+    assert calls == [(1, 2, paths[0]), (2, 2, paths[1])]
+    assert read_csvs([]) == []
+
+
+def test_parse_list():
+    assert parse_list("['Archery', 'Diving']") == ["Archery", "Diving"]
+    assert parse_list("Archery") == ["Archery"]
+    assert parse_list("['unclosed") == ["['unclosed"]
+    assert parse_list("[not python]") == []
+    assert parse_list(float("nan")) == []
+    assert parse_list(["Judo"]) == ["Judo"]
@@ -0,0 +1,33 @@
+import pandas as pd
+
+from utils.live_feed import LiveAggregates
+
+
+def seed_standings():
+    return pd.DataFrame({
+        "country_code": ["SVN", "FRA"],
+        "country": ["Slovenia", "France"],
+        "country_long": ["Slovenia", "France"],
+        "Gold": [2, 16], "Silver": [1, 26], "Bronze": [0, 22],
+        "continent": ["Europe", "Europe"],
+    })
+
+
+def test_medals_code_is_matched_to_the_seed_country():
+    live = LiveAggregates(seed_standings())
+    assert live.apply({"medal_type": "Gold Medal", "country_code": "SLV", "country": "Slovenia"})
+    assert live.apply({"medal_type": "Bronze Medal", "country_code": "SLV", "country": "Slovenia"})
+
+    standings = live.standings().set_index("country_code")
+    assert list(standings.index) == ["SVN", "FRA"]
+    assert standings.loc["SVN", ["Gold", "Silver", "Bronze", "Total"]].tolist() == [3, 1, 1, 5]
+    assert "Other" not in live.continent_totals().index
+    assert live.continent_totals().loc["Europe", "Total"] == 2 + 1 + 16 + 26 + 22 + 2
+
+
+def test_unknown_country_gets_its_own_row():
+    live = LiveAggregates(seed_standings())
+    live.apply({"medal_type": "Silver Medal", "country_code": "ZZZ", "country": "Zedland"})
+
+    standings = live.standings().set_index("country_code")
+    assert standings.loc["ZZZ", ["Silver", "Total", "continent"]].tolist() == [1, 1, "Other"]
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from utils.medal_pivot import medal_long, medal_table
+
+
+def medals():
+    return pd.DataFrame({
+        "country_code": ["FRA", "FRA", "FRA", "JPN", "JPN"],
+        "discipline": ["Judo", "Judo", "Rowing", "Judo", "Judo"],
+        "medal_type": ["Gold Medal", "Bronze Medal", "Gold Medal", "Gold Medal", "Silver Medal"],
+    })
+
+
+def test_medal_rows_are_counted_per_group():
+    table = medal_table(medals(), ["country_code", "discipline"])
+    assert list(table.columns) == ["Gold", "Silver", "Bronze", "Total"]
+    assert table.loc[("FRA", "Judo")].tolist() == [1, 0, 1, 2]
+    assert table.loc[("FRA", "Rowing")].tolist() == [1, 0, 0, 1]
+    assert table.loc[("JPN", "Judo")].tolist() == [1, 1, 0, 2]
+
+
+def test_wide_frames_are_summed_and_medal_types_selected():
+    totals = pd.DataFrame({"continent": ["Europe", "Europe", "Asia"], "Gold": [16, 2, 20],
+                           "Silver": [26, 1, 12], "Bronze": [22, 0, 13]})
+    table = medal_table(totals, "continent", ["Gold", "Bronze"])
+    assert list(table.columns) == ["Gold", "Bronze", "Total"]
+    assert table.loc["Europe"].tolist() == [18, 22, 40]
+    assert table.loc["Asia"].tolist() == [20, 13, 33]
+
+
+def test_medal_types_without_medals_are_zero_columns():
+    table = medal_table(medals()[lambda df: df["medal_type"] == "Gold Medal"], "country_code")
+    assert table.loc["JPN"].tolist() == [1, 0, 0, 1]
+
+
+def test_long_form():
+    long = medal_long(medal_table(medals(), "country_code"))
+    assert list(long.columns) == ["country_code", "medal", "count"]
+    assert long.set_index(["country_code", "medal"])["count"].to_dict() == {
+        ("FRA", "Gold"): 2, ("FRA", "Silver"): 0, ("FRA", "Bronze"): 1,
+        ("JPN", "Gold"): 1, ("JPN", "Silver"): 1, ("JPN", "Bronze"): 0,
+    }
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from utils.medal_ranking import (build_daily_standings, build_medallist_counts, official_ranks, rank_history, rank_on,
+                                 standings_frame, top_medallists)
+
+
+def test_gold_first_then_silver_then_bronze():
+    table = pd.DataFrame({"country": ["A", "B", "C", "D"], "Gold": [1, 2, 1, 1],
+                          "Silver": [5, 0, 5, 6], "Bronze": [0, 0, 3, 0]})
+    ranked = official_ranks(table)
+    assert ranked["country"].tolist() == ["B", "D", "C", "A"]
+    assert ranked["rank"].tolist() == [1, 2, 3, 4]
+
+
+def test_equal_gold_silver_bronze_share_a_rank_in_name_order():
+    table = pd.DataFrame({"country": ["Norway", "Chile", "Spain", "Brazil", "Peru"], "Gold": [3, 1, 1, 1, 0],
+                          "Silver": [0, 2, 2, 2, 0], "Bronze": [0, 1, 1, 1, 4]})
+    ranked = official_ranks(table)
+    assert ranked["country"].tolist() == ["Norway", "Brazil", "Chile", "Spain", "Peru"]
+    # The next rank after a tie skips the shared places
+    assert ranked["rank"].tolist() == [1, 2, 2, 2, 5]
+
+
+def test_only_the_selected_medal_types_count():
+    table = pd.DataFrame({"country": ["A", "B"], "Gold": [2, 0], "Silver": [0, 0], "Bronze": [1, 3]})
+    ranked = official_ranks(table, ["Bronze"])
+    assert ranked["country"].tolist() == ["B", "A"]
+
+
+def medals():
+    rows = [
+        ("2024-07-27", "FRA", "France", "Gold Medal"),
+        ("2024-07-27", "JPN", "Japan", "Silver Medal"),
+        ("2024-07-28", "JPN", "Japan", "Gold Medal"),
+        ("2024-07-28", "USA", "United States", "Bronze Medal"),
+        ("2024-07-29", "USA", "United States", "Gold Medal"),
+        ("2024-07-29", "USA", "United States", "Gold Medal"),
+    ]
+    return pd.DataFrame(rows, columns=["medal_date", "country_code", "country", "medal_type"])
+
+
+def test_daily_standings_are_cumulative():
+    standings = build_daily_standings(medals())
+    assert standings["counts"][:, standings["country_pos"]["JPN"]].tolist() == [[0, 1, 0], [1, 1, 0], [1, 1, 0]]
+    assert rank_on(standings, "2024-07-27", "FRA") == 1
+    assert rank_on(standings, "2024-07-27", "USA") == 0
+    assert rank_on(standings, "2024-07-28", "JPN") == 1
+    assert rank_on(standings, "2024-07-29", "USA") == 1
+
+    history = rank_history(standings, ["USA", "ZZZ", "FRA"])
+    assert list(history.columns) == ["USA", "FRA"]
+    assert np.isnan(history["USA"].iloc[0])
+    assert history["USA"].iloc[1:].tolist() == [3.0, 1.0]
+    assert history["FRA"].tolist() == [1.0, 2.0, 3.0]
+
+
+def test_standings_frame_top():
+    frame = standings_frame(build_daily_standings(medals()), top=1)
+    assert frame[["medal_date", "country", "rank"]].values.tolist() == [
+        ["2024-07-27", "France", 1], ["2024-07-28", "Japan", 1], ["2024-07-29", "United States", 1]
+    ]
+
+
+def test_top_medallists_under_filters():
+    athlete_medals = pd.DataFrame({
+        "code_athlete": ["1", "1", "1", "2", "2", "3"],
+        "name": ["Ana", "Ana", "Ana", "Ben", "Ben", "Cy"],
+        "country_code": ["FRA", "FRA", "FRA", "JPN", "JPN", "FRA"],
+        "discipline": ["Judo", "Judo", "Rowing", "Judo", "Judo", "Judo"],
+        "medal_type": ["Gold Medal", "Silver Medal", "Gold Medal", "Gold Medal", "Gold Medal", "Bronze Medal"],
+        "medal_kind": ["Individual", "Team", "Team", "Individual", "Individual", "Individual"],
+    })
+    counts = build_medallist_counts(athlete_medals)
+
+    top = top_medallists(counts, 2)
+    assert top["code_athlete"].unique().tolist() == ["1", "2"]
+    assert top[top["code_athlete"] == "1"].set_index("medal_kind")["medal_count"].to_dict() == {"Individual": 1, "Team": 2}
+
+    judo_gold = top_medallists(counts, 10, discipline=["Judo"], medal_type=["Gold Medal"])
+    assert judo_gold.groupby("code_athlete")["medal_count"].sum().to_dict() == {"2": 2, "1": 1}
+    assert top_medallists(counts, 10, country_code=["FRA"], medal_type=["Bronze Medal"])["name"].tolist() == ["Cy"]
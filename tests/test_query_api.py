@@ -0,0 +1,145 @@
+import json
+import threading
+from collections import OrderedDict
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from utils import query_api
+from utils.ingest import explode_list_column
+from utils.query_api import kpis, normalize_params, overview_filter, query, schedule, standings
+from utils.query_server import QueryHandler
+from utils.schedule_index import build_schedule_index
+
+
+def tables():
+    athletes = pd.DataFrame({
+        "code": [1, 2, 3, 4],
+        "country_code": ["FRA", "FRA", "JPN", "CHN"],
+        "disciplines": ["['Swimming']", "['Swimming', 'Marathon Swimming']", "['Judo']", "['Marathon Swimming']"],
+    })
+    medals_total = pd.DataFrame({
+        "country_code": ["FRA", "JPN", "CHN"],
+        "country": ["France", "Japan", "China"],
+        "continent": ["Europe", "Asia", "Asia"],
+        "Gold": [2, 2, 1], "Silver": [1, 1, 4], "Bronze": [0, 0, 0],
+    })
+    schedules = pd.DataFrame({
+        "discipline": ["Judo", "Judo", "Judo"],
+        "venue": ["Champ-de-Mars Arena"] * 3,
+        "start_date": ["2024-07-27T10:00+02:00", "2024-07-27T16:00+02:00", "2024-07-28T10:00+02:00"],
+        "end_date": ["2024-07-27T14:00+02:00", "2024-07-27T20:00+02:00", "2024-07-28T14:00+02:00"],
+    })
+    return {
+        "athletes": athletes,
+        "nocs": pd.DataFrame({"code": ["FRA", "JPN", "CHN"], "country": ["France", "Japan", "China"]}),
+        "events": pd.DataFrame({"sport": ["Swimming", "Judo", "Judo"], "sport_code": ["SWM", "JUD", "JUD"]}),
+        "medals_total": medals_total,
+        "athlete_disciplines": explode_list_column(athletes["disciplines"]),
+        "schedule_index": build_schedule_index(schedules),
+    }
+
+
+def test_normalize_params():
+    assert normalize_params({"countries": ["Japan", "France", "Japan"], "top": ["3", "5"], "discipline": "Judo"}) == (
+        ("countries", ("France", "Japan")), ("discipline", "Judo"), ("top", 5)
+    )
+    assert normalize_params({"countries": "France", "discipline": []}) == (("countries", ("France",)),)
+    with pytest.raises(ValueError, match="top must be an integer"):
+        normalize_params({"top": "five"})
+
+
+def test_sports_are_matched_exactly():
+    t = tables()
+    # "Swimming" is not a regex: Marathon Swimming athletes are not selected
+    assert overview_filter(t, sports=["Swimming"])["athletes"]["code"].tolist() == [1, 2]
+    assert kpis(t, sports=["C++"])["athletes"] == 0
+    assert kpis(t, countries=["France"], medal_types=["Gold"]) == {
+        "athletes": 2, "countries": 1, "sports": 2, "medals": 2, "events": 3
+    }
+
+
+def test_standings_ties():
+    rows = standings(tables())
+    assert [(row["country"], row["rank"]) for row in rows] == [("France", 1), ("Japan", 1), ("China", 3)]
+    assert [row["country"] for row in standings(tables(), medal_types=["Silver"], top=1)] == ["China"]
+
+
+def test_schedule_pages():
+    page = schedule(tables(), "Judo", start="2024-07-27", end="2024-07-27", page=9, page_size=1)
+    assert (page["sessions"], page["page"], page["pages"]) == (2, 2, 2)
+    assert len(page["rows"]) == 1
+    assert schedule(tables(), "Judo")["sessions"] == 3
+
+
+@pytest.mark.parametrize("name, params, message", [
+    ("kpis", {"colour": "blue"}, "Invalid parameters for kpis"),
+    ("kpis", {"tables": "x"}, "Invalid parameters for kpis"),
+    ("options", {"top": "1"}, "Invalid parameters for options"),
+    ("standings", {"top": "ten"}, "top must be an integer"),
+])
+def test_invalid_parameters_are_rejected_before_loading(name, params, message):
+    with pytest.raises(ValueError, match=message):
+        query(name, params, version="unused")
+
+
+def test_invalid_values():
+    with pytest.raises(ValueError, match="Unknown medal types"):
+        standings(tables(), medal_types=["Platinum"])
+    with pytest.raises(ValueError, match="Unknown discipline"):
+        schedule(tables(), "Curling")
+    with pytest.raises(ValueError, match="page_size"):
+        schedule(tables(), "Judo", page_size=0)
+    with pytest.raises(KeyError):
+        query("nope", {})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    t = tables()
+    monkeypatch.setattr(query_api, "pin_snapshot", lambda: {"version": "test"})
+    monkeypatch.setattr(query_api, "load_tables", lambda version: t)
+    monkeypatch.setattr(query_api, "_live", lambda version, tables: None)
+    monkeypatch.setattr(query_api, "_RESPONSES", OrderedDict())
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), QueryHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(address, path, headers=None):
+    connection = HTTPConnection(*address, timeout=5)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        reply = connection.getresponse()
+        body = reply.read()
+        return reply.status, reply.getheader("ETag"), json.loads(body) if body else None
+    finally:
+        connection.close()
+
+
+def test_http_status_codes(server):
+    status, etag, body = get(server, "/standings?medal_types=Gold&top=2")
+    assert status == 200
+    assert [(row["country"], row["rank"]) for row in body] == [("France", 1), ("Japan", 1)]
+    assert get(server, "/standings?top=2&medal_types=Gold", {"If-None-Match": etag})[:2] == (304, etag)
+
+    for path, message in [
+        ("/standings?top=ten", "top must be an integer"),
+        ("/standings?medal_types=Platinum", "Unknown medal types"),
+        ("/kpis?colour=blue", "Invalid parameters"),
+        ("/schedule?discipline=Judo&page_size=0", "page_size"),
+        ("/schedule?discipline=Curling", "Unknown discipline"),
+    ]:
+        status, _, body = get(server, path)
+        assert status == 400, path
+        assert message in body["error"]
+
+    status, _, body = get(server, "/medals")
+    assert status == 404
+    assert "standings" in body["queries"]
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+from utils.relationship_graph import (athlete_coaches, build_relationship_graph, coach_name, coach_success,
+                                      coached_athletes, neighbours, split_coaches, teammates)
+
+
+def graph():
+    athletes = pd.DataFrame({
+        "code": [1, 2, 3, 4],
+        "name": ["Ana", "Ben", "Cy", "Dee"],
+        "disciplines": ["['Rowing']", "['Rowing']", "['Judo']", "['Athletics']"],
+        "events": ['["Men\'s Eight"]', '["Men\'s Eight"]', "['Men -73 kg']", '["Men\'s Eight"]'],
+        # Names in either order, with the trailing dot of the last one
+        "coach": ["John SMITH.<br>DOE Jane.", None, "SMITH John", "Unknown PERSON"],
+    })
+    teams = pd.DataFrame({
+        "code": ["T1", "T2"],
+        "athletes": ["['Ana', 'Ben']", "['Ana', 'Eve']"],
+        "athletes_codes": ["['1', '2']", "['1', '5']"],
+        "coaches_codes": ["['C2']", None],
+    })
+    coaches = pd.DataFrame({
+        "code": ["C1", "C2", "C3", "C4"],
+        "name": ["SMITH John", "LEE Kim", "DOE Jane", "IDLE Ida"],
+        "function": ["Coach", "Head Coach", "Coach", "Coach"],
+    })
+    events = pd.DataFrame({"sport": ["Rowing", "Judo", "Athletics"], "event": ["Men's Eight", "Men -73 kg", "Men's 100m"]})
+    return build_relationship_graph(athletes, teams, coaches, events, medallist_codes=["1", "5", "99"])
+
+
+def test_split_coaches():
+    assert split_coaches("SMITH John.<br>DOE Jane.") == ["SMITH John", "DOE Jane"]
+    assert split_coaches(np.nan) == []
+
+
+def test_adjacency_is_csr_in_both_directions():
+    g = graph()
+    # Team-only athletes get nodes too
+    assert g["nodes"]["athlete"].tolist() == ["1", "2", "3", "4", "5"]
+    indptr, indices = g["adj"][("athlete", "team")]
+    assert indptr.tolist() == [0, 2, 3, 3, 3, 4]
+    assert indices.tolist() == [0, 1, 0, 1]
+    assert neighbours(g, "team", "athlete", "T2") == ["1", "5"]
+    assert g["athlete_names"]["5"] == "Eve"
+    assert g["medallist"].tolist() == [True, False, False, False, True]
+
+
+def test_teammates():
+    g = graph()
+    assert teammates(g, "1") == ["2", "5"]
+    assert teammates(g, "2") == ["1"]
+    assert teammates(g, "3") == []
+    assert teammates(g, "missing") == []
+
+
+def test_coaches_by_name_and_through_teams():
+    g = graph()
+    assert athlete_coaches(g, "1") == ["C1", "C2", "C3"]
+    assert athlete_coaches(g, "2") == ["C2"]
+    assert athlete_coaches(g, "3") == ["C1"]
+    assert athlete_coaches(g, "4") == []
+    assert coached_athletes(g, "C1") == ["1", "3"]
+    assert coached_athletes(g, "C2") == ["1", "2"]
+
+
+def test_coach_success():
+    g = graph()
+    assert coach_success(g, "C1") == (2, 1, 0.5)
+    assert coach_success(g, "C3") == (1, 1, 1.0)
+    assert coach_success(g, "C4") == (0, 0, 0.0)
+    assert coach_name(g, "C2") == "LEE Kim"
+    assert coach_name(g, "C9") == "C9"
+
+
+def test_events_are_keyed_by_discipline():
+    g = graph()
+    assert neighbours(g, "event", "athlete", "Rowing: Men's Eight") == ["1", "2"]
+    # Athletics has no "Men's Eight" in events.csv
+    assert neighbours(g, "athlete", "event", "4") == []
+    assert neighbours(g, "athlete", "event", "3") == ["Judo: Men -73 kg"]
@@ -0,0 +1,34 @@
+import pandas as pd
+
+from utils.schedule_diff import diff_sessions
+
+
+def sessions(rows):
+    return pd.DataFrame([
+        {"venue_code": venue, "discipline_code": discipline, "start": pd.Timestamp(start, tz="UTC"),
+         "end": pd.Timestamp(end, tz="UTC"), "label": label}
+        for venue, discipline, start, end, label in rows
+    ])
+
+
+def test_sessions_inside_a_preliminary_block_are_refined():
+    base = sessions([
+        ("AQU", "SWM", "2024-07-28 09:00", "2024-07-28 12:00", "Morning block"),
+        ("AQU", "SWM", "2024-07-28 18:30", "2024-07-28 20:30", "Evening block"),
+    ])
+    updated = sessions([
+        ("AQU", "SWM", "2024-07-28 09:00", "2024-07-28 12:00", "Heats"),
+        ("AQU", "SWM", "2024-07-28 18:30", "2024-07-28 18:45", "Semifinal"),
+        ("AQU", "SWM", "2024-07-28 19:40", "2024-07-28 19:50", "Final"),
+        ("AQU", "SWM", "2024-07-28 20:20", "2024-07-28 20:40", "Final past the block"),
+        ("PDP", "SWM", "2024-07-28 19:40", "2024-07-28 19:50", "Other venue"),
+    ])
+
+    changes = diff_sessions(base, updated).set_index("new_label")["change"]
+    assert changes.to_dict() == {
+        "Heats": "unchanged",
+        "Semifinal": "retimed",
+        "Final": "refined",
+        "Final past the block": "added",
+        "Other venue": "added",
+    }
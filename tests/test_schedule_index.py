@@ -0,0 +1,62 @@
+import pandas as pd
+
+from utils.schedule_index import (SCHEDULE_TZ, build_schedule_index, group_span, page_count, session_page,
+                                  window_positions)
+
+
+def paris(text):
+    return pd.Timestamp(text, tz=SCHEDULE_TZ)
+
+
+def schedule():
+    rows = [
+        # A two-day session, longer than any one-day window
+        ("Sailing", "2024-07-28 11:00", "2024-07-30 18:00", "Regatta"),
+        ("Swimming", "2024-07-28 20:30", "2024-07-28 22:30", "Finals"),
+        ("Swimming", "2024-07-28 11:00", "2024-07-28 13:00", "Heats"),
+        ("Swimming", "2024-07-29 11:00", "2024-07-29 13:00", "Heats 2"),
+        ("Swimming", "2024-07-29 23:30", "2024-07-30 00:30", "Late heat"),
+        ("Swimming", "not a date", "2024-07-29 13:00", "Broken"),
+    ]
+    return pd.DataFrame([
+        {"discipline": discipline, "start_date": f"{start}+02:00", "end_date": f"{end}+02:00", "event": event}
+        for discipline, start, end, event in rows
+    ])
+
+
+def events(index, positions):
+    return index["sessions"]["event"].to_numpy()[positions].tolist()
+
+
+def test_sessions_are_sorted_per_group_and_invalid_dates_dropped():
+    index = build_schedule_index(schedule())
+    assert index["bounds"] == {"Sailing": (0, 1), "Swimming": (1, 5)}
+    assert events(index, range(1, 5)) == ["Heats", "Finals", "Heats 2", "Late heat"]
+    assert group_span(index, "Swimming") == (paris("2024-07-28 11:00"), paris("2024-07-30 00:30"))
+    assert group_span(index, "Judo") is None
+
+
+def test_window_keeps_sessions_longer_than_the_window():
+    index = build_schedule_index(schedule())
+    # The regatta started the day before and ends the day after
+    positions = window_positions(index, "Sailing", paris("2024-07-29"), paris("2024-07-30"))
+    assert events(index, positions) == ["Regatta"]
+
+
+def test_window_bounds_are_half_open():
+    index = build_schedule_index(schedule())
+    positions = window_positions(index, "Swimming", paris("2024-07-29"), paris("2024-07-30"))
+    # The late heat runs past midnight and still counts on the day it started
+    assert events(index, positions) == ["Heats 2", "Late heat"]
+    # A session ending exactly when the window opens is not in it
+    assert events(index, window_positions(index, "Swimming", paris("2024-07-28 13:00"), paris("2024-07-28 20:30"))) == []
+    assert len(window_positions(index, "Judo", paris("2024-07-28"), paris("2024-07-29"))) == 0
+
+
+def test_pages():
+    index = build_schedule_index(schedule())
+    positions = window_positions(index, "Swimming", paris("2024-07-28"), paris("2024-07-31"))
+    assert page_count(len(positions), 3) == 2
+    assert page_count(0, 3) == 1
+    assert session_page(index, positions, 2, 3)["event"].tolist() == ["Late heat"]
+    assert session_page(index, positions, 3, 3).empty
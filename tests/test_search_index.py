@@ -0,0 +1,66 @@
+import pandas as pd
+
+from utils.search_index import build_search_index, normalize, search
+
+
+def documents():
+    rows = [
+        ("athlete", "1", "Léon Marchand", "France · Swimming"),
+        ("athlete", "2", "Lea Li", "China · Diving"),
+        ("coach", "3", "Marc Dupont", "Coach · France · Judo"),
+        ("event", "Swimming: Men's 200m Butterfly", "Men's 200m Butterfly", "Swimming"),
+        ("venue", "Paris La Défense Arena", "Paris La Défense Arena", "Swimming, Water Polo"),
+    ]
+    return pd.DataFrame(rows, columns=["kind", "key", "label", "detail"])
+
+
+def labels(results):
+    return results["label"].tolist()
+
+
+def test_normalize():
+    assert normalize("Saint-Étienne") == "saint etienne"
+    assert normalize("  Men's 200m ") == "men s 200m"
+
+
+def test_trigrams_tolerate_typos_and_accents():
+    index = build_search_index(documents())
+    typo = search(index, "marchnd")
+    # "Marc" shares half of the typo's trigrams, the minimum score
+    assert labels(typo) == ["Léon Marchand", "Marc Dupont"]
+    assert typo["score"].tolist()[1] == 0.5
+    assert search(index, "marchnd", min_score=0.6)["label"].tolist() == ["Léon Marchand"]
+    assert labels(search(index, "leon marchand"))[0] == "Léon Marchand"
+    assert labels(search(index, "defense")) == ["Paris La Défense Arena"]
+
+
+def test_unfinished_last_word_is_a_prefix():
+    index = build_search_index(documents())
+    # "marc" is a word of the coach and the start of "marchand"
+    assert labels(search(index, "marc")) == ["Marc Dupont", "Léon Marchand"]
+
+
+def test_short_queries_only_match_prefixes_shorter_labels_first():
+    index = build_search_index(documents())
+    assert labels(search(index, "le")) == ["Lea Li", "Léon Marchand"]
+    assert labels(search(index, "m")) == ["Marc Dupont", "Léon Marchand", "Men's 200m Butterfly"]
+    # "ar" is inside "Marchand" and "Arena" but only starts "Arena"
+    assert labels(search(index, "ar")) == ["Paris La Défense Arena"]
+
+
+def test_misses_are_empty():
+    index = build_search_index(documents())
+    for query in ["zzzz", "qx", "", "  -  "]:
+        results = search(index, query)
+        assert results.empty
+        assert "score" in results.columns
+
+
+def test_kinds_and_k():
+    index = build_search_index(documents())
+    assert len(search(index, "swimming")) == 3
+    assert labels(search(index, "swimming", kinds=["venue"])) == ["Paris La Défense Arena"]
+    assert search(index, "swimming", kinds=["torch"]).empty
+    top = search(index, "swimming", k=1)
+    assert labels(top) == ["Léon Marchand"]
+    assert top["score"].iloc[0] >= search(index, "swimming")["score"].iloc[-1]
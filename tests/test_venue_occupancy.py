@@ -0,0 +1,72 @@
+import pandas as pd
+
+from utils.ingest import build_venue_sports, venue_codes
+from utils.venue_occupancy import (build_occupancy_index, concurrency_at, occupancy_matrix, peak_concurrency,
+                                   sessions_running_at)
+
+
+def schedules(rows):
+    return pd.DataFrame([
+        {"venue_code": code, "venue": venue, "discipline": discipline,
+         "start_date": f"2024-07-{start}+02:00", "end_date": f"2024-07-{end}+02:00"}
+        for code, venue, discipline, start, end in rows
+    ])
+
+
+def test_venues_csv_names_select_their_schedule_venues():
+    venues = pd.DataFrame({
+        "venue": ["La Concorde", "Aquatics Centre"],
+        "sports": ["['Skateboarding', 'Breaking']", "['Diving']"],
+    })
+    schedule = schedules([
+        ("LC1", "La Concorde 1", "Skateboarding", "27T12:00", "27T14:00"),
+        ("LC4", "La Concorde 4", "Breaking", "27T13:00", "27T15:00"),
+        ("AQC", "Aquatics Centre", "Diving", "27T10:00", "27T11:00"),
+        ("PDP", "Parc des Princes", "Football", "27T13:00", "27T15:00"),
+    ])
+
+    codes = venue_codes(build_venue_sports(venues, schedule), ["La Concorde"])
+    assert codes == ["LC1", "LC4"]
+
+    index = build_occupancy_index(schedule)
+    assert list(occupancy_matrix(index, venue_codes=codes).index) == ["La Concorde 1", "La Concorde 4"]
+    running = sessions_running_at(index, pd.Timestamp("2024-07-27 13:30", tz="Europe/Paris"), codes)
+    assert sorted(running["venue_code"]) == ["LC1", "LC4"]
+
+
+def occupancy():
+    return build_occupancy_index(schedules([
+        ("AQC", "Aquatics Centre", "Diving", "27T10:00", "27T12:00"),
+        # Back to back with the first: not an overlap
+        ("AQC", "Aquatics Centre", "Diving", "27T12:00", "27T13:00"),
+        ("AQC", "Aquatics Centre", "Water Polo", "27T12:30", "27T14:00"),
+        ("AQC", "Aquatics Centre", "Water Polo", "27T16:00", "27T17:00"),
+        # Across midnight: split between the two days
+        ("AQC", "Aquatics Centre", "Water Polo", "27T23:00", "28T01:00"),
+    ]))
+
+
+def test_concurrency_steps():
+    index = occupancy()
+    at = lambda time: concurrency_at(index, "AQC", pd.Timestamp(f"2024-07-27 {time}", tz="Europe/Paris"))
+    assert [at("09:00"), at("10:00"), at("12:00"), at("12:45"), at("14:00"), at("23:30")] == [0, 1, 1, 2, 0, 1]
+    assert concurrency_at(index, "PDP", pd.Timestamp("2024-07-27 12:00", tz="Europe/Paris")) == 0
+
+
+def test_daily_occupancy_gaps_and_overlaps():
+    index = occupancy()
+    daily = index["daily"].loc["AQC"]
+    first, second = pd.Timestamp("2024-07-27").date(), pd.Timestamp("2024-07-28").date()
+    assert daily.loc[first, ["busy_hours", "overlap_hours", "peak_concurrency", "sessions"]].tolist() == [6.0, 0.5, 2, 5]
+    assert daily.loc[second, ["busy_hours", "overlap_hours", "peak_concurrency", "sessions"]].tolist() == [1.0, 0.0, 1, 0]
+    assert peak_concurrency(index, "AQC", first) == 2
+    assert peak_concurrency(index, "AQC", pd.Timestamp("2024-08-01").date()) == 0
+
+    gaps = index["gaps"]["AQC"]
+    assert [(gap.start.strftime("%H:%M"), gap.end.strftime("%H:%M")) for gap in gaps.itertuples()] == [
+        ("14:00", "16:00"), ("17:00", "23:00")
+    ]
+    overlaps = index["overlaps"]["AQC"]
+    assert [(o.start.strftime("%H:%M"), o.end.strftime("%H:%M"), o.peak_concurrency) for o in overlaps.itertuples()] == [
+        ("12:30", "13:00", 2)
+    ]
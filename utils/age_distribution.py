@@ -0,0 +1,203 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Above this many points, scatter markers are drawn with WebGL (Scattergl)
+# instead of SVG, which is what makes the browser choke on big violins.
+WEBGL_POINT_THRESHOLD = 2000
+
+# Number of y-values each precomputed KDE curve is evaluated on
+KDE_GRID_SIZE = 48
+
+GENDER_COLORS = {"Male": "#3b82f6", "Female": "#ec4899"}
+
+
+def _kde_curve(ages, grid_size=KDE_GRID_SIZE):
+    """
+    Gaussian KDE of a group of ages, evaluated on a regular grid.
+
+    Ages are whole years, so the kernel sum runs over the distinct ages
+    weighted by their counts: the cost depends on the age range, not on the
+    number of athletes.
+    """
+    values, counts = np.unique(ages, return_counts=True)
+    n = counts.sum()
+    std = np.sqrt(np.average((values - np.average(values, weights=counts)) ** 2, weights=counts))
+    # Scott's rule, with a floor so single-age groups still draw a shape
+    bandwidth = max(1.06 * std * n ** (-1 / 5), 0.5)
+
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, grid_size)
+    z = (grid[:, None] - values[None, :]) / bandwidth
+    density = (np.exp(-0.5 * z ** 2) * counts).sum(axis=1) / (n * bandwidth * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def summarize_age_distribution(athletes_exploded):
+    """
+    Precompute per (discipline, gender) age summaries for the violin chart.
+
+    Args:
+        athletes_exploded (pd.DataFrame): One row per athlete x discipline,
+            with "disciplines", "gender" and "age" columns
+
+    Returns:
+        pd.DataFrame: One row per (discipline, gender) with count, quartiles,
+            fences and the KDE curve ("kde_y", "kde_density" arrays)
+    """
+    valid = athletes_exploded.dropna(subset=["disciplines", "gender", "age"])
+
+    rows = []
+    for (discipline, gender), ages in valid.groupby(["disciplines", "gender"])["age"]:
+        ages = ages.to_numpy(dtype=float)
+        q1, median, q3 = np.percentile(ages, [25, 50, 75])
+        iqr = q3 - q1
+        # Same whisker rule as plotly: furthest point within 1.5 IQR
+        lowerfence = ages[ages >= q1 - 1.5 * iqr].min()
+        upperfence = ages[ages <= q3 + 1.5 * iqr].max()
+        kde_y, kde_density = _kde_curve(ages)
+        rows.append({
+            "discipline": discipline,
+            "gender": gender,
+            "count": len(ages),
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": lowerfence,
+            "upperfence": upperfence,
+            "kde_y": kde_y,
+            "kde_density": kde_density,
+        })
+
+    return pd.DataFrame(rows, columns=[
+        "discipline", "gender", "count", "q1", "median", "q3",
+        "lowerfence", "upperfence", "kde_y", "kde_density"
+    ])
+
+
+def sample_points(athletes_exploded, max_points, seed=0):
+    """
+    Stratified sample of at most max_points rows, proportional per
+    (discipline, gender) so small disciplines keep at least one point.
+    """
+    # explode() repeats index labels, so work on a fresh index
+    valid = athletes_exploded.dropna(subset=["disciplines", "gender", "age"]).reset_index(drop=True)
+    if len(valid) <= max_points:
+        return valid
+
+    groups = valid.groupby(["disciplines", "gender"])
+    sampled = groups.sample(frac=max_points / len(valid), random_state=seed)
+    firsts = groups.head(1)
+    return pd.concat([sampled, firsts[~firsts.index.isin(sampled.index)]])
+
+
+def _positions(disciplines, genders):
+    # Disciplines sit at integer x positions; genders are offset side by side
+    # within a discipline like plotly's violinmode="group".
+    base = {discipline: i for i, discipline in enumerate(disciplines)}
+    if len(genders) > 1:
+        offsets = dict(zip(genders, np.linspace(-0.2, 0.2, len(genders))))
+    else:
+        offsets = {gender: 0.0 for gender in genders}
+    half_width = 0.4 / max(len(genders), 1)
+    return base, offsets, half_width
+
+
+def _layout(fig, disciplines, title):
+    fig.update_layout(
+        title=title,
+        xaxis=dict(
+            title="Sport",
+            tickmode="array",
+            tickvals=list(range(len(disciplines))),
+            ticktext=disciplines,
+            range=[-0.6, len(disciplines) - 0.4]
+        ),
+        yaxis_title="Age",
+        legend_title_text="gender"
+    )
+    return fig
+
+
+def build_summary_violin(summary, title):
+    """
+    Violin chart drawn from precomputed summaries: one filled KDE outline and
+    one precomputed box per (discipline, gender). The browser receives a few
+    hundred numbers per group instead of every athlete.
+    """
+    disciplines = sorted(summary["discipline"].unique())
+    genders = sorted(summary["gender"].unique())
+    base, offsets, half_width = _positions(disciplines, genders)
+
+    fig = go.Figure()
+    for gender in genders:
+        color = GENDER_COLORS.get(gender)
+        group = summary[summary["gender"] == gender]
+        first = True
+
+        for _, row in group.iterrows():
+            center = base[row["discipline"]] + offsets[gender]
+            width = row["kde_density"] / row["kde_density"].max() * half_width * 0.9
+            # Rounded: the outline only needs screen precision, and full
+            # float64 reprs would make up most of the payload
+            fig.add_trace(go.Scatter(
+                x=np.round(np.concatenate([center + width, (center - width)[::-1]]), 3),
+                y=np.round(np.concatenate([row["kde_y"], row["kde_y"][::-1]]), 2),
+                fill="toself",
+                mode="lines",
+                line=dict(color=color, width=1),
+                name=gender,
+                legendgroup=gender,
+                showlegend=first,
+                hoverinfo="skip"
+            ))
+            first = False
+
+        fig.add_trace(go.Box(
+            x=[base[d] + offsets[gender] for d in group["discipline"]],
+            q1=group["q1"],
+            median=group["median"],
+            q3=group["q3"],
+            lowerfence=group["lowerfence"],
+            upperfence=group["upperfence"],
+            width=half_width * 0.3,
+            marker_color=color,
+            name=gender,
+            legendgroup=gender,
+            showlegend=False,
+            customdata=group[["discipline", "count"]],
+            hovertemplate="%{customdata[0]}<br>n=%{customdata[1]}<extra>" + str(gender) + "</extra>"
+        ))
+
+    return _layout(fig, disciplines, title)
+
+
+def build_points_violin(points, summary, title):
+    """
+    Violin chart with raw points (sampled or full resolution). The violins
+    are drawn from the precomputed summaries, as in build_summary_violin,
+    so every age is sent to the browser once: as a jittered strip, drawn
+    with WebGL for large point sets.
+    """
+    fig = build_summary_violin(summary, title)
+    valid = points.dropna(subset=["disciplines", "gender", "age"])
+    disciplines = sorted(summary["discipline"].unique())
+    genders = sorted(summary["gender"].unique())
+    base, offsets, half_width = _positions(disciplines, genders)
+    scatter = go.Scattergl if len(valid) > WEBGL_POINT_THRESHOLD else go.Scatter
+    rng = np.random.default_rng(0)
+
+    for gender in genders:
+        by_gender = valid[valid["gender"] == gender]
+        centers = by_gender["disciplines"].map(base).to_numpy(dtype=float) + offsets[gender]
+        fig.add_trace(scatter(
+            x=np.round(centers + rng.uniform(-half_width * 0.8, half_width * 0.8, len(by_gender)), 3),
+            y=by_gender["age"],
+            mode="markers",
+            marker=dict(color=GENDER_COLORS.get(gender), size=3, opacity=0.4),
+            name=gender,
+            legendgroup=gender,
+            showlegend=False,
+            hoverinfo="y"
+        ))
+
+    return fig
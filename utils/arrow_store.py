@@ -0,0 +1,190 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+def _default_dir():
+    # RAM-backed where the host has it, so the snapshots are shared memory
+    shm = "/dev/shm"
+    base = shm if os.path.isdir(shm) and os.access(shm, os.W_OK) else tempfile.gettempdir()
+    return os.path.join(base, "paris2024_arrow")
+
+
+# Directory of the Arrow snapshots shared by every server process of the
+# host; PARIS2024_ARROW_DIR=off makes each process parse the CSVs itself
+ARROW_DIR = os.environ.get("PARIS2024_ARROW_DIR") or _default_dir()
+
+# Strings come back as pandas' Arrow-backed string dtype (the default "str"
+# of pandas 3), so they keep pointing into the mapped file instead of being
+# turned into Python objects
+_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+_TYPES = {pa.string(): _STRING, pa.large_string(): _STRING}
+
+# Snapshots kept per table: the current one and the one before, which reruns
+# pinned to the previous dataset version may still attach
+KEEP_SNAPSHOTS = 2
+
+# Per thread (one per Streamlit rerun): table key -> snapshot file of the
+# dataset version the rerun is pinned to (see utils.snapshots)
+_PINNED = threading.local()
+
+
+def enabled(arrow_dir=None):
+    return (arrow_dir or ARROW_DIR).lower() != "off"
+
+
+def pin(manifest):
+    """Makes this thread read the snapshots of `manifest` (key -> snapshot path) until pinned again."""
+    _PINNED.manifest = manifest or {}
+
+
+def pinned_path(key):
+    """Snapshot of table `key` in the pinned manifest, or None."""
+    return getattr(_PINNED, "manifest", {}).get(os.path.abspath(key))
+
+
+def snapshot_path(key, sources, arrow_dir=None):
+    """
+    Snapshot file of the table `key` built from the `sources` files.
+
+    The name holds a digest of the sources' paths, sizes and modification
+    times, so a changed source gives a new file and a stale snapshot is never
+    attached.
+
+    Args:
+        key (str): Table name, unique per table (e.g. its CSV path)
+        sources (list): Paths of the files the table is built from
+        arrow_dir (str): Snapshot directory; defaults to ARROW_DIR
+
+    Returns:
+        str: "<dir>/<name>-<key digest>-<sources digest>.arrow"
+    """
+    stats = []
+    for path in sources:
+        stat = os.stat(path)
+        stats.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+    name = re.sub(r"[^A-Za-z0-9_.]+", "_", os.path.splitext(os.path.basename(key))[0])
+    key_digest = hashlib.sha1(os.path.abspath(key).encode()).hexdigest()[:8]
+    sources_digest = hashlib.sha1(json.dumps(stats).encode()).hexdigest()[:12]
+    return os.path.join(arrow_dir or ARROW_DIR, f"{name}-{key_digest}-{sources_digest}.arrow")
+
+
+def arrow_ready(frame):
+    """
+    `frame` with the object columns that mix strings and numbers as strings.
+
+    Arrow columns have one type. Concatenated files can disagree on a
+    column: bib numbers, for example, are numbers in some results files and
+    text in others.
+    """
+    mixed = {}
+    for column in frame.columns[frame.dtypes == object]:
+        values = frame[column]
+        if pd.api.types.infer_dtype(values, skipna=True).startswith("mixed"):
+            mixed[column] = values.where(values.isna(), values.astype(str))
+    return frame.assign(**mixed) if mixed else frame
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def publish(frame, path):
+    """
+    Writes `frame` to `path` as an uncompressed Arrow IPC file (compressed
+    buffers could not be mapped without a copy).
+
+    The file is written under a temporary name and renamed, so other
+    processes see either no snapshot or a complete one. Snapshots of the
+    same table older than the last KEEP_SNAPSHOTS are removed; processes that
+    still map them keep their pages until they let go.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(arrow_ready(frame), preserve_index=False)
+    # pandas keeps strings as large_string; stored as string, every attach
+    # would cast (copy) them
+    table = table.cast(pa.schema([field.with_type(pa.large_string()) if field.type == pa.string() else field
+                                  for field in table.schema], metadata=table.schema.metadata))
+
+    tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    table_prefix = os.path.basename(path).rsplit("-", 1)[0]
+    versions = glob.glob(os.path.join(directory, glob.escape(table_prefix) + "-*.arrow"))
+    versions.sort(key=lambda version: (version == path, _mtime(version)), reverse=True)
+    for old in versions[KEEP_SNAPSHOTS:]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def attach(path):
+    """
+    A snapshot as a DataFrame backed by the memory-mapped file.
+
+    Strings and numeric columns without missing values are not copied: every
+    process attaching the file shares the same pages of the OS page cache.
+    Those columns are read-only; assigning new columns is fine.
+    """
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper=_TYPES.get)
+
+
+def share_frame(frame, path):
+    """
+    Publishes `frame` as the snapshot `path` and attaches it. A frame that
+    Arrow cannot hold, or a snapshot directory that cannot be written, leaves
+    `frame` as it is, private to this process.
+    """
+    try:
+        publish(frame, path)
+    except (OSError, pa.ArrowException):
+        return frame
+    return attach(path)
+
+
+def cached_frame(key, sources, build, arrow_dir=None):
+    """
+    The frame build() makes out of the `sources` files, built once per host.
+
+    The first process publishes it; every later one, and every process
+    started after it, attaches the snapshot without reading the sources. A
+    thread pinned to a dataset version attaches that version's snapshot.
+
+    Args:
+        key (str): Table name, see snapshot_path
+        sources (list): Files the frame is built from
+        build (callable): Builds the frame when there is no snapshot yet
+        arrow_dir (str): Snapshot directory; defaults to ARROW_DIR
+
+    Returns:
+        pd.DataFrame: The frame, mapped from the snapshot when possible
+    """
+    if not enabled(arrow_dir):
+        return build()
+    pinned = pinned_path(key)
+    if pinned and os.path.exists(pinned):
+        return attach(pinned)
+    path = snapshot_path(key, sources, arrow_dir)
+    if os.path.exists(path):
+        return attach(path)
+    return share_frame(build(), path)
@@ -0,0 +1,92 @@
+import pandas as pd
+
+# Grouping sets of the gender distribution: view level -> grouping column
+GENDER_LEVELS = {"World": None, "Continent": "continent", "Country": "country"}
+
+
+def build_athlete_cube(athletes):
+    """
+    Athlete counts by (continent, country, gender, discipline combination),
+    computed once at load.
+
+    Athletes can compete in several disciplines, so counts are not keyed by
+    single disciplines (summing those would count an athlete once per
+    discipline) but by each athlete's set of disciplines. "combos" maps a
+    combination id to its disciplines for the sport filter.
+
+    Args:
+        athletes (pd.DataFrame): athletes.csv with parsed "disciplines" lists
+            and a "continent" column
+
+    Returns:
+        dict: "cube" (continent, country_code, country, gender, combo,
+            athletes) and "combos" (combo, discipline; one row per member)
+    """
+    disciplines = athletes["disciplines"].map(lambda d: tuple(sorted(d)) if isinstance(d, list) else ())
+    combo_codes, combo_values = pd.factorize(disciplines)
+
+    keyed = athletes[["continent", "country_code", "country", "gender"]].assign(combo=combo_codes)
+    cube = (
+        keyed.groupby(["continent", "country_code", "country", "gender", "combo"], dropna=False)
+        .size()
+        .rename("athletes")
+        .reset_index()
+    )
+
+    combos = pd.DataFrame({"combo": range(len(combo_values)), "discipline": list(combo_values)})
+    combos = combos.explode("discipline").dropna(subset=["discipline"]).reset_index(drop=True)
+
+    return {"cube": cube, "combos": combos}
+
+
+def filter_cube(athlete_cube, country_codes=(), continents=(), gender="All", sports=()):
+    """Rows of the cube matching the sidebar filters (same semantics as the athlete filters)."""
+    cube = athlete_cube["cube"]
+    mask = pd.Series(True, index=cube.index)
+
+    if country_codes:
+        mask &= cube["country_code"].isin(country_codes)
+    if continents:
+        mask &= cube["continent"].isin(continents)
+    if gender != "All":
+        mask &= cube["gender"] == gender
+    if sports:
+        combos = athlete_cube["combos"]
+        mask &= cube["combo"].isin(combos.loc[combos["discipline"].isin(sports), "combo"].unique())
+
+    return cube[mask]
+
+
+def gender_grouping_sets(cube):
+    """
+    Gender counts at every level of GENDER_LEVELS in one frame.
+
+    Returns:
+        pd.DataFrame: "athletes" indexed by (level, group, gender); the World
+            level has the single group "World"
+    """
+    parts = []
+    for level, column in GENDER_LEVELS.items():
+        keys = ["gender"] if column is None else [column, "gender"]
+        counts = cube.groupby(keys)["athletes"].sum().reset_index()
+        counts["group"] = level if column is None else counts[column]
+        counts["level"] = level
+        parts.append(counts[["level", "group", "gender", "athletes"]])
+
+    return pd.concat(parts, ignore_index=True).set_index(["level", "group", "gender"]).sort_index()
+
+
+def gender_counts(grouping_sets, level, group=None):
+    """Gender -> athlete count for one group of one level (World needs no group)."""
+    group = level if group is None else group
+    try:
+        return grouping_sets.loc[(level, group), "athletes"]
+    except KeyError:
+        return pd.Series(dtype="int64", name="athletes")
+
+
+def level_groups(grouping_sets, level):
+    """Groups available at a level, sorted."""
+    if level not in grouping_sets.index.get_level_values("level"):
+        return []
+    return sorted(grouping_sets.loc[level].index.get_level_values("group").unique())
@@ -0,0 +1,125 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.arrow_store import cached_frame
+from utils.ingest import DATA_DIR, parse_list, read_csvs
+from utils.relationship_graph import split_coaches
+from utils.schedule_index import SCHEDULE_TZ
+
+RESULT_COLUMNS = ["discipline", "event", "stage", "rank", "result", "result_type", "result_WLT", "date"]
+
+
+def load_results(data_dir=DATA_DIR, progress=None):
+    """
+    All data/results/<discipline>.csv files in one frame, parsed in parallel
+    (see read_csvs) and shared between server processes as one Arrow
+    snapshot (see utils.arrow_store).
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, "results", "*.csv")))
+    if not paths:
+        return pd.DataFrame(columns=["participant_code", "participant_type", "event_code", "event_name",
+                                     "discipline_name", "stage", "rank", "result", "result_type",
+                                     "result_WLT", "date"])
+    return cached_frame(os.path.join(data_dir, "results"), paths,
+                        lambda: pd.concat(read_csvs(paths, progress=progress), ignore_index=True))
+
+
+def best_results(results):
+    """
+    Best result of each participant per event: the furthest stage they
+    reached (the latest one they competed in), with its rank and result.
+    """
+    results = results.assign(date=pd.to_datetime(results["date"], errors="coerce", utc=True).dt.tz_convert(SCHEDULE_TZ))
+    results = results.sort_values(["participant_code", "event_code", "date"], kind="stable")
+    best = results.drop_duplicates(["participant_code", "event_code"], keep="last")
+    return best.rename(columns={"discipline_name": "discipline", "event_name": "event"})
+
+
+def build_athlete_cards(athletes, athlete_medals, team_members, results):
+    """
+    Materialized athlete cards: everything the profile panel shows, joined
+    once per athlete code.
+
+    "cards" holds one row per athlete with scalar columns (bio, joined
+    disciplines/events/coaches, medal counts and list, teams). Result lines
+    are kept in their own frame sorted by athlete, with (first, last + 1)
+    row bounds per code, so a card and its results are one lookup each.
+
+    Args:
+        athletes (pd.DataFrame): athletes.csv, optionally with the page's
+            continent and age columns, which the cards keep
+        athlete_medals (pd.DataFrame): One row per (athlete, medal), see
+            utils.ingest.build_athlete_medals
+        team_members (pd.DataFrame): Team-athlete bridge, see
+            utils.ingest.build_team_members
+        results (pd.DataFrame): data/results/*.csv rows
+
+    Returns:
+        dict: "cards" (indexed by str code), "results" and "result_bounds"
+    """
+    bio = ["code", "name", "gender", "country", "country_code", "birth_date", "height", "weight"]
+    cards = athletes[bio + [column for column in ["continent", "age"] if column in athletes.columns]].copy()
+    cards["code"] = cards["code"].astype(str)
+    cards["disciplines"] = athletes["disciplines"].map(lambda d: ", ".join(parse_list(d)))
+    cards["events"] = athletes["events"].map(lambda e: ", ".join(parse_list(e)))
+    cards["coaches"] = athletes["coach"].map(lambda c: ", ".join(split_coaches(c)))
+    cards = cards.drop_duplicates("code").set_index("code")
+
+    # Medals: counts per type and one readable line per medal
+    medal_type = athlete_medals["medal_type"].str.replace(" Medal", "", regex=False)
+    counts = pd.crosstab(athlete_medals["code_athlete"], medal_type).reindex(columns=["Gold", "Silver", "Bronze"], fill_value=0)
+    medal_lines = (
+        medal_type + " - " + athlete_medals["discipline"] + ": " + athlete_medals["event"]
+        + np.where(athlete_medals["medal_kind"].astype(str) == "Team", " (team)", "")
+    ).groupby(athlete_medals["code_athlete"]).agg(" | ".join)
+
+    cards = cards.join(counts.rename(columns=str.lower))
+    cards[["gold", "silver", "bronze"]] = cards[["gold", "silver", "bronze"]].fillna(0).astype(int)
+    cards["medals"] = cards.index.map(medal_lines).fillna("")
+
+    # Teams the athlete is a member of
+    team_codes = team_members.groupby("code_athlete")["code_team"].agg(", ".join)
+    cards["teams"] = cards.index.map(team_codes).fillna("")
+
+    # Best result per event: own results plus those of the athlete's teams
+    best = best_results(results)
+    best["participant_code"] = best["participant_code"].astype(str)
+    person = best[best["participant_type"] != "Team"].assign(code=lambda df: df["participant_code"])
+    team = best[best["participant_type"] == "Team"].merge(
+        team_members[["code_team", "code_athlete"]], left_on="participant_code", right_on="code_team"
+    ).assign(code=lambda df: df["code_athlete"])
+
+    card_results = pd.concat([person, team], ignore_index=True)
+    card_results = card_results[card_results["code"].isin(cards.index)]
+    card_results = card_results.sort_values(["code", "date"], kind="stable").reset_index(drop=True)[["code"] + RESULT_COLUMNS]
+
+    codes = card_results["code"].to_numpy()
+    change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+    firsts = np.r_[0, change] if len(codes) else np.array([], dtype=int)
+    lasts = np.r_[change, len(codes)] if len(codes) else np.array([], dtype=int)
+
+    return {
+        "cards": cards,
+        "results": card_results,
+        "result_bounds": {codes[f]: (int(f), int(l)) for f, l in zip(firsts, lasts)},
+    }
+
+
+def athlete_card(athlete_cards, code):
+    """
+    Card of one athlete as a dict, with its best results as a frame under
+    "results", or None for an unknown code.
+    """
+    code = str(code)
+    cards = athlete_cards["cards"]
+    if code not in cards.index:
+        return None
+
+    card = cards.loc[code].to_dict()
+    card["code"] = code
+    first, last = athlete_cards["result_bounds"].get(code, (0, 0))
+    card["results"] = athlete_cards["results"].iloc[first:last].drop(columns="code")
+    return card
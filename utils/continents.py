@@ -0,0 +1,65 @@
+import pycountry_convert as pc
+
+CONTINENT_NAMES = {
+    'AF': 'Africa',
+    'AS': 'Asia',
+    'EU': 'Europe',
+    'NA': 'North America',
+    'SA': 'South America',
+    'OC': 'Oceania',
+    'Other': 'Other'
+}
+
+# Olympic country names pycountry_convert does not know; teams without a
+# country (AIN, EOR) stay in Other
+CONTINENT_OVERRIDES = {
+    'Korea': 'AS',
+    'Republic of Korea': 'AS',
+    'Chinese Taipei': 'AS',
+    'Hong Kong, China': 'AS',
+    'Kosovo': 'EU',
+}
+
+
+def get_continent_code(country_name):
+    """
+    Continent code of a country, looked up by name: the files use IOC
+    country codes (SUI, GER, ...), which are not ISO codes.
+    """
+    if country_name in CONTINENT_OVERRIDES:
+        return CONTINENT_OVERRIDES[country_name]
+    try:
+        country_code = pc.country_name_to_country_alpha2(country_name, cn_name_format="default")
+        return pc.country_alpha2_to_continent_code(country_code)
+    except KeyError:
+        return "Other"
+
+
+def get_continent_name(continent_code):
+    return CONTINENT_NAMES.get(continent_code, 'Other')
+
+
+def add_continents(frame):
+    """
+    Adds continent_code and continent columns, in place, from the country
+    names (country_long, then country).
+
+    Args:
+        frame (pd.DataFrame): Frame with a country and optionally a
+            country_long column
+
+    Returns:
+        pd.DataFrame: frame
+    """
+    names = frame[['country_long', 'country'] if 'country_long' in frame.columns else ['country']]
+    codes = {}
+    for name in names.stack().unique():
+        codes[name] = get_continent_code(name)
+
+    continent_code = frame['country'].map(codes)
+    if 'country_long' in frame.columns:
+        long_code = frame['country_long'].map(codes)
+        continent_code = long_code.where(long_code != "Other", continent_code)
+    frame['continent_code'] = continent_code.fillna("Other")
+    frame['continent'] = frame['continent_code'].map(get_continent_name)
+    return frame
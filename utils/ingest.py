@@ -0,0 +1,356 @@
+import ast
+import functools
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from utils import arrow_store
+
+# Dataset directory; set PARIS2024_DATA_DIR to run the dashboard on another
+# copy of the data (e.g. one made by benchmarks/synthetic_data.py)
+DATA_DIR = os.environ.get("PARIS2024_DATA_DIR", "data")
+
+# Files parsed at once by read_csvs(); PARIS2024_INGEST_WORKERS=1 reads them
+# one after another
+INGEST_WORKERS = int(os.environ.get("PARIS2024_INGEST_WORKERS", 0)) or os.cpu_count() or 1
+
+MEDAL_KINDS = ["Individual", "Team"]
+
+_LOGGER = logging.getLogger(__name__)
+
+# medal_model() results of the two latest dataset versions
+_MEDAL_MODELS = OrderedDict()
+_MEDAL_MODELS_LOCK = threading.Lock()
+
+# venues.csv sport names that differ from the schedules.csv discipline names
+SPORT_ALIASES = {
+    "Trampoline": "Trampoline Gymnastics",
+}
+
+# Words that say nothing about which venue is meant
+VENUE_STOPWORDS = {"the", "de", "du", "la", "le", "sur", "en", "st", "stadium", "arena", "centre", "ctr", "venue"}
+
+
+def data_path(name):
+    """Path of a dataset file, e.g. data_path("medals.csv")."""
+    return os.path.join(DATA_DIR, name)
+
+
+def log_progress(done, total, path):
+    """read_csvs() progress callback logging each parsed file."""
+    _LOGGER.info("Parsed %d/%d: %s", done, total, path)
+
+
+def read_csvs(paths, workers=None, processes=False, progress=None, **kwargs):
+    """
+    Parse several CSV files in parallel.
+
+    The pandas C parser releases the GIL while it tokenizes, so a thread pool
+    spreads the files over the cores; processes=True parses them in worker
+    processes instead, which pays off for large files only since every frame
+    is pickled back. The frames are returned in the order of `paths`,
+    whichever file finishes first.
+
+    Args:
+        paths (list): CSV file paths
+        workers (int): Files parsed at once, capped at len(paths); defaults
+            to INGEST_WORKERS. With 1, files are read one after another.
+        processes (bool): Use a process pool rather than threads
+        progress (callable): Called as progress(done, total, path) once a
+            file is parsed, e.g. log_progress
+        **kwargs: Passed to pd.read_csv
+
+    Returns:
+        list: One DataFrame per path
+    """
+    paths = list(paths)
+    reader = functools.partial(pd.read_csv, **kwargs)
+    workers = min(workers or INGEST_WORKERS, len(paths))
+    frames = [None] * len(paths)
+
+    if workers <= 1:
+        for i, path in enumerate(paths):
+            frames[i] = reader(path)
+            if progress:
+                progress(i + 1, len(paths), path)
+        return frames
+
+    if processes:
+        # Spawned, not forked: the Streamlit server runs threads
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    else:
+        pool = ThreadPoolExecutor(workers, thread_name_prefix="ingest")
+    with pool:
+        futures = {pool.submit(reader, path): i for i, path in enumerate(paths)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            frames[i] = future.result()
+            if progress:
+                progress(done, len(paths), paths[i])
+    return frames
+
+
+def read_tables(paths, progress=None):
+    """
+    read_csvs() through the Arrow snapshots shared by the server processes
+    of the host (see utils.arrow_store).
+
+    Files another process has already published are memory-mapped without
+    parsing; the rest are parsed in parallel, then published for the next
+    process. A thread pinned to a dataset version (utils.snapshots) reads
+    that version's snapshots even if the CSVs changed since. String columns
+    come back with the Arrow-backed "str" dtype.
+
+    Args:
+        paths (list): CSV file paths
+        progress (callable): See read_csvs; only parsed files report
+
+    Returns:
+        list: One DataFrame per path
+    """
+    paths = list(paths)
+    if not arrow_store.enabled():
+        return read_csvs(paths, progress=progress)
+
+    snapshots = []
+    for path in paths:
+        pinned = arrow_store.pinned_path(path)
+        snapshots.append(pinned if pinned and os.path.exists(pinned) else arrow_store.snapshot_path(path, [path]))
+    missing = [i for i, snapshot in enumerate(snapshots) if not os.path.exists(snapshot)]
+    parsed = dict(zip(missing, read_csvs([paths[i] for i in missing], progress=progress)))
+    return [arrow_store.share_frame(parsed[i], snapshot) if i in parsed else arrow_store.attach(snapshot)
+            for i, snapshot in enumerate(snapshots)]
+
+
+def read_table(path):
+    """One CSV file through read_tables()."""
+    return read_tables([path])[0]
+
+
+def parse_list(value):
+    """
+    Parse a list-literal cell ("['Archery', 'Diving']") into a list.
+
+    Plain strings become a one-element list and missing values an empty one,
+    so the result can always be exploded.
+    """
+    if isinstance(value, list):
+        return value
+    if pd.isna(value):
+        return []
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith("[") and value.endswith("]"):
+            try:
+                return ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                return []
+        return [value]
+    return []
+
+
+def explode_list_column(column):
+    """A list-literal column as one row per item, indexed by row position (see rows_with_any)."""
+    return column.reset_index(drop=True).map(parse_list).explode().dropna()
+
+
+def rows_with_any(items, values, n_rows):
+    """
+    Boolean mask of the rows with at least one item among values, matched
+    exactly.
+
+    Args:
+        items (pd.Series): Output of explode_list_column
+        values (list): Items to look for
+        n_rows (int): Length of the frame the column belongs to
+
+    Returns:
+        np.ndarray: The row mask
+    """
+    mask = np.zeros(n_rows, dtype=bool)
+    mask[items.index[items.isin(values)].to_numpy(dtype=np.int64)] = True
+    return mask
+
+
+def _venue_tokens(name):
+    words = re.findall(r"[a-z0-9]+", str(name).lower())
+    return {word for word in words if word not in VENUE_STOPWORDS}
+
+
+def build_venue_sports(venues, schedules):
+    """
+    Venue-sport bridge table: one row per (venue, sport) of venues.csv, with
+    the schedules.csv venue_code(s) it is held at.
+
+    venues.csv names and schedules.csv names do not always agree ("La
+    Concorde" is "La Concorde 1".."La Concorde 4" in the schedule), so the
+    codes are resolved by joining on the sport and keeping, per (venue,
+    sport), the schedule venues whose names share the most words.
+
+    Args:
+        venues (pd.DataFrame): Rows of venues.csv
+        schedules (pd.DataFrame): Rows of schedules.csv
+
+    Returns:
+        pd.DataFrame: venue, sport, venue_code (NaN when the schedule has no
+            matching venue) and sessions (schedule rows for that venue_code
+            and sport)
+    """
+    bridge = venues[["venue", "sports"]].assign(sport=venues["sports"].map(parse_list)).explode("sport")
+    bridge = bridge.dropna(subset=["sport"]).drop(columns="sports")
+    bridge["sport"] = bridge["sport"].str.strip()
+    bridge["discipline"] = bridge["sport"].replace(SPORT_ALIASES)
+
+    sessions = (
+        schedules.dropna(subset=["venue_code", "discipline"])
+        .groupby(["venue_code", "venue", "discipline"]).size()
+        .rename("sessions").reset_index()
+        .rename(columns={"venue": "schedule_venue"})
+    )
+
+    candidates = bridge.merge(sessions, on="discipline", how="left")
+    candidates["score"] = [
+        len(_venue_tokens(a) & _venue_tokens(b)) if isinstance(b, str) else 0
+        for a, b in zip(candidates["venue"], candidates["schedule_venue"])
+    ]
+    best = candidates.groupby(["venue", "sport"])["score"].transform("max")
+    matched = candidates[(candidates["score"] == best) & (candidates["score"] > 0)]
+
+    bridge = bridge.merge(
+        matched[["venue", "sport", "venue_code", "sessions"]],
+        on=["venue", "sport"], how="left"
+    )
+    bridge["sessions"] = bridge["sessions"].fillna(0).astype(int)
+    return bridge[["venue", "sport", "venue_code", "sessions"]].reset_index(drop=True)
+
+
+def load_venue_sports(data_dir=DATA_DIR):
+    venues, schedules = read_tables([f"{data_dir}/venues.csv", f"{data_dir}/schedules.csv"])
+    return build_venue_sports(venues, schedules)
+
+
+def sports_per_venue(venue_sports):
+    return venue_sports.groupby("venue")["sport"].nunique().rename("sport_count")
+
+
+def venues_per_sport(venue_sports):
+    return venue_sports.groupby("sport")["venue"].nunique().rename("venue_count")
+
+
+def sessions_per_venue(venue_sports):
+    return venue_sports.groupby("venue")["sessions"].sum().rename("event_count")
+
+
+def venue_codes(venue_sports, venues):
+    """schedules.csv venue codes of venues.csv venue names, through the venue-sport bridge."""
+    codes = venue_sports.loc[venue_sports["venue"].isin(venues), "venue_code"].dropna()
+    return sorted(codes.unique())
+
+
+def build_team_members(teams):
+    """
+    Team-athlete bridge table from teams.csv: one row per (code_team,
+    code_athlete), with the athlete name as listed for the team.
+    """
+    members = pd.DataFrame({
+        "code_team": teams["code"],
+        "code_athlete": teams["athletes_codes"].map(parse_list),
+        "name": teams["athletes"].map(parse_list),
+    })
+    # Both lists are in the same order; where they disagree, keep the codes
+    # and leave the names empty
+    same_length = members["code_athlete"].str.len() == members["name"].str.len()
+    members.loc[~same_length, "name"] = members.loc[~same_length, "code_athlete"].map(lambda codes: [None] * len(codes))
+
+    members = members.explode(["code_athlete", "name"]).dropna(subset=["code_athlete"])
+    members["code_athlete"] = members["code_athlete"].astype(str)
+    return members.reset_index(drop=True)
+
+
+def classify_medals(medals, teams, medallists=None):
+    """
+    Flag each medals.csv row as a team or individual medal.
+
+    A team medal's "code" is a team code (teams.csv code, or code_team in
+    medallists.csv); an individual medal's is the athlete code.
+
+    Returns:
+        pd.DataFrame: medals with "code" as str, a bool "is_team" and a
+            categorical "medal_kind" (Individual / Team)
+    """
+    medals = medals.copy()
+    medals["code"] = medals["code"].astype(str)
+
+    team_codes = set(teams["code"].astype(str))
+    if medallists is not None and "code_team" in medallists.columns:
+        team_codes |= set(medallists["code_team"].dropna().astype(str))
+
+    medals["is_team"] = medals["code"].isin(team_codes)
+    medals["medal_kind"] = pd.Categorical.from_codes(medals["is_team"].astype(int), categories=MEDAL_KINDS)
+    return medals
+
+
+def build_athlete_medals(medals, team_members, medallists=None):
+    """
+    One row per (athlete, medal): individual medals as they are, team medals
+    expanded to every team member through the team-athlete bridge.
+
+    Args:
+        medals (pd.DataFrame): Output of classify_medals
+        team_members (pd.DataFrame): Output of build_team_members
+        medallists (pd.DataFrame): medallists.csv, used for consistent
+            athlete names (optional)
+
+    Returns:
+        pd.DataFrame: code_athlete, name and the medal columns (medal_type,
+            medal_date, discipline, event, country_code, country, medal_kind)
+    """
+    medal_columns = [column for column in ["medal_type", "medal_date", "discipline", "event",
+                                           "country_code", "country", "medal_kind"] if column in medals.columns]
+
+    individual = medals.loc[~medals["is_team"], ["code", "name"] + medal_columns].rename(columns={"code": "code_athlete"})
+    team = (
+        medals.loc[medals["is_team"], ["code"] + medal_columns]
+        .merge(team_members, left_on="code", right_on="code_team")
+        .drop(columns=["code", "code_team"])
+    )
+    athlete_medals = pd.concat([individual, team], ignore_index=True)
+
+    if medallists is not None:
+        names = medallists.dropna(subset=["code_athlete"]).astype({"code_athlete": str}).groupby("code_athlete")["name"].first()
+        athlete_medals["name"] = athlete_medals["code_athlete"].map(names).fillna(athlete_medals["name"])
+
+    athlete_medals["medal_kind"] = athlete_medals["medal_kind"].astype(medals["medal_kind"].dtype)
+    return athlete_medals[["code_athlete", "name"] + medal_columns]
+
+
+def load_medal_model(data_dir=DATA_DIR):
+    """medals.csv classified by kind, the team-athlete bridge and per-athlete medals."""
+    medals, medallists, teams = read_tables([f"{data_dir}/medals.csv", f"{data_dir}/medallists.csv",
+                                             f"{data_dir}/teams.csv"])
+
+    medals = classify_medals(medals, teams, medallists)
+    team_members = build_team_members(teams)
+    return medals, team_members, build_athlete_medals(medals, team_members, medallists)
+
+
+def medal_model(version):
+    """
+    load_medal_model() of the data directory, built once per dataset version
+    (see utils.snapshots) and shared by every page and query of the process.
+    The frames are shared read-only; the two latest versions are kept.
+    """
+    with _MEDAL_MODELS_LOCK:
+        model = _MEDAL_MODELS.get(version)
+        if model is None:
+            model = _MEDAL_MODELS[version] = load_medal_model()
+            while len(_MEDAL_MODELS) > 2:
+                _MEDAL_MODELS.popitem(last=False)
+        return model
@@ -0,0 +1,254 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.memory import session_memory, shared_memory
+
+# Session state keys: the panel checkbox and the timings of the current rerun
+DEBUG_KEY = "debug_timings"
+STATE_KEY = "_instrumentation"
+
+RECORD_COLUMNS = ["stage", "depth", "start_ms", "wall_ms", "rows_in", "rows_out", "alloc_bytes"]
+
+# tracemalloc is process-wide and slows every allocation of every session,
+# so stages only report allocated bytes when the server is started with
+# PARIS2024_TRACE_ALLOCATIONS=1; sessions never start or stop it
+TRACE_ALLOCATIONS = os.environ.get("PARIS2024_TRACE_ALLOCATIONS") == "1"
+if TRACE_ALLOCATIONS and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def enabled():
+    """Instrumentation is opt-in: the debug panel checkbox or ?debug=1 in the URL."""
+    try:
+        return bool(st.session_state.get(DEBUG_KEY)) or st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def _state():
+    return st.session_state.get(STATE_KEY) if enabled() else None
+
+
+def _allocated():
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def begin_run(page):
+    """
+    Starts the timings of a rerun; call it at the top of the page.
+    """
+    if not enabled():
+        st.session_state.pop(STATE_KEY, None)
+        return
+
+    now = time.perf_counter()
+    st.session_state[STATE_KEY] = {
+        "page": page,
+        "started": now,
+        "records": [],
+        # One mark per open stage: where the next lap starts
+        "marks": [(now, _allocated())],
+    }
+
+
+def _record(state, name, start, allocated, rows_in=None, rows_out=None):
+    now = time.perf_counter()
+    record = {
+        "stage": name,
+        "depth": len(state["marks"]) - 1,
+        "start_ms": round((start - state["started"]) * 1000, 3),
+        "wall_ms": round((now - start) * 1000, 3),
+        "rows_in": rows_in,
+        "rows_out": rows_out,
+        "alloc_bytes": _allocated() - allocated if TRACE_ALLOCATIONS else None,
+    }
+    state["records"].append(record)
+    return record
+
+
+def lap(name, rows_in=None, rows_out=None):
+    """
+    Records the code run since the previous lap or stage as stage `name`.
+
+    Pages are scripts, so a lap after each section times the whole rerun
+    without re-indenting it. Inside a stage, laps start at the stage entry.
+    """
+    state = _state()
+    if state is None:
+        return
+    start, allocated = state["marks"][-1]
+    _record(state, name, start, allocated, rows_in, rows_out)
+    state["marks"][-1] = (time.perf_counter(), _allocated())
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Times a block as stage `name`; set "rows_out" on the yielded record.
+
+        with stage("filtering", rows_in=len(medals)) as record:
+            ...
+            record["rows_out"] = len(filtered_medals)
+    """
+    state = _state()
+    record = {"rows_out": None}
+    if state is None:
+        yield record
+        return
+
+    start, allocated = time.perf_counter(), _allocated()
+    state["marks"].append((start, allocated))
+    try:
+        yield record
+    finally:
+        state["marks"].pop()
+        _record(state, name, start, allocated, rows_in, record["rows_out"])
+        state["marks"][-1] = (time.perf_counter(), _allocated())
+
+
+def timed(name=None):
+    """
+    Decorator running a function as a stage. Decorate fragments with it so a
+    fragment-only rerun still times its own body, and DataFrame results
+    report their rows.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__) as record:
+                result = func(*args, **kwargs)
+                if isinstance(result, (pd.DataFrame, pd.Series)):
+                    record["rows_out"] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _figure_name(fig):
+    title = fig.layout.title.text
+    return title if title else "untitled"
+
+
+def _figure_points(fig):
+    points = 0
+    for trace in fig.data:
+        for axis in ("x", "y", "lat", "locations", "values"):
+            values = getattr(trace, axis, None)
+            if values is not None:
+                points += len(values)
+                break
+    return points
+
+
+def plotly_chart(fig, stage_name=None, **kwargs):
+    """
+    st.plotly_chart with two stages: "figure: <name>" (the code since the
+    previous lap, i.e. building the figure) and "chart: <name>" (serializing
+    and emitting it). The name defaults to the figure title; rows_out is the
+    number of plotted points.
+    """
+    if _state() is None or (get_script_run_ctx() and get_script_run_ctx().fragment_ids_this_run
+                            and len(_state()["marks"]) == 1):
+        # Disabled, or a fragment-only rerun outside a stage, where the last
+        # mark belongs to the previous full rerun
+        return st.plotly_chart(fig, **kwargs)
+
+    name = stage_name or _figure_name(fig)
+    points = _figure_points(fig)
+    lap(f"figure: {name}", rows_out=points)
+    with stage(f"chart: {name}", rows_in=points):
+        return st.plotly_chart(fig, **kwargs)
+
+
+def records_frame(records):
+    return pd.DataFrame(records, columns=RECORD_COLUMNS)
+
+
+def to_jsonl(records, page):
+    """One JSON object per stage."""
+    return "\n".join(json.dumps({"page": page, **record}) for record in records) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(records, page, session=None, shared=None):
+    """
+    Stage timings in the Prometheus text exposition format (gauges of the
+    last rerun), plus the session_memory() / shared_memory() frames if given.
+    """
+    metrics = [
+        ("dashboard_stage_seconds", "Wall time of a page stage in the last rerun", "wall_ms", 1 / 1000),
+        ("dashboard_stage_rows_in", "Rows entering a page stage", "rows_in", 1),
+        ("dashboard_stage_rows_out", "Rows leaving a page stage", "rows_out", 1),
+        ("dashboard_stage_alloc_bytes", "Net bytes allocated by a page stage", "alloc_bytes", 1),
+    ]
+    lines = []
+    for metric, help_text, column, scale in metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+        for record in records:
+            if record[column] is None:
+                continue
+            lines.append(f'{metric}{{page="{_label(page)}",stage="{_label(record["stage"])}"}} '
+                         f"{record[column] * scale:g}")
+
+    if session is not None:
+        lines += ["# HELP dashboard_session_retained_bytes Bytes a session retains between reruns, by state key",
+                  "# TYPE dashboard_session_retained_bytes gauge"]
+        lines += [f'dashboard_session_retained_bytes{{page="{_label(page)}",key="{_label(key)}"}} {size}'
+                  for key, size in zip(session["key"], session["bytes"])]
+    if shared is not None:
+        lines += ["# HELP dashboard_shared_frame_bytes Bytes of a frame shared by every session",
+                  "# TYPE dashboard_shared_frame_bytes gauge"]
+        lines += [f'dashboard_shared_frame_bytes{{frame="{_label(name)}"}} {size}'
+                  for name, size in zip(shared["name"], shared["bytes"])]
+    return "\n".join(lines) + "\n"
+
+
+def render_debug_panel():
+    """
+    Opt-in sidebar panel with the stage timings of the rerun; render it at
+    the end of the page so every stage is in.
+    """
+    with st.sidebar:
+        st.markdown("---")
+        st.checkbox("🛠️ Debug timings", key=DEBUG_KEY, help="Time each stage of this page's reruns")
+
+        state = _state()
+        if state is None:
+            return
+
+        lap("rest of page")
+        records = state["records"]
+        timings = records_frame(records)
+        total_ms = (time.perf_counter() - state["started"]) * 1000
+
+        st.caption(f"Rerun: {total_ms:.0f} ms over {len(timings)} stages")
+        st.dataframe(
+            timings.sort_values("wall_ms", ascending=False),
+            hide_index=True,
+            column_config={"alloc_bytes": st.column_config.NumberColumn("alloc (bytes)")}
+        )
+
+        # What this session keeps between reruns, against what all sessions share
+        session, shared = session_memory(st.session_state), shared_memory()
+        st.caption(f"Session retains {session['bytes'].sum() / 2 ** 20:.2f} MB; "
+                   f"shared frames {shared['bytes'].sum() / 2 ** 20:.1f} MB")
+        with st.expander("Memory"):
+            st.dataframe(session.head(10), hide_index=True)
+            st.dataframe(shared, hide_index=True)
+
+        col1, col2 = st.columns(2)
+        col1.download_button("JSON lines", to_jsonl(records, state["page"]),
+                             file_name="stage_timings.jsonl", mime="application/x-ndjson")
+        col2.download_button("Prometheus", to_prometheus(records, state["page"], session, shared),
+                             file_name="stage_timings.prom", mime="text/plain")
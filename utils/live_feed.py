@@ -0,0 +1,422 @@
+import csv
+import heapq
+import logging
+import os
+import socket
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from utils.athlete_cards import best_results
+from utils.continents import get_continent_code, get_continent_name
+from utils.ingest import MEDAL_KINDS
+from utils.medal_pivot import MEDAL_COLUMNS
+from utils.schedule_index import SCHEDULE_TZ
+
+# Feed of new medal and result rows: a CSV file that is appended to, or
+# tcp://host:port for a server that streams CSV lines; empty turns it off
+LIVE_FEED = os.environ.get("PARIS2024_LIVE_FEED", "")
+
+# Seconds between two checks of the feed for new lines, and between two
+# checks of the Overview for new rows to show
+POLL_SECONDS = 0.5
+REFRESH_SECONDS = 1.0
+
+# Events listed as recently updated
+RECENT_EVENTS = 20
+
+# Column that identifies each schema; checked in this order (medallists.csv
+# rows also have medal_type)
+ROW_KINDS = [("participant_code", "result"), ("code_athlete", "medallist"), ("medal_type", "medal")]
+
+_MEDAL_POSITION = {f"{medal} Medal": i for i, medal in enumerate(MEDAL_COLUMNS)}
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def enabled():
+    return bool(LIVE_FEED)
+
+
+def row_kind(row):
+    """"result", "medallist" or "medal" after the columns of a feed row, or None."""
+    for column, kind in ROW_KINDS:
+        if column in row:
+            return kind
+    return None
+
+
+def _rank(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class LiveAggregates:
+    """
+    Medal standings, continent totals, top athletes and per-event leaderboards
+    kept up to date one feed row at a time.
+
+    The aggregates are seeded once from the dataset tables; each new row then
+    costs a few dictionary and array updates, whatever the size of the tables.
+    Frames are only rebuilt when read after a change, and only from the
+    aggregates (one row per country, continent or event participant), never
+    from the full tables. Safe to read from reruns while the feed thread
+    applies rows.
+    """
+
+    def __init__(self, medals_total, athlete_medals=None, results=None, version=None):
+        """
+        Args:
+            medals_total (pd.DataFrame): Country medal table with
+                country_code, Gold, Silver, Bronze and continent (the
+                Overview's enriched medals_total.csv)
+            athlete_medals (pd.DataFrame): One row per (athlete, medal), see
+                utils.ingest.build_athlete_medals
+            results (pd.DataFrame): data/results/*.csv rows
+            version (str): Dataset snapshot the seed tables come from
+        """
+        self.version = version
+        self.updates = 0
+        self.updated_at = None
+        self._lock = threading.Lock()
+
+        # Standings: the seed rows plus countries first seen on the feed,
+        # with one counts row per country
+        self._countries = medals_total.reset_index(drop=True)
+        self._new_countries = []
+        self._country_pos = {code: i for i, code in enumerate(self._countries["country_code"])}
+        # medals.csv codes some countries differently from medals_total.csv
+        # (SLV/SVN, KOS/XKX); a feed code unknown to the seed is matched to
+        # the seed row of the same country name
+        self._code_of_country = dict(zip(self._countries["country"], self._countries["country_code"]))
+        self._aliases = {}
+        self._counts = self._countries[MEDAL_COLUMNS].to_numpy(dtype=np.int64)
+        self._continent_of = dict(zip(self._countries["country_code"], self._countries["continent"]))
+        self._continents = {
+            continent: counts.to_numpy(dtype=np.int64)
+            for continent, counts in self._countries.groupby("continent")[MEDAL_COLUMNS].sum().iterrows()
+        }
+        self._standings = None
+
+        # Athletes: code -> [name, Individual, Team]; the top-k list is only
+        # recomputed when an update can change it
+        self._athletes = {}
+        if athlete_medals is not None and not athlete_medals.empty:
+            kinds = (athlete_medals.groupby(["code_athlete", "medal_kind"], observed=True).size()
+                     .unstack(fill_value=0).reindex(columns=MEDAL_KINDS, fill_value=0))
+            names = athlete_medals.groupby("code_athlete")["name"].first()
+            for code, (individual, team) in zip(kinds.index, kinds.to_numpy()):
+                self._athletes[str(code)] = [names.get(code), int(individual), int(team)]
+        self._top = None
+
+        # Leaderboards: best result per participant and event (see
+        # best_results), sorted by event with (first, last + 1) row bounds;
+        # an event is turned into a participant dict when the feed touches it
+        self._seed_results = pd.DataFrame()
+        self._result_bounds = {}
+        if results is not None and not results.empty:
+            best = best_results(results).sort_values("event_code", kind="stable").reset_index(drop=True)
+            codes = best["event_code"].to_numpy()
+            change = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+            firsts, lasts = np.r_[0, change], np.r_[change, len(codes)]
+            self._seed_results = best
+            self._result_bounds = {codes[f]: (int(f), int(l)) for f, l in zip(firsts, lasts)}
+        self._boards = {}
+        self._events = {}
+        self._recent = OrderedDict()
+
+    # Updates
+
+    def apply(self, row):
+        """
+        Adds one feed row (a dict of strings, as read from CSV) to the
+        aggregates it belongs to: a medals.csv row to the standings and
+        continent totals, a medallists.csv row to the athlete counts and a
+        results row to its event's leaderboard.
+
+        Returns:
+            bool: Whether the row was recognized and applied
+        """
+        kind = row_kind(row)
+        with self._lock:
+            if kind == "medal":
+                applied = self._add_medal(row)
+            elif kind == "medallist":
+                applied = self._add_medallist(row)
+            elif kind == "result":
+                applied = self._add_result(row)
+            else:
+                applied = False
+            if applied:
+                self.updates += 1
+                self.updated_at = datetime.now()
+        return applied
+
+    def _add_medal(self, row):
+        medal = _MEDAL_POSITION.get(row.get("medal_type"))
+        code = row.get("country_code")
+        if medal is None or not code:
+            return False
+
+        code = self._aliases.get(code, code)
+        if code not in self._country_pos and row.get("country") in self._code_of_country:
+            code = self._aliases[row["country_code"]] = self._code_of_country[row["country"]]
+        pos = self._country_pos.get(code)
+        if pos is None:
+            pos = self._country_pos[code] = len(self._counts)
+            self._counts = np.vstack([self._counts, np.zeros((1, len(MEDAL_COLUMNS)), dtype=np.int64)])
+            self._new_countries.append({"country_code": code, "country": row.get("country") or code,
+                                        "country_long": row.get("country_long") or row.get("country") or code,
+                                        "continent": self._continent_of.setdefault(
+                                            code, get_continent_name(get_continent_code(row.get("country"))))})
+        self._counts[pos, medal] += 1
+
+        continent = self._continent_of[code]
+        self._continents.setdefault(continent, np.zeros(len(MEDAL_COLUMNS), dtype=np.int64))[medal] += 1
+        self._standings = None
+        return True
+
+    def _add_medallist(self, row):
+        code = row.get("code_athlete")
+        if not code or row.get("medal_type") not in _MEDAL_POSITION:
+            return False
+        code = code[:-2] if code.endswith(".0") else code
+
+        athlete = self._athletes.setdefault(code, [row.get("name"), 0, 0])
+        athlete[2 if row.get("code_team") else 1] += 1
+
+        # The top list can only change if this athlete is in it or now
+        # reaches its last total
+        if self._top is not None:
+            k, top = self._top
+            total = athlete[1] + athlete[2]
+            if len(top) < k or code in top or total >= self._total(top[-1]):
+                self._top = None
+        return True
+
+    def _add_result(self, row):
+        event, participant = row.get("event_code"), row.get("participant_code")
+        if not event or not participant:
+            return False
+        date = pd.to_datetime(row.get("date"), errors="coerce", utc=True)
+        if pd.isna(date):
+            return False
+
+        board = self._board(event)
+        current = board.get(participant)
+        if current is None or date >= current["date"]:
+            board[participant] = {
+                "date": date.tz_convert(SCHEDULE_TZ),
+                "stage": row.get("stage"),
+                "participant_name": row.get("participant_name"),
+                "participant_country_code": row.get("participant_country_code"),
+                "rank": _rank(row.get("rank")),
+                "result": row.get("result"),
+                "result_type": row.get("result_type"),
+            }
+        self._events.setdefault(event, (row.get("discipline_name"), row.get("event_name")))
+        self._recent[event] = True
+        self._recent.move_to_end(event, last=False)
+        while len(self._recent) > RECENT_EVENTS:
+            self._recent.popitem()
+        return True
+
+    def _board(self, event):
+        board = self._boards.get(event)
+        if board is None:
+            first, last = self._result_bounds.get(event, (0, 0))
+            seed = self._seed_results.iloc[first:last]
+            board = self._boards[event] = {
+                str(participant): line
+                for participant, line in zip(seed.get("participant_code", []),
+                                             seed.drop(columns="participant_code", errors="ignore")
+                                             .to_dict("records"))
+            }
+            if first < last:
+                self._events[event] = (seed["discipline"].iat[0], seed["event"].iat[0])
+        return board
+
+    def _total(self, code):
+        athlete = self._athletes[code]
+        return athlete[1] + athlete[2]
+
+    # Reads
+
+    def standings(self):
+        """
+        Current medal table, with the seed table's columns and Total.
+
+        Returns:
+            pd.DataFrame: One row per country (rebuilt only after a change)
+        """
+        with self._lock:
+            if self._standings is None:
+                countries = self._countries
+                if self._new_countries:
+                    countries = pd.concat([countries, pd.DataFrame(self._new_countries)], ignore_index=True)
+                counts = pd.DataFrame(self._counts, columns=MEDAL_COLUMNS)
+                self._standings = countries.assign(**counts, Total=self._counts.sum(axis=1))
+            return self._standings
+
+    def continent_totals(self, medal_columns=MEDAL_COLUMNS):
+        """Medal table per continent, like medal_table(standings, "continent")."""
+        with self._lock:
+            table = pd.DataFrame.from_dict(self._continents, orient="index", columns=MEDAL_COLUMNS)
+        table = table.rename_axis("continent")[list(medal_columns)]
+        table.columns.name = "medal"
+        return table.assign(Total=table.sum(axis=1))
+
+    def top_athletes(self, k=10):
+        """
+        Athletes with the most medals.
+
+        Returns:
+            pd.DataFrame: code_athlete, name, Individual, Team, Total; best first
+        """
+        with self._lock:
+            if self._top is None or self._top[0] != k:
+                codes = heapq.nlargest(k, self._athletes, key=lambda code: (self._total(code), code))
+                self._top = (k, codes)
+            rows = [[code] + self._athletes[code] for code in self._top[1]]
+        top = pd.DataFrame(rows, columns=["code_athlete", "name"] + MEDAL_KINDS)
+        return top.assign(Total=top[MEDAL_KINDS].sum(axis=1))
+
+    def recent_events(self):
+        """Events updated by the feed, most recent first: list of (event_code, discipline, event)."""
+        with self._lock:
+            return [(event,) + self._events.get(event, (None, None)) for event in self._recent]
+
+    def leaderboard(self, event):
+        """
+        Best result of each participant of an event: the furthest stage they
+        reached, then rank.
+
+        Returns:
+            pd.DataFrame: participant_code, stage, participant_name,
+                participant_country_code, rank, result, result_type, date
+        """
+        with self._lock:
+            board = pd.DataFrame.from_dict(self._board(event), orient="index")
+        if board.empty:
+            return board
+        board = board.rename_axis("participant_code").reset_index()
+        board = board.sort_values(["date", "rank"], ascending=[False, True], na_position="last", kind="stable")
+        columns = ["participant_code", "stage", "participant_name", "participant_country_code",
+                   "rank", "result", "result_type", "date"]
+        return board[[column for column in columns if column in board.columns]].reset_index(drop=True)
+
+
+# Feed
+
+def feed_lines(source=LIVE_FEED, stop=None, poll=POLL_SECONDS):
+    """
+    Complete lines of the feed as they arrive.
+
+    A file is read from the start and then followed like `tail -f`; a line
+    is only returned once its newline has been written. tcp://host:port
+    connects to a server that streams lines and ends when it closes.
+    """
+    stop = stop or threading.Event()
+    if source.startswith("tcp://"):
+        host, port = source[len("tcp://"):].rsplit(":", 1)
+        with socket.create_connection((host, int(port))) as conn, \
+                conn.makefile("r", encoding="utf-8", newline="") as stream:
+            for line in stream:
+                if stop.is_set():
+                    return
+                yield line
+        return
+
+    while not os.path.exists(source):
+        if stop.wait(poll):
+            return
+    with open(source, encoding="utf-8", newline="") as stream:
+        partial = ""
+        while not stop.is_set():
+            line = stream.readline()
+            if not line:
+                stop.wait(poll)
+                continue
+            partial += line
+            if partial.endswith("\n"):
+                yield partial
+                partial = ""
+
+
+def feed_rows(lines):
+    """
+    Rows of a CSV feed as dicts. A line naming a known schema's key column
+    is a header and applies to the lines after it, so medal and result rows
+    can share one feed. Fields cannot contain newlines.
+    """
+    header = None
+    key_columns = {column for column, _ in ROW_KINDS}
+    for line in lines:
+        fields = next(csv.reader([line]), [])
+        if not fields:
+            continue
+        if key_columns & set(fields):
+            header = fields
+        elif header is not None:
+            yield {column: value for column, value in zip(header, fields) if value != ""}
+
+
+class FeedReader(threading.Thread):
+    """Applies the feed's rows to `target` (a LiveAggregates, replaceable) as they arrive."""
+
+    def __init__(self, target, source=LIVE_FEED, retry=5.0):
+        super().__init__(daemon=True, name="live-feed")
+        self.target = target
+        self.source = source
+        self.retry = retry
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                for row in feed_rows(feed_lines(self.source, self._stop_event)):
+                    self.target.apply(row)
+            except OSError:
+                _LOGGER.warning("Live feed %s unavailable, retrying in %ss", self.source, self.retry)
+            self._stop_event.wait(self.retry)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_LIVE = None
+_READER = None
+_LIVE_LOCK = threading.Lock()
+
+
+def live_aggregates(version, seed):
+    """
+    The process-wide live aggregates of a dataset version, seeded on first
+    use and fed by the feed thread from then on.
+
+    A new version (see utils.snapshots) is seeded from its own tables and
+    takes over the feed where it is: the refreshed files are expected to
+    hold the rows the feed delivered before them.
+
+    Args:
+        version (str): Dataset snapshot version
+        seed (callable): Returns the LiveAggregates keyword arguments
+            (medals_total, athlete_medals, results) of that version
+
+    Returns:
+        LiveAggregates
+    """
+    global _LIVE, _READER
+    with _LIVE_LOCK:
+        if _LIVE is None or _LIVE.version != version:
+            _LIVE = LiveAggregates(version=version, **seed())
+            if _READER is None:
+                _READER = FeedReader(_LIVE)
+                _READER.start()
+            _READER.target = _LIVE
+    return _LIVE
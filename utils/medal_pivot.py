@@ -0,0 +1,41 @@
+import pandas as pd
+
+MEDAL_COLUMNS = ["Gold", "Silver", "Bronze"]
+
+MEDAL_COLORS = {"Gold": "#FFD700", "Silver": "#C0C0C0", "Bronze": "#CD7F32"}
+
+
+def medal_table(medals, by, medal_columns=MEDAL_COLUMNS):
+    """
+    Medal table (one row per value of `by`, one column per medal type plus
+    Total) computed in a single grouped pass.
+
+    Works on medals.csv rows (one row per medal, with "medal_type") and on
+    frames that are already wide such as medals_total.csv, which are summed
+    per group.
+
+    Args:
+        medals (pd.DataFrame): medals.csv rows or a frame with Gold/Silver/Bronze columns
+        by (str or list): Grouping column(s)
+        medal_columns (list): Medal types to keep; Total is their sum
+
+    Returns:
+        pd.DataFrame: Indexed by `by`, columns medal_columns + ["Total"]
+    """
+    by = [by] if isinstance(by, str) else list(by)
+
+    if "medal_type" in medals.columns:
+        medal = medals["medal_type"].str.replace(" Medal", "", regex=False).rename("medal")
+        table = medals.groupby(by + [medal]).size().unstack("medal", fill_value=0)
+    else:
+        table = medals.groupby(by)[MEDAL_COLUMNS].sum()
+
+    table = table.reindex(columns=medal_columns, fill_value=0)
+    table.columns.name = "medal"
+    table["Total"] = table.sum(axis=1)
+    return table
+
+
+def medal_long(table, medal_columns=MEDAL_COLUMNS):
+    """Long (group..., medal, count) form of a medal table, for grouped bar charts."""
+    return table[medal_columns].stack().rename("count").reset_index()
@@ -0,0 +1,209 @@
+import numpy as np
+import pandas as pd
+
+from utils.medal_pivot import MEDAL_COLUMNS, medal_table
+
+
+def _rank_order(days, counts, names):
+    """
+    Sort order and official ranks of one or more medal tables at once.
+
+    Rows are ordered by day, then Gold, Silver and Bronze descending, then
+    name. Countries with the same Gold/Silver/Bronze on the same day share the
+    rank of the first of them (1, 2, 2, 4, ...).
+
+    Args:
+        days (np.ndarray): Table each row belongs to (all zeros for one table)
+        counts (np.ndarray): (rows x medal types) counts, most valuable first
+        names (np.ndarray): Alphabetical tie order within a shared rank
+
+    Returns:
+        tuple: (order, ranks) where ranks[i] is the rank of row order[i]
+    """
+    keys = [names] + [-counts[:, i] for i in reversed(range(counts.shape[1]))] + [days]
+    order = np.lexsort(keys)
+
+    sorted_days = days[order]
+    sorted_counts = counts[order]
+    n = len(order)
+
+    new_day = np.r_[True, sorted_days[1:] != sorted_days[:-1]] if n else np.array([], dtype=bool)
+    new_score = new_day.copy()
+    if n:
+        new_score[1:] |= (sorted_counts[1:] != sorted_counts[:-1]).any(axis=1)
+
+    positions = np.arange(n)
+    day_start = np.maximum.accumulate(np.where(new_day, positions, 0))
+    score_start = np.maximum.accumulate(np.where(new_score, positions, 0))
+    return order, score_start - day_start + 1
+
+
+def official_ranks(table, medal_columns=MEDAL_COLUMNS, name="country"):
+    """
+    Medal table in official order with a "rank" column.
+
+    Countries are ranked by Gold, then Silver, then Bronze (only the
+    medal_columns present in the table count). Ties share a rank and are
+    listed alphabetically.
+
+    Args:
+        table (pd.DataFrame): One row per country with medal columns
+        medal_columns (list): Medal types, most valuable first
+        name (str): Column used to order tied countries
+
+    Returns:
+        pd.DataFrame: The table sorted by rank, with an int "rank" column
+    """
+    table = table.reset_index() if name not in table.columns else table
+    columns = [column for column in medal_columns if column in table.columns]
+
+    order, ranks = _rank_order(
+        np.zeros(len(table), dtype=np.int64),
+        table[columns].to_numpy(dtype=np.int64),
+        table[name].astype(str).to_numpy()
+    )
+    ranked = table.iloc[order].copy()
+    ranked.insert(0, "rank", ranks)
+    return ranked.reset_index(drop=True)
+
+
+def build_daily_standings(medals, key="country_code"):
+    """
+    Cumulative medal table after each medal day, ranked officially.
+
+    The (day x country x medal type) counts are built with one pivot and a
+    cumulative sum over days, and all days are ranked with a single lexsort,
+    so looking up a rank on a given day is an array access.
+
+    Args:
+        medals (pd.DataFrame): medals.csv rows
+        key (str): Column identifying a country
+
+    Returns:
+        dict: "dates" (sorted medal days), "countries" (sorted keys),
+            "counts" (days x countries x Gold/Silver/Bronze cumulative
+            counts), "ranks" (days x countries, 0 until a country's first
+            medal), "date_pos"/"country_pos" (value -> array position) and
+            "names" (key -> country name)
+    """
+    medals = medals.dropna(subset=["medal_date", key])
+    daily = medal_table(medals, ["medal_date", key])
+    dates = daily.index.get_level_values("medal_date").unique().sort_values()
+    countries = daily.index.get_level_values(key).unique().sort_values()
+
+    full = pd.MultiIndex.from_product([dates, countries], names=["medal_date", key])
+    counts = daily[MEDAL_COLUMNS].reindex(full, fill_value=0).to_numpy(dtype=np.int64)
+    counts = counts.reshape(len(dates), len(countries), len(MEDAL_COLUMNS)).cumsum(axis=0)
+
+    # Rank every (day, country) that has at least one medal so far
+    flat = counts.reshape(-1, len(MEDAL_COLUMNS))
+    medalled = np.flatnonzero(flat.sum(axis=1) > 0)
+    day_of_row = medalled // len(countries)
+    country_of_row = medalled % len(countries)
+
+    order, ranks = _rank_order(day_of_row, flat[medalled], countries.to_numpy().astype(str)[country_of_row])
+    rank_matrix = np.zeros(len(dates) * len(countries), dtype=np.int64)
+    rank_matrix[medalled[order]] = ranks
+
+    names = medals.groupby(key)["country"].first() if "country" in medals.columns else pd.Series(dtype=object)
+
+    return {
+        "dates": dates,
+        "countries": countries,
+        "counts": counts,
+        "ranks": rank_matrix.reshape(len(dates), len(countries)),
+        "date_pos": {date: i for i, date in enumerate(dates)},
+        "country_pos": {country: i for i, country in enumerate(countries)},
+        "names": names,
+    }
+
+
+def rank_on(standings, date, country):
+    """Rank of a country after a medal day (0 if it had no medal yet)."""
+    return int(standings["ranks"][standings["date_pos"][date], standings["country_pos"][country]])
+
+
+def rank_history(standings, countries):
+    """Day-by-day rank of the given countries, one column per country."""
+    positions = [standings["country_pos"][country] for country in countries if country in standings["country_pos"]]
+    columns = standings["countries"][positions]
+    history = pd.DataFrame(standings["ranks"][:, positions], index=standings["dates"], columns=columns)
+    return history.replace(0, np.nan)
+
+
+def standings_frame(standings, top=None):
+    """
+    Long (medal_date, country, Gold, Silver, Bronze, Total, rank) frame of
+    the daily standings, optionally limited to the `top` ranks of each day.
+    """
+    n_dates, n_countries, _ = standings["counts"].shape
+    flat = standings["counts"].reshape(-1, len(MEDAL_COLUMNS))
+    frame = pd.DataFrame(flat, columns=MEDAL_COLUMNS)
+    frame.insert(0, "country_code", np.tile(standings["countries"].to_numpy(), n_dates))
+    frame.insert(0, "medal_date", np.repeat(standings["dates"].to_numpy(), n_countries))
+    frame["Total"] = flat.sum(axis=1)
+    frame["rank"] = standings["ranks"].reshape(-1)
+    frame["country"] = frame["country_code"].map(standings["names"]).fillna(frame["country_code"])
+
+    frame = frame[frame["rank"] > 0]
+    if top is not None:
+        frame = frame[frame["rank"] <= top]
+    return frame.sort_values(["medal_date", "rank", "country_code"]).reset_index(drop=True)
+
+
+# Sidebar dimensions the per-athlete medal counts are pre-aggregated by
+MEDALLIST_DIMENSIONS = ["country_code", "continent", "discipline", "medal_type"]
+
+
+def build_medallist_counts(athlete_medals, dimensions=MEDALLIST_DIMENSIONS):
+    """
+    Medal counts per athlete, medal kind and combination of the filter
+    dimensions, so a filtered top-K only sums a few pre-aggregated rows.
+
+    Args:
+        athlete_medals (pd.DataFrame): One row per (athlete, medal), see
+            utils.ingest.build_athlete_medals
+        dimensions (list): Columns the counts stay keyed by
+
+    Returns:
+        pd.DataFrame: code_athlete, name, dimensions, medal_kind, medal_count
+    """
+    keys = ["code_athlete", "name"] + [d for d in dimensions if d in athlete_medals.columns] + ["medal_kind"]
+    return (
+        athlete_medals.groupby(keys, observed=True, dropna=False)
+        .size()
+        .rename("medal_count")
+        .reset_index()
+    )
+
+
+def top_medallists(counts, k=10, **filters):
+    """
+    Top-k athletes by medal count under a combination of filters.
+
+    Args:
+        counts (pd.DataFrame): Output of build_medallist_counts
+        k (int): Number of athletes
+        **filters: Dimension column -> allowed values; empty means no filter
+
+    Returns:
+        pd.DataFrame: code_athlete, name, medal_kind, medal_count for the top
+            k athletes, best first
+    """
+    mask = np.ones(len(counts), dtype=bool)
+    for column, values in filters.items():
+        if values:
+            mask &= counts[column].isin(values).to_numpy()
+    selected = counts[mask]
+
+    # nlargest does a partial selection on the per-athlete totals
+    totals = selected.groupby("code_athlete")["medal_count"].sum()
+    top = totals.nlargest(k)
+
+    by_kind = (
+        selected[selected["code_athlete"].isin(top.index)]
+        .groupby(["code_athlete", "name", "medal_kind"], observed=True)["medal_count"].sum()
+        .reset_index()
+    )
+    by_kind["total"] = by_kind["code_athlete"].map(top)
+    return by_kind.sort_values(["total", "code_athlete"], ascending=[False, True]).drop(columns="total").reset_index(drop=True)
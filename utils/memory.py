@@ -0,0 +1,87 @@
+import sys
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# Frames shared by every session (st.cache_resource loaders), by name
+_SHARED = weakref.WeakValueDictionary()
+
+
+def share(frame, name):
+    """
+    Registers a frame shared by every session, for the memory report, and
+    returns it. Shared frames are read-only by convention: pages filter them
+    with select() and never add or assign columns.
+    """
+    _SHARED[name] = frame
+    return frame
+
+
+def select(frame, *masks):
+    """
+    Rows of `frame` where every mask holds.
+
+    Masks that are None are skipped, and with no mask left the frame itself
+    is returned rather than a copy, so an unfiltered page holds no rows of
+    its own. Several filters cost one boolean index instead of one per filter.
+
+    Args:
+        frame (pd.DataFrame): Frame to select from
+        masks (pd.Series | np.ndarray | None): Boolean masks aligned with the frame
+
+    Returns:
+        pd.DataFrame: The selected rows
+    """
+    masks = [np.asarray(mask, dtype=bool) for mask in masks if mask is not None]
+    if not masks:
+        return frame
+    return frame[np.logical_and.reduce(masks)]
+
+
+def deep_bytes(obj, _seen=None):
+    """
+    Bytes held by `obj`: frames and arrays by their buffers (object columns
+    included), containers by their items. Objects reached twice are counted
+    once.
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(deep_bytes(k, seen) + deep_bytes(v, seen) for k, v in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(deep_bytes(item, seen) for item in obj)
+    return sys.getsizeof(obj)
+
+
+def session_memory(session_state):
+    """
+    Bytes retained by one session between reruns: its session state, by key.
+
+    Returns:
+        pd.DataFrame: key, bytes; largest first
+    """
+    seen = set(map(id, _SHARED.values()))
+    sizes = [(str(key), deep_bytes(value, seen)) for key, value in session_state.items()]
+    return pd.DataFrame(sizes, columns=["key", "bytes"]).sort_values("bytes", ascending=False, ignore_index=True)
+
+
+def shared_memory():
+    """
+    Bytes of the frames shared by every session (held once per server).
+
+    Returns:
+        pd.DataFrame: name, rows, bytes; largest first
+    """
+    sizes = [(name, len(frame), deep_bytes(frame)) for name, frame in list(_SHARED.items())]
+    return pd.DataFrame(sizes, columns=["name", "rows", "bytes"]).sort_values("bytes", ascending=False,
+                                                                             ignore_index=True)
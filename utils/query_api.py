@@ -0,0 +1,302 @@
+"""
+Headless query API: the aggregates the dashboard pages show (filtered KPIs,
+medal standings, continent totals, schedules), computed without Streamlit
+so other consumers can reuse them.
+
+    from utils.query_api import query
+    query("standings", {"continents": ["Europe"], "top": 5})
+
+Every query takes the same filters as the pages' sidebars. Tables are loaded
+once per dataset version (see utils.snapshots) and shared by all queries,
+and the JSON body of each (query, filters, version) is kept, so a repeated
+query is a dictionary lookup. utils/query_server.py serves the queries over
+HTTP.
+"""
+import hashlib
+import inspect
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils import live_feed
+from utils.athlete_cards import load_results
+from utils.continents import add_continents
+from utils.ingest import data_path, explode_list_column, medal_model, read_tables, rows_with_any
+from utils.medal_pivot import MEDAL_COLUMNS, medal_table
+from utils.medal_ranking import official_ranks
+from utils.schedule_index import SCHEDULE_TZ, build_schedule_index, page_count, window_positions
+from utils.snapshots import pin_snapshot
+
+# Responses kept per process, least recently used dropped first
+CACHE_ENTRIES = 4096
+
+# Parameters that take several values (?countries=France&countries=Japan)
+LIST_PARAMS = {"countries", "continents", "sports", "medal_types", "venues"}
+INT_PARAMS = {"top", "page", "page_size"}
+
+SCHEDULE_PAGE_SIZE = 25
+
+_TABLES = OrderedDict()
+_TABLES_LOCK = threading.Lock()
+_RESPONSES = OrderedDict()
+_RESPONSES_LOCK = threading.Lock()
+
+
+def load_tables(version):
+    """
+    The tables of a dataset version, loaded and enriched once and shared by
+    every query (read-only). The two most recent versions are kept.
+
+    Returns:
+        dict: athletes, nocs, events, medals_total, medals (with continents),
+            athlete_disciplines (see utils.ingest.explode_list_column) and
+            schedule_index (see utils.schedule_index)
+    """
+    with _TABLES_LOCK:
+        tables = _TABLES.get(version)
+        if tables is None:
+            athletes, nocs, events, medals_total, medals, schedules = read_tables(
+                [data_path(name) for name in ["athletes.csv", "nocs.csv", "events.csv", "medals_total.csv",
+                                              "medals.csv", "schedules.csv"]]
+            )
+            tables = {
+                "athletes": athletes,
+                "nocs": nocs,
+                "events": events,
+                "medals_total": add_continents(medals_total),
+                "medals": add_continents(medals),
+                "athlete_disciplines": explode_list_column(athletes["disciplines"]),
+                "schedule_index": build_schedule_index(schedules),
+            }
+            _TABLES[version] = tables
+            while len(_TABLES) > 2:
+                _TABLES.popitem(last=False)
+        return tables
+
+
+def _live(version, tables):
+    def seed():
+        _, _, athlete_medals = medal_model(version)
+        return {"medals_total": tables["medals_total"], "athlete_medals": athlete_medals, "results": load_results()}
+    return live_feed.live_aggregates(version, seed) if live_feed.enabled() else None
+
+
+def _records(frame):
+    """Rows of a frame as JSON-ready dicts (missing values as None)."""
+    return frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+
+# Queries
+
+
+def overview_filter(tables, countries=(), continents=(), sports=(), medal_types=()):
+    """
+    The Overview page's filters: countries and continents select medal
+    rows, sports select events and athletes; medal types pick the medal
+    columns (all when empty).
+
+    Returns:
+        dict: Filtered athletes, events and medals_total, and medal_columns
+    """
+    athletes, nocs, events, medals_total = (tables[name] for name in ["athletes", "nocs", "events", "medals_total"])
+    medals_total_mask = np.ones(len(medals_total), dtype=bool)
+    athletes_mask = np.ones(len(athletes), dtype=bool)
+    events_mask = np.ones(len(events), dtype=bool)
+
+    if countries:
+        country_codes = nocs[nocs['country'].isin(countries)]['code'].values
+        medals_total_mask &= medals_total['country_code'].isin(country_codes).to_numpy()
+        athletes_mask &= athletes['country_code'].isin(country_codes).to_numpy()
+    if continents:
+        medals_total_mask &= medals_total['continent'].isin(continents).to_numpy()
+    if sports:
+        events_mask &= events['sport'].isin(sports).to_numpy()
+        athletes_mask &= rows_with_any(tables["athlete_disciplines"], sports, len(athletes))
+
+    unknown = set(medal_types) - set(MEDAL_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown medal types: {sorted(unknown)}")
+
+    return {
+        "athletes": athletes[athletes_mask],
+        "events": events[events_mask],
+        "medals_total": medals_total[medals_total_mask],
+        "medal_columns": [medal for medal in MEDAL_COLUMNS if medal in medal_types] or list(MEDAL_COLUMNS),
+    }
+
+
+def kpis(tables, countries=(), continents=(), sports=(), medal_types=()):
+    """The Overview's key figures under the filters."""
+    filtered = overview_filter(tables, countries, continents, sports, medal_types)
+    medals_total, events = filtered["medals_total"], filtered["events"]
+    return {
+        "athletes": len(filtered["athletes"]),
+        "countries": int(medals_total['country_code'].nunique()),
+        "sports": int(events['sport_code'].nunique()),
+        "medals": int(medals_total[filtered["medal_columns"]].to_numpy().sum()),
+        "events": len(events),
+    }
+
+
+def standings(tables, countries=(), continents=(), sports=(), medal_types=(), top=None):
+    """Medal table in official order (Gold, then Silver, then Bronze) over the selected medal types."""
+    filtered = overview_filter(tables, countries, continents, sports, medal_types)
+    table = official_ranks(medal_table(filtered["medals_total"], ["country_code", "country"], filtered["medal_columns"]))
+    return _records(table.head(top) if top else table)
+
+
+def continent_totals(tables, countries=(), continents=(), sports=(), medal_types=()):
+    """Medals per continent over the selected medal types, most first."""
+    filtered = overview_filter(tables, countries, continents, sports, medal_types)
+    table = medal_table(filtered["medals_total"], "continent", filtered["medal_columns"])
+    return _records(table.sort_values("Total", ascending=False).reset_index())
+
+
+def schedule(tables, discipline=None, start=None, end=None, venues=(), page=1, page_size=SCHEDULE_PAGE_SIZE):
+    """
+    One page of a discipline's sessions overlapping the [start, end] days
+    (Paris time; the discipline's whole span by default), as on the Sports
+    page's schedule tab.
+    """
+    index = tables["schedule_index"]
+    if page_size < 1:
+        raise ValueError("page_size must be at least 1")
+    if discipline not in index["bounds"]:
+        raise ValueError(f"Unknown discipline: {discipline!r}")
+    first, last = index["bounds"][discipline]
+    sessions = index["sessions"]
+
+    window_start = pd.Timestamp(start, tz=SCHEDULE_TZ) if start else sessions["start_date"].iat[first].normalize()
+    window_end = pd.Timestamp(end or sessions["end_date"].iloc[first:last].max().date(), tz=SCHEDULE_TZ)
+    positions = window_positions(index, discipline, window_start, window_end + pd.Timedelta(days=1))
+    if venues:
+        positions = positions[np.isin(sessions["venue"].to_numpy()[positions], list(venues))]
+
+    pages = page_count(len(positions), page_size)
+    page = min(max(page, 1), pages)
+    rows = sessions.take(positions[(page - 1) * page_size:page * page_size])
+    return {"discipline": discipline, "start": window_start.date(), "end": window_end.date(),
+            "sessions": len(positions), "page": page, "pages": pages, "rows": _records(rows)}
+
+
+def options(tables):
+    """Values the filters accept."""
+    return {
+        "countries": sorted(tables["nocs"]['country'].dropna().unique()),
+        "continents": sorted(tables["medals_total"]['continent'].dropna().unique()),
+        "sports": sorted(tables["events"]['sport'].dropna().unique()),
+        "medal_types": list(MEDAL_COLUMNS),
+        "disciplines": sorted(tables["schedule_index"]["bounds"]),
+        "venues": sorted(tables["schedule_index"]["sessions"]['venue'].dropna().unique()),
+    }
+
+
+QUERIES = {
+    "kpis": kpis,
+    "standings": standings,
+    "continents": continent_totals,
+    "schedule": schedule,
+    "options": options,
+}
+
+
+def normalize_params(params):
+    """
+    Canonical, hashable form of query parameters: lists for the LIST_PARAMS
+    (sorted, so the order of values does not matter), ints for the
+    INT_PARAMS and single strings otherwise. Accepts plain values or the
+    lists urllib.parse.parse_qs makes.
+
+    Returns:
+        tuple: Sorted (name, value) pairs, with list values as tuples
+    """
+    normalized = {}
+    for name, value in params.items():
+        values = [value] if isinstance(value, (str, int)) else list(value)
+        if name in LIST_PARAMS:
+            normalized[name] = tuple(sorted(set(map(str, values))))
+        elif not values:
+            continue
+        elif name in INT_PARAMS:
+            try:
+                normalized[name] = int(values[-1])
+            except ValueError:
+                raise ValueError(f"{name} must be an integer") from None
+        else:
+            normalized[name] = str(values[-1])
+    return tuple(sorted(normalized.items()))
+
+
+def query(name, params=None, version=None):
+    """
+    Runs a query on the tables of the current (or given) dataset version.
+
+    Args:
+        name (str): One of QUERIES
+        params (dict): Filters and options, see the query functions
+
+    Returns:
+        The query's JSON-ready result
+
+    Raises:
+        KeyError: Unknown query
+        ValueError: Invalid parameters
+    """
+    function = QUERIES[name]
+    kwargs = dict(normalize_params(params or {}))
+    try:
+        # Only the parameters are checked: errors raised by the query itself
+        # are bugs, not bad requests
+        inspect.signature(function).bind(None, **kwargs)
+    except TypeError as error:
+        raise ValueError(f"Invalid parameters for {name}: {error}") from None
+
+    version = version or pin_snapshot()["version"]
+    tables = load_tables(version)
+    live = _live(version, tables)
+    if live is not None:
+        tables = dict(tables, medals_total=live.standings())
+    return function(tables, **kwargs)
+
+
+def _json_default(value):
+    if isinstance(value, (pd.Timestamp, pd.Timedelta)) or hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def response(name, params=None):
+    """
+    JSON body of a query and its ETag, served from the response cache.
+
+    The cache key is the query, its normalized parameters, the dataset
+    version and (with a live feed) the number of feed rows applied, so a
+    cached body is never stale and equal ETags mean equal bodies.
+
+    Returns:
+        tuple: (etag, body bytes)
+    """
+    if name not in QUERIES:
+        raise KeyError(name)
+    version = pin_snapshot()["version"]
+    live = _live(version, load_tables(version))
+    key = (name, normalize_params(params or {}), version, live.updates if live is not None else None)
+
+    with _RESPONSES_LOCK:
+        cached = _RESPONSES.get(key)
+        if cached is not None:
+            _RESPONSES.move_to_end(key)
+            return cached
+
+    body = json.dumps(query(name, params, version), default=_json_default, separators=(",", ":")).encode()
+    cached = (f'"{hashlib.sha1(body).hexdigest()[:20]}"', body)
+    with _RESPONSES_LOCK:
+        _RESPONSES[key] = cached
+        while len(_RESPONSES) > CACHE_ENTRIES:
+            _RESPONSES.popitem(last=False)
+    return cached
@@ -0,0 +1,88 @@
+"""
+Local HTTP JSON service for the headless query API (utils/query_api.py).
+
+    python -m utils.query_server --port 8600
+    curl 'localhost:8600/standings?continents=Europe&medal_types=Gold&top=5'
+
+GET /<query>?<params> returns the query's JSON, with list parameters
+repeated (?countries=France&countries=Japan). Every response carries an
+ETag; a request whose If-None-Match holds it gets 304 Not Modified and no
+body. Cache-Control: no-cache makes clients revalidate each time, so a new
+dataset version or live feed row is seen on the next request.
+"""
+import argparse
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from utils.query_api import QUERIES, response
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    # Keep-alive: clients polling the service reuse their connection. Headers
+    # and body are separate writes; with Nagle's algorithm on, the body would
+    # wait for the client's delayed ACK (~40 ms)
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        name = url.path.strip("/")
+        try:
+            etag, body = response(name, parse_qs(url.query))
+        except KeyError:
+            return self._send_json(404, {"error": f"Unknown query {name!r}", "queries": sorted(QUERIES)})
+        except ValueError as error:
+            return self._send_json(400, {"error": str(error)})
+        except Exception:
+            _LOGGER.exception("Query %s failed", self.path)
+            return self._send_json(500, {"error": "Internal error"})
+
+        if etag in self.headers.get("If-None-Match", "").replace(" ", "").split(","):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, body, etag)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode())
+
+    def _send(self, status, body, etag=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        _LOGGER.debug(format, *args)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the dashboard aggregates as JSON over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8600, help="Port to listen on")
+    args = parser.parse_args(argv)
+
+    server = ThreadingHTTPServer((args.host, args.port), QueryHandler)
+    server.daemon_threads = True
+    print(f"Serving {', '.join(sorted(QUERIES))} on http://{args.host}:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import build_team_members, parse_list
+
+# Separator of the names in athletes.csv "coach" cells
+COACH_SEPARATOR = ".<br>"
+
+
+def split_coaches(value):
+    """Coach names of an athletes.csv "coach" cell, as a list."""
+    if not isinstance(value, str):
+        return []
+    return [name.strip().rstrip(".") for name in value.split(COACH_SEPARATOR) if name.strip()]
+
+
+def _name_key(name):
+    # Order-insensitive name key: "SMITH John" and "John SMITH" match
+    return " ".join(sorted(re.findall(r"\w+", str(name).upper())))
+
+
+def _csr(src, dst, n_src):
+    """
+    Compressed sparse rows of an edge list: the neighbours of node i are
+    indices[indptr[i]:indptr[i + 1]], sorted and without duplicates.
+    """
+    edges = np.unique(np.stack([src, dst], axis=1), axis=0) if len(src) else np.empty((0, 2), dtype=np.int64)
+    indptr = np.zeros(n_src + 1, dtype=np.int64)
+    np.cumsum(np.bincount(edges[:, 0], minlength=n_src), out=indptr[1:])
+    return indptr, edges[:, 1].astype(np.int64)
+
+
+def _node_index(codes):
+    # Dense integer ids of one node type: id i is codes[i]
+    return pd.Index(pd.unique(pd.Series(codes, dtype=object).dropna().astype(str)))
+
+
+def _ids(nodes, codes):
+    # -1 for unknown codes
+    return nodes.get_indexer(pd.Series(codes, dtype=object).astype(str))
+
+
+def build_relationship_graph(athletes, teams, coaches, events=None, medallist_codes=()):
+    """
+    Athlete-team-coach-event graph as CSR adjacency arrays, built at ingest.
+
+    Edges:
+        athlete - team: teams.csv athletes_codes
+        team - coach: teams.csv coaches_codes
+        athlete - coach: athletes.csv "coach" names matched to coaches.csv
+        athlete - event: athletes.csv events, keyed by (discipline, event)
+            as listed in events.csv so same-named events of different
+            sports stay apart
+
+    Every relation is stored in both directions, so each query below only
+    touches the neighbours it returns.
+
+    Args:
+        athletes (pd.DataFrame): athletes.csv
+        teams (pd.DataFrame): teams.csv
+        coaches (pd.DataFrame): coaches.csv
+        events (pd.DataFrame): events.csv (optional)
+        medallist_codes (iterable): Codes of athletes with at least one medal
+
+    Returns:
+        dict: "nodes" (type -> pd.Index of codes; the position is the
+            node id), "adj" ((from, to) -> (indptr, indices)), "medallist"
+            (bool per athlete id), "athlete_names" (athlete code -> name),
+            "coach_names" (athlete code -> list of coach names as written)
+            and "coach_info" (coach code -> name, function)
+    """
+    team_athletes = build_team_members(teams).rename(columns={"code_team": "team", "code_athlete": "athlete"})
+    team_athletes["team"] = team_athletes["team"].astype(str)
+    team_coaches = pd.DataFrame({"team": teams["code"].astype(str), "coach": teams["coaches_codes"].map(parse_list)})
+    team_coaches = team_coaches.explode("coach").dropna(subset=["coach"])
+
+    coach_names = athletes["coach"].map(split_coaches)
+    athlete_coaches = pd.DataFrame({"athlete": athletes["code"].astype(str), "name": coach_names}).explode("name")
+    athlete_coaches = athlete_coaches.dropna(subset=["name"])
+    coach_by_name = coaches.assign(key=coaches["name"].map(_name_key)).drop_duplicates("key").set_index("key")["code"]
+    athlete_coaches["coach"] = athlete_coaches["name"].map(_name_key).map(coach_by_name)
+    athlete_coaches = athlete_coaches.dropna(subset=["coach"])
+
+    athlete_events = athletes.assign(
+        discipline=athletes["disciplines"].map(parse_list),
+        event=athletes["events"].map(parse_list)
+    ).explode("discipline").explode("event").dropna(subset=["discipline", "event"])
+    athlete_events = athlete_events[["code", "discipline", "event"]].rename(columns={"code": "athlete"})
+    if events is not None:
+        athlete_events = athlete_events.merge(
+            events[["sport", "event"]].rename(columns={"sport": "discipline"}).drop_duplicates(),
+            on=["discipline", "event"]
+        )
+    athlete_events["event_key"] = athlete_events["discipline"] + ": " + athlete_events["event"]
+
+    nodes = {
+        "athlete": _node_index(pd.concat([athletes["code"], team_athletes["athlete"]])),
+        "team": _node_index(teams["code"]),
+        "coach": _node_index(pd.concat([coaches["code"], team_coaches["coach"]])),
+        "event": _node_index(athlete_events["event_key"]),
+    }
+
+    edges = {
+        ("athlete", "team"): (team_athletes["athlete"], team_athletes["team"]),
+        ("coach", "team"): (team_coaches["coach"], team_coaches["team"]),
+        ("athlete", "coach"): (athlete_coaches["athlete"], athlete_coaches["coach"].astype(str)),
+        ("athlete", "event"): (athlete_events["athlete"], athlete_events["event_key"]),
+    }
+
+    adj = {}
+    for (a, b), (src, dst) in edges.items():
+        src_ids, dst_ids = _ids(nodes[a], src), _ids(nodes[b], dst)
+        adj[(a, b)] = _csr(src_ids, dst_ids, len(nodes[a]))
+        adj[(b, a)] = _csr(dst_ids, src_ids, len(nodes[b]))
+
+    athlete_names = pd.concat([
+        athletes.astype({"code": str}).set_index("code")["name"],
+        team_athletes.dropna(subset=["name"]).set_index("athlete")["name"],
+    ])
+
+    medallist = np.zeros(len(nodes["athlete"]), dtype=bool)
+    medallist_ids = _ids(nodes["athlete"], list(medallist_codes))
+    medallist[medallist_ids[medallist_ids >= 0]] = True
+
+    return {
+        "nodes": nodes,
+        "adj": adj,
+        "medallist": medallist,
+        "athlete_names": athlete_names[~athlete_names.index.duplicated()],
+        "coach_names": dict(zip(athletes["code"].astype(str), coach_names)),
+        "coach_info": coaches.astype({"code": str}).set_index("code")[["name", "function"]],
+    }
+
+
+def neighbours(graph, source, target, code):
+    """Codes of the `target` nodes linked to one `source` node."""
+    ids = _neighbour_ids(graph, source, target, _ids(graph["nodes"][source], [code]))
+    return graph["nodes"][target][ids].tolist()
+
+
+def _neighbour_ids(graph, source, target, ids):
+    indptr, indices = graph["adj"][(source, target)]
+    ids = ids[ids >= 0]
+    if len(ids) == 0:
+        return np.array([], dtype=np.int64)
+    return np.unique(np.concatenate([indices[indptr[i]:indptr[i + 1]] for i in ids]))
+
+
+def teammates(graph, athlete_code):
+    """Athletes sharing a team with an athlete."""
+    athlete_ids = _ids(graph["nodes"]["athlete"], [athlete_code])
+    team_ids = _neighbour_ids(graph, "athlete", "team", athlete_ids)
+    mate_ids = _neighbour_ids(graph, "team", "athlete", team_ids)
+    return graph["nodes"]["athlete"][mate_ids[~np.isin(mate_ids, athlete_ids)]].tolist()
+
+
+def athlete_coaches(graph, athlete_code):
+    """Coach codes of an athlete: named in their record or coaching one of their teams."""
+    athlete_ids = _ids(graph["nodes"]["athlete"], [athlete_code])
+    direct = _neighbour_ids(graph, "athlete", "coach", athlete_ids)
+    via_team = _neighbour_ids(graph, "team", "coach", _neighbour_ids(graph, "athlete", "team", athlete_ids))
+    return graph["nodes"]["coach"][np.union1d(direct, via_team)].tolist()
+
+
+def _coached_ids(graph, coach_code):
+    coach_ids = _ids(graph["nodes"]["coach"], [coach_code])
+    direct = _neighbour_ids(graph, "coach", "athlete", coach_ids)
+    via_team = _neighbour_ids(graph, "team", "athlete", _neighbour_ids(graph, "coach", "team", coach_ids))
+    return np.union1d(direct, via_team)
+
+
+def coached_athletes(graph, coach_code):
+    """Athletes coached by a coach, directly or through a team."""
+    return graph["nodes"]["athlete"][_coached_ids(graph, coach_code)].tolist()
+
+
+def coach_success(graph, coach_code):
+    """
+    (coached athletes, medallists among them, success rate) of a coach.
+    The rate is 0.0 for coaches without athletes.
+    """
+    athlete_ids = _coached_ids(graph, coach_code)
+    medallists = int(graph["medallist"][athlete_ids].sum())
+    rate = medallists / len(athlete_ids) if len(athlete_ids) else 0.0
+    return len(athlete_ids), medallists, rate
+
+
+def coach_name(graph, coach_code):
+    info = graph["coach_info"]
+    return info.at[coach_code, "name"] if coach_code in info.index else coach_code
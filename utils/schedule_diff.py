@@ -0,0 +1,228 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import data_path, read_tables
+
+# Common schema both schedule files are normalized to
+SESSION_KEY = ["venue_code", "discipline_code"]
+
+# A session whose start moved by more than this is reported as cancelled in
+# one file and added in the other rather than as moved
+DEFAULT_MAX_SHIFT = pd.Timedelta(hours=6)
+
+# Passes of the nearest-start join; each pass pairs sessions whose closest
+# candidate was taken by a better match in the previous pass
+NEAREST_MATCH_PASSES = 3
+
+
+def normalize_preliminary(preliminary):
+    """
+    schedules_preliminary.csv -> common session schema.
+
+    Times are already UTC; sessions held away from their main venue only
+    carry it in venue_code_other.
+    """
+    venue_code = preliminary["venue_code"]
+    if "venue_code_other" in preliminary.columns:
+        venue_code = venue_code.fillna(preliminary["venue_code_other"])
+
+    return pd.DataFrame({
+        "venue_code": venue_code,
+        "discipline_code": preliminary["sport_code"],
+        "start": pd.to_datetime(preliminary["date_start_utc"], utc=True, errors="coerce"),
+        "end": pd.to_datetime(preliminary["date_end_utc"], utc=True, errors="coerce"),
+        "label": preliminary["description"],
+    }).dropna(subset=["venue_code", "discipline_code", "start"])
+
+
+def normalize_schedule(schedules):
+    """
+    schedules.csv -> common session schema.
+
+    Local times are converted to UTC. Sessions already marked CANCELLED are
+    dropped, so their counterpart in the other file shows up as cancelled.
+    """
+    if "status" in schedules.columns:
+        schedules = schedules[schedules["status"] != "CANCELLED"]
+
+    label = schedules["event"].astype(str)
+    if "phase" in schedules.columns:
+        label = label + " - " + schedules["phase"].astype(str)
+
+    return pd.DataFrame({
+        "venue_code": schedules["venue_code"],
+        "discipline_code": schedules["discipline_code"],
+        "start": pd.to_datetime(schedules["start_date"], utc=True, errors="coerce"),
+        "end": pd.to_datetime(schedules["end_date"], utc=True, errors="coerce"),
+        "label": label,
+    }).dropna(subset=["venue_code", "discipline_code", "start"])
+
+
+def _match_on(base, updated, columns):
+    # One-to-one equi-join: duplicates on the join columns are paired in
+    # order via a running number instead of multiplying out.
+    base = base.assign(_n=base.groupby(columns).cumcount())
+    updated = updated.assign(_n=updated.groupby(columns).cumcount())
+    pairs = base.reset_index().merge(
+        updated.reset_index(), on=columns + ["_n"], suffixes=("_base", "_new")
+    )
+    return pairs["index_base"].to_numpy(), pairs["index_new"].to_numpy()
+
+
+def _match_nearest(base, updated, max_shift):
+    # Sort-merge join on start time within each key (merge_asof), kept
+    # one-to-one by letting each updated session keep its closest base one.
+    base_ids, new_ids = [], []
+
+    for _ in range(NEAREST_MATCH_PASSES):
+        if base.empty or updated.empty:
+            break
+
+        left = base.reset_index().rename(columns={"index": "id_base"}).sort_values("start")
+        right = updated.reset_index().rename(columns={"index": "id_new", "start": "start_new"}).sort_values("start_new")
+        pairs = pd.merge_asof(
+            left, right[SESSION_KEY + ["start_new", "id_new"]],
+            left_on="start", right_on="start_new", by=SESSION_KEY,
+            direction="nearest", tolerance=max_shift
+        ).dropna(subset=["id_new"])
+
+        if pairs.empty:
+            break
+
+        pairs["distance"] = (pairs["start_new"] - pairs["start"]).abs()
+        pairs = pairs.sort_values("distance", kind="stable").drop_duplicates("id_new")
+
+        base_ids.append(pairs["id_base"].to_numpy())
+        new_ids.append(pairs["id_new"].to_numpy(dtype=base.index.dtype))
+        base = base.drop(index=base_ids[-1])
+        updated = updated.drop(index=new_ids[-1])
+
+    if not base_ids:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    return np.concatenate(base_ids), np.concatenate(new_ids)
+
+
+def _within_base(base, sessions):
+    # Whether each session lies inside a base session of its key, as a join:
+    # merge_asof finds the base sessions starting no later than it, and the
+    # running maximum of their ends says whether one of them outlasts it.
+    spans = base.dropna(subset=["end"]).sort_values("start", kind="stable")
+    spans = spans.assign(covered_until=spans.groupby(SESSION_KEY)["end"].cummax())
+    probe = sessions.reset_index().rename(columns={"index": "id"}).sort_values("start", kind="stable")
+    joined = pd.merge_asof(
+        probe, spans[SESSION_KEY + ["start", "covered_until"]],
+        on="start", by=SESSION_KEY, direction="backward"
+    )
+    inside = (joined["end"] <= joined["covered_until"]).to_numpy()
+    return pd.Series(inside, index=joined["id"].to_numpy()).reindex(sessions.index, fill_value=False)
+
+
+def diff_sessions(base, updated, max_shift=DEFAULT_MAX_SHIFT):
+    """
+    Diff two normalized session frames.
+
+    Sessions are paired per (venue_code, discipline_code) in three rounds of
+    joins, never nested loops: identical intervals, same start with a new
+    end, then nearest start within max_shift. What is left over is cancelled
+    (only in base), refined (only in updated, but inside a base session of
+    the same venue and discipline, e.g. a final within a preliminary block)
+    or added.
+
+    Args:
+        base (pd.DataFrame): Normalized sessions of the older schedule
+        updated (pd.DataFrame): Normalized sessions of the newer schedule
+        max_shift (pd.Timedelta): Largest start shift still counted as moved
+
+    Returns:
+        pd.DataFrame: One row per session with "change" in {"unchanged",
+            "retimed" (same start, new end), "moved", "refined", "added",
+            "cancelled"},
+            base/new intervals and the start shift in minutes
+    """
+    base = base.reset_index(drop=True)
+    updated = updated.reset_index(drop=True)
+    matches = []
+
+    remaining_base, remaining_new = base, updated
+    for step in (SESSION_KEY + ["start", "end"], SESSION_KEY + ["start"]):
+        base_ids, new_ids = _match_on(remaining_base, remaining_new, step)
+        matches.append((base_ids, new_ids))
+        remaining_base = remaining_base.drop(index=base_ids)
+        remaining_new = remaining_new.drop(index=new_ids)
+
+    matches.append(_match_nearest(remaining_base, remaining_new, max_shift))
+
+    base_ids = np.concatenate([m[0] for m in matches]).astype(int)
+    new_ids = np.concatenate([m[1] for m in matches]).astype(int)
+
+    matched = pd.DataFrame({
+        "venue_code": base["venue_code"].to_numpy()[base_ids],
+        "discipline_code": base["discipline_code"].to_numpy()[base_ids],
+        "base_start": base["start"].to_numpy()[base_ids],
+        "base_end": base["end"].to_numpy()[base_ids],
+        "new_start": updated["start"].to_numpy()[new_ids],
+        "new_end": updated["end"].to_numpy()[new_ids],
+        "base_label": base["label"].to_numpy()[base_ids],
+        "new_label": updated["label"].to_numpy()[new_ids],
+    })
+    same_start = matched["base_start"] == matched["new_start"]
+    same_end = matched["base_end"] == matched["new_end"]
+    matched["change"] = np.select(
+        [same_start & same_end, same_start],
+        ["unchanged", "retimed"],
+        default="moved"
+    )
+
+    cancelled = base.drop(index=base_ids)
+    added = updated.drop(index=new_ids)
+
+    report = pd.concat([
+        matched,
+        pd.DataFrame({
+            "venue_code": cancelled["venue_code"],
+            "discipline_code": cancelled["discipline_code"],
+            "base_start": cancelled["start"],
+            "base_end": cancelled["end"],
+            "base_label": cancelled["label"],
+            "change": "cancelled",
+        }),
+        pd.DataFrame({
+            "venue_code": added["venue_code"],
+            "discipline_code": added["discipline_code"],
+            "new_start": added["start"],
+            "new_end": added["end"],
+            "new_label": added["label"],
+            "change": np.where(_within_base(base, added), "refined", "added"),
+        }),
+    ], ignore_index=True)
+
+    for column in ["base_start", "base_end", "new_start", "new_end"]:
+        report[column] = pd.to_datetime(report[column], utc=True)
+    report["start_shift_min"] = (report["new_start"] - report["base_start"]).dt.total_seconds() / 60
+
+    return report.sort_values(
+        ["discipline_code", "venue_code", "base_start", "new_start"], na_position="last"
+    ).reset_index(drop=True)
+
+
+def diff_schedule_files(preliminary_path=data_path("schedules_preliminary.csv"),
+                        schedules_path=data_path("schedules.csv"), max_shift=DEFAULT_MAX_SHIFT):
+    """Diff the preliminary schedule file against the published one."""
+    preliminary, schedules = read_tables([preliminary_path, schedules_path])
+    return diff_sessions(normalize_preliminary(preliminary), normalize_schedule(schedules), max_shift)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report moved, refined, added and cancelled sessions between two schedules")
+    parser.add_argument("preliminary", nargs="?", default=data_path("schedules_preliminary.csv"))
+    parser.add_argument("schedules", nargs="?", default=data_path("schedules.csv"))
+    parser.add_argument("--max-shift-hours", type=float, default=DEFAULT_MAX_SHIFT / pd.Timedelta(hours=1))
+    parser.add_argument("--output", help="Write the full report to this CSV file")
+    args = parser.parse_args()
+
+    report = diff_schedule_files(args.preliminary, args.schedules, pd.Timedelta(hours=args.max_shift_hours))
+    print(report["change"].value_counts().to_string())
+    if args.output:
+        report.to_csv(args.output, index=False)
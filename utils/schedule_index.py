@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+# Schedules are published with a +02:00 offset; sessions are displayed in
+# Paris local time.
+SCHEDULE_TZ = "Europe/Paris"
+
+
+def build_schedule_index(schedules, key="discipline"):
+    """
+    Sort schedule sessions by (key, start time) once, so that a time window
+    of one discipline (or venue, ...) can be found with two binary searches
+    instead of scanning and filtering the whole frame.
+
+    Args:
+        schedules (pd.DataFrame): Rows of schedules.csv
+        key (str): Column the sessions are grouped by
+
+    Returns:
+        dict: "sessions" (sorted frame with parsed start/end), "starts" and
+            "ends" (int64 ns arrays aligned with sessions), "bounds" (key
+            value -> (first, last + 1) row positions) and "max_duration" (longest
+            session in ns, used to widen the search to sessions that started
+            before the window but are still running)
+    """
+    sessions = schedules.copy()
+    sessions["start_date"] = pd.to_datetime(sessions["start_date"], errors="coerce", utc=True).dt.tz_convert(SCHEDULE_TZ)
+    if "end_date" in sessions.columns:
+        sessions["end_date"] = pd.to_datetime(sessions["end_date"], errors="coerce", utc=True).dt.tz_convert(SCHEDULE_TZ)
+    else:
+        sessions["end_date"] = sessions["start_date"]
+
+    # Remove rows with invalid dates
+    sessions = sessions.dropna(subset=["start_date", key])
+    sessions["end_date"] = sessions["end_date"].fillna(sessions["start_date"])
+    sessions = sessions.sort_values([key, "start_date"], kind="stable").reset_index(drop=True)
+
+    starts = sessions["start_date"].to_numpy(dtype="datetime64[ns]").view("int64")
+    ends = sessions["end_date"].to_numpy(dtype="datetime64[ns]").view("int64")
+
+    groups = sessions[key].to_numpy()
+    change = np.flatnonzero(groups[1:] != groups[:-1]) + 1
+    firsts = np.concatenate([[0], change]) if len(sessions) else np.array([], dtype=int)
+    lasts = np.concatenate([change, [len(sessions)]]) if len(sessions) else np.array([], dtype=int)
+    bounds = {groups[f]: (int(f), int(l)) for f, l in zip(firsts, lasts)}
+
+    return {
+        "sessions": sessions,
+        "starts": starts,
+        "ends": ends,
+        "bounds": bounds,
+        "max_duration": int((ends - starts).max()) if len(sessions) else 0,
+    }
+
+
+def group_span(index, group):
+    """First start and last end of a group, or None if it has no sessions."""
+    if group not in index["bounds"]:
+        return None
+    first, last = index["bounds"][group]
+    sessions = index["sessions"]
+    return sessions["start_date"].iat[first], sessions["end_date"].iloc[first:last].max()
+
+
+def window_positions(index, group, window_start, window_end):
+    """
+    Row positions (in start order) of a group's sessions overlapping
+    [window_start, window_end).
+
+    Sessions starting before window_end are found by binary search; the lower
+    bound is pulled back by the longest session so ones already running when
+    the window opens are kept, and only that short slice is checked on end.
+    """
+    if group not in index["bounds"]:
+        return np.array([], dtype=int)
+
+    first, last = index["bounds"][group]
+    starts = index["starts"][first:last]
+    window_start = pd.Timestamp(window_start).value
+    window_end = pd.Timestamp(window_end).value
+
+    lo = np.searchsorted(starts, window_start - index["max_duration"], side="left")
+    hi = np.searchsorted(starts, window_end, side="left")
+
+    candidates = np.arange(first + lo, first + hi)
+    return candidates[index["ends"][candidates] > window_start]
+
+
+def page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def session_page(index, positions, page, page_size):
+    """Sessions on a 1-based page of the window; only that page is materialized."""
+    page_positions = positions[(page - 1) * page_size:page * page_size]
+    return index["sessions"].take(page_positions)
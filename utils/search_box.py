@@ -0,0 +1,31 @@
+import streamlit as st
+
+from utils.search_index import build_search_documents, build_search_index, search
+
+KIND_ICONS = {"athlete": "👤", "coach": "📋", "event": "🎯", "venue": "🏟️", "torch": "🔥"}
+
+
+# One index per dataset version for every page and session; it is only read
+# after the build
+@st.cache_resource(max_entries=2)
+def load_search_index(version):
+    return build_search_index(build_search_documents())
+
+
+# Typing in the box only reruns the box and its results
+@st.fragment
+def render_global_search(version, k=8):
+    query = st.text_input(
+        "🔎 Search",
+        key="global_search",
+        placeholder="Athletes, coaches, events, venues, torch stages...",
+        help="Typo-tolerant: partial words and small misspellings still match"
+    )
+
+    if query:
+        results = search(load_search_index(version), query, k=k)
+        if results.empty:
+            st.caption("No matches")
+        for _, row in results.iterrows():
+            st.markdown(f"{KIND_ICONS.get(row['kind'], '')} **{row['label']}**  \n<small>{row['detail']}</small>",
+                        unsafe_allow_html=True)
@@ -0,0 +1,216 @@
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from utils.ingest import DATA_DIR, parse_list, read_tables
+
+SEARCH_KINDS = ["athlete", "coach", "event", "venue", "torch"]
+
+# Share of the query's trigrams a document must contain to be returned
+MIN_SCORE = 0.5
+
+# Score added when a word of the document starts with the last query word
+PREFIX_BONUS = 0.5
+
+
+def normalize(text):
+    """Lowercase, accents stripped, punctuation as spaces: "Saint-Étienne" -> "saint etienne"."""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def _grams(token, prefix=False):
+    # Trigrams of a word padded with "$"; a word still being typed (prefix)
+    # is not padded at the end, so "marc" matches "marchand"
+    padded = "$" + token + ("" if prefix else "$")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _csr(rows, values, n_rows):
+    # Postings of each row: values[indptr[r]:indptr[r + 1]], sorted and unique
+    pairs = np.unique(np.stack([rows, values], axis=1), axis=0) if len(rows) else np.empty((0, 2), dtype=np.int64)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs[:, 0], minlength=n_rows), out=indptr[1:])
+    return indptr, pairs[:, 1].astype(np.int64)
+
+
+def build_search_documents(data_dir=DATA_DIR):
+    """
+    Searchable documents of the dashboard, one row per athlete, coach, event,
+    venue and torch stage. Missing source files are skipped.
+
+    Returns:
+        pd.DataFrame: kind, key (code, name or tag identifying the row in its
+            source), label (what is searched and shown) and detail
+    """
+    parts = []
+
+    # The source files are parsed together, in parallel
+    names = ["athletes.csv", "coaches.csv", "events.csv", "venues.csv", "torch_route.csv"]
+    paths = {name: os.path.join(data_dir, name) for name in names}
+    found = [name for name in names if os.path.exists(paths[name])]
+    frames = dict(zip(found, read_tables([paths[name] for name in found])))
+
+    athletes = frames.get("athletes.csv")
+    if athletes is not None:
+        disciplines = athletes["disciplines"].map(lambda d: ", ".join(parse_list(d)))
+        parts.append(pd.DataFrame({
+            "kind": "athlete", "key": athletes["code"].astype(str), "label": athletes["name"],
+            "detail": athletes["country"].fillna("") + " · " + disciplines,
+        }))
+
+    coaches = frames.get("coaches.csv")
+    if coaches is not None:
+        parts.append(pd.DataFrame({
+            "kind": "coach", "key": coaches["code"].astype(str), "label": coaches["name"],
+            "detail": coaches["function"].fillna("Coach") + " · " + coaches["country"].fillna("")
+                      + " · " + coaches["disciplines"].fillna(""),
+        }))
+
+    events = frames.get("events.csv")
+    if events is not None:
+        parts.append(pd.DataFrame({
+            "kind": "event", "key": events["sport"] + ": " + events["event"], "label": events["event"],
+            "detail": events["sport"],
+        }))
+
+    venues = frames.get("venues.csv")
+    if venues is not None:
+        parts.append(pd.DataFrame({
+            "kind": "venue", "key": venues["venue"], "label": venues["venue"],
+            "detail": venues["sports"].map(lambda s: ", ".join(parse_list(s))),
+        }))
+
+    torch = frames.get("torch_route.csv")
+    if torch is not None:
+        parts.append(pd.DataFrame({
+            "kind": "torch", "key": torch["tag"], "label": torch["title"],
+            "detail": torch["city"].fillna("") + " · " + torch["date_start"].astype(str).str[:10],
+        }))
+
+    documents = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=["kind", "key", "label", "detail"])
+    return documents.dropna(subset=["label"]).reset_index(drop=True)
+
+
+def build_search_index(documents):
+    """
+    Inverted index over the documents' label and detail words.
+
+    Two CSR posting lists are built once: trigram -> documents (typo-tolerant
+    matching) and word -> documents over a sorted vocabulary (prefix matching
+    with two binary searches). A query only reads the postings of its own
+    trigrams and of the words it prefixes.
+
+    Args:
+        documents (pd.DataFrame): Output of build_search_documents
+
+    Returns:
+        dict: "documents", "gram_ids" (trigram -> row), "gram_postings",
+            "vocabulary" (sorted words), "word_postings", "kinds" (kind
+            code per document), "kind_codes" (kind -> code) and
+            "label_lengths"
+    """
+    documents = documents.reset_index(drop=True)
+    texts = (documents["label"].map(normalize) + " " + documents["detail"].fillna("").map(normalize)).str.split()
+
+    words = texts.explode().dropna()
+    word_doc = words.index.to_numpy()
+    vocabulary, word_ids = np.unique(words.to_numpy().astype(str), return_inverse=True)
+
+    # Trigrams come from the vocabulary, so each word is only cut up once
+    word_grams = pd.Series([sorted(_grams(word)) for word in vocabulary]).explode()
+    gram_values, gram_of_word_gram = np.unique(word_grams.to_numpy().astype(str), return_inverse=True)
+    word_gram_word = word_grams.index.to_numpy()
+
+    word_indptr, word_docs = _csr(word_ids, word_doc, len(vocabulary))
+
+    # gram -> docs: for every (word, gram) pair, all docs containing the word
+    counts = np.diff(word_indptr)[word_gram_word]
+    gram_rows = np.repeat(gram_of_word_gram, counts)
+    starts = word_indptr[word_gram_word]
+    gram_docs = word_docs[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+
+    kind_codes = {kind: code for code, kind in enumerate(SEARCH_KINDS)}
+
+    return {
+        "documents": documents,
+        "gram_ids": {gram: i for i, gram in enumerate(gram_values)},
+        "gram_postings": _csr(gram_rows, gram_docs, len(gram_values)),
+        "vocabulary": vocabulary,
+        "word_postings": (word_indptr, word_docs),
+        "kinds": documents["kind"].map(kind_codes).to_numpy(),
+        "kind_codes": kind_codes,
+        "label_lengths": documents["label"].str.len().to_numpy(),
+    }
+
+
+def _prefix_docs(index, prefix):
+    # Documents with a word starting with prefix: a vocabulary range found
+    # by binary search, then that range's postings
+    vocabulary = index["vocabulary"]
+    lo = np.searchsorted(vocabulary, prefix, side="left")
+    hi = np.searchsorted(vocabulary, prefix + "\uffff", side="left")
+    indptr, docs = index["word_postings"]
+    return np.unique(docs[indptr[lo]:indptr[hi]])
+
+
+def search(index, query, k=10, kinds=None, min_score=MIN_SCORE):
+    """
+    Ranked, typo-tolerant typeahead search.
+
+    A document scores the share of the query's trigrams it contains, plus
+    PREFIX_BONUS if one of its words starts with the last (possibly
+    unfinished) query word. Queries of one or two letters only use prefix
+    matching. Ties go to shorter labels.
+
+    Args:
+        index (dict): Output of build_search_index
+        query (str): Text typed so far
+        k (int): Maximum number of results
+        kinds (list): Restrict to these document kinds
+        min_score (float): Minimum score to be returned
+
+    Returns:
+        pd.DataFrame: The matching documents, best first, with a "score" column
+    """
+    tokens = normalize(query).split()
+    documents = index["documents"]
+    if not tokens:
+        return documents.iloc[0:0].assign(score=pd.Series(dtype=float))
+
+    # Scores are kept for the matching documents only: one np.unique over
+    # the gram postings and the prefix matches gives the candidates, and
+    # each posting's position in them
+    query_grams = set()
+    for i, token in enumerate(tokens):
+        query_grams |= _grams(token, prefix=(i == len(tokens) - 1))
+    gram_rows = [index["gram_ids"][gram] for gram in query_grams if gram in index["gram_ids"]]
+
+    gram_hits = np.array([], dtype=np.int64)
+    if len("".join(tokens)) >= 3 and gram_rows:
+        indptr, postings = index["gram_postings"]
+        gram_hits = np.concatenate([postings[indptr[row]:indptr[row + 1]] for row in gram_rows])
+    prefix_docs = _prefix_docs(index, tokens[-1])
+
+    candidates, inverse = np.unique(np.concatenate([gram_hits, prefix_docs]), return_inverse=True)
+    scores = np.bincount(inverse[:len(gram_hits)], minlength=len(candidates)) / max(len(query_grams), 1)
+    scores[inverse[len(gram_hits):]] += PREFIX_BONUS
+
+    keep = scores >= min_score
+    if kinds:
+        wanted = [index["kind_codes"][kind] for kind in kinds if kind in index["kind_codes"]]
+        keep &= np.isin(index["kinds"][candidates], wanted)
+    candidates, scores = candidates[keep], scores[keep]
+
+    # Partial selection of the top k, then a sort of those k only
+    if len(candidates) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        candidates, scores = candidates[best], scores[best]
+    order = np.lexsort((index["label_lengths"][candidates], -scores))
+    top, scores = candidates[order], scores[order]
+
+    return documents.iloc[top].assign(score=scores)
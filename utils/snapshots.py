@@ -0,0 +1,163 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import streamlit as st
+
+from utils import arrow_store
+from utils.athlete_cards import load_results
+from utils.ingest import DATA_DIR, read_tables
+
+# Seconds between two looks at the data directory; 0 turns the watcher off
+WATCH_SECONDS = float(os.environ.get("PARIS2024_WATCH_SECONDS", 10))
+
+# Session state key of the version the session last saw
+SEEN_KEY = "_snapshot_version"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def source_files(data_dir=DATA_DIR):
+    """The dataset's CSV files and the results/ files."""
+    return (sorted(glob.glob(os.path.join(data_dir, "*.csv"))),
+            sorted(glob.glob(os.path.join(data_dir, "results", "*.csv"))))
+
+
+def make_snapshot(data_dir=DATA_DIR):
+    """
+    The dataset version of the files as they are now, without reading them.
+
+    The manifest maps each table (a CSV path, or the results/ directory for
+    the concatenated results) to its Arrow snapshot file, whose name is
+    derived from the source sizes and modification times (see
+    utils.arrow_store.snapshot_path). The version is a digest of the
+    manifest, so it changes whenever a file does.
+
+    Returns:
+        dict: "version", "created" (datetime) and "manifest"
+    """
+    tables, results = source_files(data_dir)
+    manifest = {os.path.abspath(path): arrow_store.snapshot_path(path, [path]) for path in tables}
+    if results:
+        results_key = os.path.join(data_dir, "results")
+        manifest[os.path.abspath(results_key)] = arrow_store.snapshot_path(results_key, results)
+    version = hashlib.sha1(json.dumps(sorted(manifest.items())).encode()).hexdigest()[:10]
+    return {"version": version, "created": datetime.now(), "manifest": manifest}
+
+
+def build_snapshot(data_dir=DATA_DIR):
+    """
+    Parses and publishes every table of the current files.
+
+    Returns:
+        dict: The snapshot (see make_snapshot), or None if the files changed
+            while they were read; the next look at the directory retries
+    """
+    snapshot = make_snapshot(data_dir)
+    if arrow_store.enabled():
+        tables, _ = source_files(data_dir)
+        read_tables(tables)
+        load_results(data_dir)
+    if make_snapshot(data_dir)["version"] != snapshot["version"]:
+        return None
+    return snapshot
+
+
+class SnapshotWatcher(threading.Thread):
+    """
+    Polls the data directory and swaps in new dataset versions.
+
+    A change is picked up once the files have stayed the same for one
+    interval (so a refresh that writes several files is seen as one
+    version), then the next snapshot is built in this thread while pages
+    keep serving the current one. `current` is the pointer: replacing it is
+    a single assignment, so a rerun sees either the old snapshot or the new
+    one, never a mix.
+    """
+
+    def __init__(self, data_dir=DATA_DIR, interval=WATCH_SECONDS):
+        super().__init__(daemon=True, name="snapshot-watcher")
+        self.data_dir = data_dir
+        self.interval = interval
+        self.current = make_snapshot(data_dir)
+        self._stop_event = threading.Event()
+
+    def poll(self, pending=None):
+        """One look at the directory; returns the version waiting to settle."""
+        try:
+            candidate = make_snapshot(self.data_dir)["version"]
+        except OSError:
+            # A file was replaced between listing and stat
+            return pending
+        if candidate == self.current["version"]:
+            return None
+        if candidate != pending:
+            return candidate
+
+        snapshot = build_snapshot(self.data_dir)
+        if snapshot is not None:
+            self.swap(snapshot)
+        return None
+
+    def swap(self, snapshot):
+        previous, self.current = self.current, snapshot
+        _LOGGER.info("Dataset snapshot %s -> %s", previous["version"], snapshot["version"])
+        # Caches are left alone: loaders are keyed on the version and keep
+        # two entries (max_entries=2), so reruns still pinned to the previous
+        # version keep their tables and older versions age out
+
+    def run(self):
+        pending = None
+        while not self._stop_event.wait(self.interval):
+            try:
+                pending = self.poll(pending)
+            except Exception:
+                _LOGGER.exception("Building the next dataset snapshot failed")
+                pending = None
+
+    def stop(self):
+        self._stop_event.set()
+
+
+_WATCHER = None
+_WATCHER_LOCK = threading.Lock()
+
+
+def watcher():
+    """The process-wide watcher, started on first use."""
+    global _WATCHER
+    with _WATCHER_LOCK:
+        if _WATCHER is None:
+            _WATCHER = SnapshotWatcher()
+            if WATCH_SECONDS > 0:
+                _WATCHER.start()
+    return _WATCHER
+
+
+def pin_snapshot():
+    """
+    Pins this rerun to the current dataset snapshot; call it at the top of
+    the page. Cached loaders take the returned version as an argument, so
+    each version has its own cache entries, and every table the rerun reads
+    comes from the same version even if the next one is swapped in halfway.
+
+    Returns:
+        dict: The snapshot (see make_snapshot)
+    """
+    snapshot = watcher().current
+    arrow_store.pin(snapshot["manifest"])
+    return snapshot
+
+
+def render_snapshot_version(snapshot):
+    """Sidebar caption with the dataset version; a toast when it changed since the session's last rerun."""
+    seen = st.session_state.get(SEEN_KEY)
+    if seen is not None and seen != snapshot["version"]:
+        st.toast(f"📦 New data loaded (snapshot {snapshot['version']})")
+    st.session_state[SEEN_KEY] = snapshot["version"]
+
+    st.sidebar.caption(f"📦 Data snapshot `{snapshot['version']}` · loaded {snapshot['created']:%b %d, %H:%M:%S}")
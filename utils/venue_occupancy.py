@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from utils.schedule_index import SCHEDULE_TZ, build_schedule_index, window_positions
+
+NS_PER_HOUR = 3_600_000_000_000
+
+
+def _sweep(starts, ends, midnights):
+    """
+    Step function of concurrent sessions at one venue.
+
+    Every start adds one, every end removes one; local midnights are added as
+    no-op breakpoints so no step crosses a day boundary. At equal times ends
+    sort before starts, so back-to-back sessions do not count as overlapping.
+
+    Returns:
+        tuple: (times, levels) where levels[i] sessions run on
+            [times[i], times[i + 1])
+    """
+    times = np.concatenate([starts, ends, midnights])
+    deltas = np.concatenate([
+        np.ones(len(starts), dtype=np.int64),
+        -np.ones(len(ends), dtype=np.int64),
+        np.zeros(len(midnights), dtype=np.int64)
+    ])
+    order = np.lexsort((deltas, times))
+    times, levels = times[order], np.cumsum(deltas[order])
+
+    # Several events at the same instant: keep the level after the last one
+    last_of_run = np.r_[times[1:] != times[:-1], True]
+    return times[last_of_run], levels[last_of_run]
+
+
+def _runs(mask):
+    # (first, last) positions of each run of consecutive True values
+    edges = np.diff(np.r_[0, mask.astype(np.int8), 0])
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1) - 1
+
+
+def build_occupancy_index(schedules):
+    """
+    Interval index of schedule sessions per venue_code.
+
+    On top of the sorted per-venue sessions of build_schedule_index, each
+    venue gets its concurrency step function, and the daily occupancy, gaps
+    and overlaps are materialized once so the dashboard only does lookups.
+    Cancelled sessions do not occupy a venue and are left out.
+
+    Args:
+        schedules (pd.DataFrame): Rows of schedules.csv
+
+    Returns:
+        dict: The schedule index (keyed by venue_code) plus "steps" (venue ->
+            (times, levels)), "daily" (one row per venue and day with busy
+            hours, overlap hours, peak concurrency and session count), "gaps"
+            and "overlaps" (venue -> frame of start/end intervals)
+    """
+    if "status" in schedules.columns:
+        schedules = schedules[schedules["status"] != "CANCELLED"]
+
+    index = build_schedule_index(schedules, key="venue_code")
+    sessions = index["sessions"]
+    venue_names = sessions.groupby("venue_code")["venue"].first() if "venue" in sessions.columns else None
+
+    steps, gaps, overlaps, daily_parts = {}, {}, {}, []
+
+    for venue_code, (first, last) in index["bounds"].items():
+        starts = index["starts"][first:last]
+        ends = index["ends"][first:last]
+        midnights = pd.date_range(
+            sessions["start_date"].iat[first].floor("D"),
+            sessions["end_date"].iloc[first:last].max().ceil("D"),
+            freq="D"
+        ).as_unit("ns").asi8
+
+        times, levels = _sweep(starts, ends, midnights)
+        steps[venue_code] = (times, levels)
+
+        # Segments between consecutive breakpoints; none crosses midnight
+        seg_start, seg_end, seg_level = times[:-1], times[1:], levels[:-1]
+        seg_length = seg_end - seg_start
+        seg_day = pd.to_datetime(seg_start, utc=True).tz_convert(SCHEDULE_TZ).date
+
+        daily_parts.append(pd.DataFrame({
+            "venue_code": venue_code,
+            "day": seg_day,
+            "busy_hours": np.where(seg_level >= 1, seg_length, 0) / NS_PER_HOUR,
+            "overlap_hours": np.where(seg_level >= 2, seg_length, 0) / NS_PER_HOUR,
+            "peak_concurrency": seg_level,
+        }))
+
+        # Gaps: idle segments with activity right before and right after
+        idle = seg_level == 0
+        bounded = idle & np.r_[False, seg_level[:-1] > 0] & np.r_[seg_level[1:] > 0, False]
+        gaps[venue_code] = pd.DataFrame({
+            "start": pd.to_datetime(seg_start[bounded], utc=True).tz_convert(SCHEDULE_TZ),
+            "end": pd.to_datetime(seg_end[bounded], utc=True).tz_convert(SCHEDULE_TZ),
+            "duration_min": seg_length[bounded] / 60_000_000_000,
+        })
+
+        # Overlaps: consecutive segments with two or more sessions, merged
+        run_first, run_last = _runs(seg_level >= 2)
+        overlaps[venue_code] = pd.DataFrame({
+            "start": pd.to_datetime(seg_start[run_first], utc=True).tz_convert(SCHEDULE_TZ),
+            "end": pd.to_datetime(seg_end[run_last], utc=True).tz_convert(SCHEDULE_TZ),
+            "peak_concurrency": [int(seg_level[f:l + 1].max()) for f, l in zip(run_first, run_last)],
+        })
+
+    if daily_parts:
+        daily = (
+            pd.concat(daily_parts, ignore_index=True)
+            .groupby(["venue_code", "day"], as_index=False)
+            .agg(busy_hours=("busy_hours", "sum"), overlap_hours=("overlap_hours", "sum"),
+                 peak_concurrency=("peak_concurrency", "max"))
+        )
+        session_counts = (
+            sessions.assign(day=sessions["start_date"].dt.date)
+            .groupby(["venue_code", "day"]).size().rename("sessions").reset_index()
+        )
+        daily = daily.merge(session_counts, on=["venue_code", "day"], how="left")
+        daily["sessions"] = daily["sessions"].fillna(0).astype(int)
+        # Days a venue is only "touched" by the midnight breakpoints add nothing
+        daily = daily[(daily["busy_hours"] > 0) | (daily["sessions"] > 0)]
+        if venue_names is not None:
+            daily["venue"] = daily["venue_code"].map(venue_names)
+    else:
+        daily = pd.DataFrame(columns=["venue_code", "day", "busy_hours", "overlap_hours",
+                                      "peak_concurrency", "sessions", "venue"])
+
+    index["steps"] = steps
+    index["daily"] = daily.set_index(["venue_code", "day"]).sort_index()
+    index["gaps"] = gaps
+    index["overlaps"] = overlaps
+    return index
+
+
+def concurrency_at(index, venue_code, t):
+    """Number of sessions running at a venue at time t (one binary search)."""
+    if venue_code not in index["steps"]:
+        return 0
+    times, levels = index["steps"][venue_code]
+    i = np.searchsorted(times, pd.Timestamp(t).value, side="right") - 1
+    return int(levels[i]) if i >= 0 else 0
+
+
+def sessions_running_at(index, t, venue_codes=None):
+    """
+    Sessions running at time t (start <= t < end), across all venues or the
+    given ones. Each venue costs a binary search plus the matching sessions.
+    """
+    t = pd.Timestamp(t)
+    venue_codes = index["bounds"] if venue_codes is None else venue_codes
+    positions = [
+        window_positions(index, venue_code, t, t + pd.Timedelta(1, "ns"))
+        for venue_code in venue_codes
+    ]
+    positions = np.concatenate(positions) if positions else np.array([], dtype=int)
+    return index["sessions"].take(positions)
+
+
+def peak_concurrency(index, venue_code, day):
+    """Peak number of simultaneous sessions at a venue on a day (precomputed)."""
+    try:
+        return int(index["daily"].at[(venue_code, day), "peak_concurrency"])
+    except KeyError:
+        return 0
+
+
+def occupancy_matrix(index, value="busy_hours", venue_codes=None):
+    """Venue x day pivot of one daily occupancy measure, for the heatmap (all venues or the given codes)."""
+    daily = index["daily"].reset_index()
+    if venue_codes is not None:
+        daily = daily[daily["venue_code"].isin(venue_codes)]
+    return daily.pivot_table(index="venue", columns="day", values=value, aggfunc="sum").sort_index()